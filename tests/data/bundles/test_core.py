@@ -13,6 +13,8 @@ from zipline.data.bundles import UnknownBundle, from_bundle_ingest_dirname, \
     ingestions_for_bundle
 from zipline.data.bundles.core import _make_bundle_core, BadClean, \
     to_bundle_ingest_dirname, asset_db_path
+from zipline.data.minute_bars import BcolzMinuteBarReader
+from zipline.data.us_equity_pricing import BcolzDailyBarReader
 from zipline.lib.adjustment import Float64Multiply
 from zipline.pipeline.loaders.synthetic import (
     make_bar_data,
@@ -264,6 +266,142 @@ class BundleCoreTestCase(WithInstanceTmpDir,
             msg='volume',
         )
 
+    def test_ingest_incremental(self):
+        calendar = get_calendar('NYSE')
+        sessions = calendar.sessions_in_range(self.START_DATE, self.END_DATE)
+        minutes = calendar.minutes_for_sessions_in_range(
+            self.START_DATE, self.END_DATE,
+        )
+        split = sessions[2]
+
+        sids = tuple(range(3))
+        equities = make_simple_equity_info(
+            sids,
+            self.START_DATE,
+            self.END_DATE,
+        )
+        daily_bar_data = dict(make_bar_data(equities, sessions))
+        minute_bar_data = dict(make_bar_data(equities, minutes))
+
+        def before(data, dt):
+            return [(sid, frame[frame.index <= dt])
+                    for sid, frame in data.items()]
+
+        def after(data, dt):
+            return [(sid, frame[frame.index > dt])
+                    for sid, frame in data.items()]
+
+        previous_ingestions = []
+
+        @self.register(
+            'bundle',
+            calendar_name='NYSE',
+            start_session=self.START_DATE,
+            end_session=self.END_DATE,
+            incremental=True,
+        )
+        def bundle_ingest(environ,
+                          asset_db_writer,
+                          minute_bar_writer,
+                          daily_bar_writer,
+                          adjustment_writer,
+                          calendar,
+                          start_session,
+                          end_session,
+                          cache,
+                          show_progress,
+                          output_dir,
+                          previous_ingestion):
+            previous_ingestions.append(previous_ingestion)
+            asset_db_writer.write(equities=equities)
+            if previous_ingestion is None:
+                minute_bar_writer.write(
+                    before(minute_bar_data, calendar.session_close(split)),
+                )
+                daily_bar_writer.write(before(daily_bar_data, split))
+            else:
+                minute_bar_writer.write(
+                    after(minute_bar_data, calendar.session_close(split)),
+                )
+                daily_bar_writer.append(after(daily_bar_data, split))
+            adjustment_writer.write()
+
+        now = pd.Timestamp.utcnow()
+        self.ingest('bundle', self.environ, timestamp=now,
+                    incremental=True)
+        self.ingest('bundle', self.environ,
+                    timestamp=now + pd.Timedelta(seconds=1),
+                    incremental=True)
+
+        first, second = previous_ingestions
+        assert_is_none(first)
+        assert_equal(
+            second.timestamp,
+            now.tz_convert('utc').tz_localize(None),
+        )
+
+        # The previous ingestion is left untouched.
+        assert_equal(
+            BcolzDailyBarReader(second.daily_equity_path).load_raw_arrays(
+                ['close'],
+                self.START_DATE,
+                split,
+                sids,
+            )[0],
+            expected_bar_values_2d(sessions[:3], equities, 'close'),
+        )
+        expected_volume = expected_bar_values_2d(minutes, equities, 'volume')
+        expected_volume[minutes > calendar.session_close(split)] = 0
+        assert_equal(
+            BcolzMinuteBarReader(second.minute_equity_path).load_raw_arrays(
+                ['volume'],
+                minutes[0],
+                minutes[-1],
+                sids,
+            )[0],
+            expected_volume,
+        )
+
+        bundle = self.load('bundle', environ=self.environ)
+        columns = 'open', 'high', 'low', 'close', 'volume'
+
+        actual = bundle.equity_minute_bar_reader.load_raw_arrays(
+            columns,
+            minutes[0],
+            minutes[-1],
+            sids,
+        )
+        for actual_column, colname in zip(actual, columns):
+            assert_equal(
+                actual_column,
+                expected_bar_values_2d(minutes, equities, colname),
+                msg=colname,
+            )
+
+        actual = bundle.equity_daily_bar_reader.load_raw_arrays(
+            columns,
+            self.START_DATE,
+            self.END_DATE,
+            sids,
+        )
+        for actual_column, colname in zip(actual, columns):
+            assert_equal(
+                actual_column,
+                expected_bar_values_2d(sessions, equities, colname),
+                msg=colname,
+            )
+
+    def test_ingest_incremental_not_supported(self):
+        called = [False]
+
+        @self.register('bundle')
+        def bundle_ingest(*args):
+            called[0] = True
+
+        with assert_raises(ValueError):
+            self.ingest('bundle', self.environ, incremental=True)
+        assert_false(called[0])
+
     def test_ingest_assets_versions(self):
         versions = (1, 2)
 
@@ -15,6 +15,8 @@
 from datetime import timedelta
 import os
 
+from mock import patch
+
 from numpy import (
     arange,
     array,
@@ -43,9 +45,11 @@ from zipline.data.minute_bars import (
     BcolzMinuteOverlappingData,
     US_EQUITIES_MINUTES_PER_DAY,
     BcolzMinuteWriterColumnMismatch,
+    BcolzMinuteWriterProcessError,
     H5MinuteBarUpdateWriter,
     H5MinuteBarUpdateReader,
 )
+from zipline.data.shared_cache import SharedArrayCache
 
 from zipline.testing.fixtures import (
     WithAssetFinder,
@@ -564,6 +568,160 @@ class BcolzMinuteBarTestCase(WithTradingCalendars,
 
         self.assertEquals(200.0, volume_price)
 
+    def test_get_values(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+        next_minute = minute + timedelta(minutes=1)
+        self.writer.write_sid(1, DataFrame(
+            data={
+                'open': [15.0, 0.0],
+                'high': [17.0, 0.0],
+                'low': [11.0, 0.0],
+                'close': [15.0, 0.0],
+                'volume': [100.0, 0.0],
+            },
+            index=[minute, next_minute]))
+        self.writer.write_sid(2, DataFrame(
+            data={
+                'open': [25.0],
+                'high': [27.0],
+                'low': [21.0],
+                'close': [25.0],
+                'volume': [200.0],
+            },
+            index=[minute]))
+
+        fields = ['open', 'high', 'low', 'close', 'volume']
+        sids = [1, 2]
+
+        for dt in (minute, next_minute):
+            result = self.reader.get_values(sids, dt, fields)
+            expected = array([
+                [self.reader.get_value(sid, dt, field) for sid in sids]
+                for field in fields
+            ], dtype=float64)
+            assert_array_equal(expected, result)
+
+        # Sid 2 has no data written for next_minute.
+        assert_array_equal(
+            array([[15.0, 25.0], [100.0, 200.0]]),
+            self.reader.get_values(sids, minute, ['close', 'volume']),
+        )
+        assert_array_equal(
+            array([[nan, nan], [0.0, 0.0]]),
+            self.reader.get_values(sids, next_minute, ['close', 'volume']),
+        )
+
+        with self.assertRaises(NoDataOnDate):
+            self.reader.get_values(sids, minute - timedelta(minutes=1),
+                                   fields)
+
+        # The carrays are read once per session: the other minutes of the
+        # session are served from memory.
+        with patch.object(self.reader, '_open_minute_file') as open_file:
+            result = self.reader.get_values(sids, next_minute, fields)
+        self.assertFalse(open_file.called)
+        assert_array_equal(
+            array([[nan, nan], [0.0, 0.0]]),
+            result[[fields.index('close'), fields.index('volume')]],
+        )
+
+    def test_shared_cache(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+        minutes = [minute, minute + timedelta(minutes=2)]
+        for sid in (1, 2):
+            self.writer.write_sid(sid, DataFrame(
+                data={
+                    'open': [10.0 * sid, 11.0 * sid],
+                    'high': [12.0 * sid, 13.0 * sid],
+                    'low': [8.0 * sid, 9.0 * sid],
+                    'close': [11.0 * sid, 12.0 * sid],
+                    'volume': [100.0 * sid, 0.0],
+                },
+                index=minutes))
+
+        cache = SharedArrayCache(self.instance_tmpdir.getpath('shared'))
+        readers = [
+            BcolzMinuteBarReader(self.dest, shared_cache=cache)
+            for _ in range(2)
+        ]
+
+        fields = ['open', 'high', 'low', 'close', 'volume']
+        sids = [2, 1]
+        end = minutes[-1]
+        for reader in readers:
+            for expected, result in zip(
+                    self.reader.load_raw_arrays(fields, minute, end, sids),
+                    reader.load_raw_arrays(fields, minute, end, sids)):
+                assert_array_equal(expected, result)
+            assert_array_equal(
+                self.reader.get_values(sids, end, fields),
+                reader.get_values(sids, end, fields),
+            )
+
+        # The readers share one array per sid and field.
+        self.assertEqual(len(os.listdir(cache.path)), len(sids) * len(fields))
+
+        # Appended data is not read from the stale arrays.
+        next_minute = self.market_opens.iloc[1]
+        self.writer.write_sid(1, DataFrame(
+            data={
+                'open': [20.0],
+                'high': [22.0],
+                'low': [18.0],
+                'close': [21.0],
+                'volume': [150.0],
+            },
+            index=[next_minute]))
+        reader = BcolzMinuteBarReader(self.dest, shared_cache=cache)
+        self.assertEqual(20.0, reader.get_value(1, next_minute, 'open'))
+
+        cache.clear()
+        self.assertFalse(os.path.exists(cache.path))
+
+    def test_write_parallel(self):
+        days = self.market_opens.index[:2]
+        minutes = [self.market_opens[day] + timedelta(minutes=1)
+                   for day in days]
+
+        def bars(minute, price):
+            return DataFrame(
+                data={
+                    'open': [price],
+                    'high': [price + 2.0],
+                    'low': [price - 2.0],
+                    'close': [price + 1.0],
+                    'volume': [price * 10],
+                },
+                index=[minute],
+            )
+
+        # Sid 1 appears twice, its data must still be appended in order.
+        data = [
+            (1, bars(minutes[0], 10.0)),
+            (2, bars(minutes[0], 20.0)),
+            (3, bars(minutes[0], 30.0)),
+            (1, bars(minutes[1], 11.0)),
+        ]
+        self.writer.write(data, processes=2)
+
+        for sid, df in data:
+            minute = df.index[0]
+            for field in ('open', 'high', 'low', 'close', 'volume'):
+                self.assertEqual(
+                    df[field].iloc[0],
+                    self.reader.get_value(sid, minute, field),
+                )
+        self.assertEqual(self.writer.last_date_in_output_for_sid(1), days[1])
+
+        # Overlapping data fails its sid only.
+        with self.assertRaises(BcolzMinuteWriterProcessError):
+            self.writer.write(
+                [(2, bars(minutes[0], 21.0)), (4, bars(minutes[1], 40.0))],
+                processes=2,
+            )
+        self.assertEqual(40.0, self.reader.get_value(4, minutes[1], 'open'))
+        self.assertEqual(20.0, self.reader.get_value(2, minutes[0], 'open'))
+
     def test_pad_data(self):
         """
         Test writing empty data.
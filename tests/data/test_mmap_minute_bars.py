@@ -0,0 +1,337 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import timedelta
+import os
+
+from numpy import array, isnan, nan
+from numpy.testing import assert_almost_equal, assert_array_equal
+from pandas import DataFrame, DatetimeIndex, NaT, Timestamp
+
+from zipline.data.bundles.core import minute_bar_reader
+from zipline.data.minute_bars import (
+    BcolzMinuteBarReader,
+    BcolzMinuteBarWriter,
+    BcolzMinuteOverlappingData,
+    US_EQUITIES_MINUTES_PER_DAY,
+)
+from zipline.data.mmap_minute_bars import (
+    LAST_TRADED_FILENAME,
+    MmapMinuteBarReader,
+    MmapMinuteBarWriter,
+    write_from_reader,
+)
+from zipline.testing.fixtures import (
+    WithInstanceTmpDir,
+    WithTradingCalendars,
+    ZiplineTestCase,
+)
+
+TEST_CALENDAR_START = Timestamp('2015-11-23', tz='UTC')
+TEST_CALENDAR_STOP = Timestamp('2015-12-31', tz='UTC')
+
+
+class FakeAsset(object):
+    start_date = TEST_CALENDAR_START
+
+    def __init__(self, sid):
+        self.sid = sid
+
+    def __int__(self):
+        return self.sid
+
+
+class MmapMinuteBarTestCase(WithTradingCalendars,
+                            WithInstanceTmpDir,
+                            ZiplineTestCase):
+
+    SIDS = 1, 2, 3
+
+    @classmethod
+    def init_class_fixtures(cls):
+        super(MmapMinuteBarTestCase, cls).init_class_fixtures()
+
+        cal = cls.trading_calendar.schedule.loc[
+            TEST_CALENDAR_START:TEST_CALENDAR_STOP
+        ]
+
+        cls.market_opens = cal.market_open
+        cls.market_closes = cal.market_close
+
+    def init_instance_fixtures(self):
+        super(MmapMinuteBarTestCase, self).init_instance_fixtures()
+
+        self.dest = self.instance_tmpdir.getpath('minute_bars')
+        os.makedirs(self.dest)
+        self.writer = MmapMinuteBarWriter(
+            self.dest,
+            self.trading_calendar,
+            TEST_CALENDAR_START,
+            TEST_CALENDAR_STOP,
+            US_EQUITIES_MINUTES_PER_DAY,
+            self.SIDS,
+        )
+        self.reader = MmapMinuteBarReader(self.dest)
+
+    def make_bars(self, minutes, offset=0.0):
+        count = len(minutes)
+        return DataFrame(
+            data={
+                'open': [10.0 + offset + i for i in range(count)],
+                'high': [20.0 + offset + i for i in range(count)],
+                'low': [5.0 + offset + i for i in range(count)],
+                'close': [15.0 + offset + i for i in range(count)],
+                'volume': [100.0 + i for i in range(count)],
+            },
+            index=DatetimeIndex(minutes),
+        )
+
+    def test_write_one_ohlcv(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+        self.writer.write_sid(2, self.make_bars([minute]))
+
+        self.assertEqual(10.0, self.reader.get_value(2, minute, 'open'))
+        self.assertEqual(20.0, self.reader.get_value(2, minute, 'high'))
+        self.assertEqual(5.0, self.reader.get_value(2, minute, 'low'))
+        self.assertEqual(15.0, self.reader.get_value(2, minute, 'close'))
+        self.assertEqual(100, self.reader.get_value(2, minute, 'volume'))
+
+        # Nothing was written for sid 1 and the next minute.
+        next_minute = minute + timedelta(minutes=1)
+        self.assertTrue(isnan(self.reader.get_value(1, minute, 'close')))
+        self.assertEqual(0, self.reader.get_value(2, next_minute, 'volume'))
+
+    def test_matches_bcolz(self):
+        bcolz_dest = self.instance_tmpdir.getpath('bcolz_minute_bars')
+        os.makedirs(bcolz_dest)
+        bcolz_writer = BcolzMinuteBarWriter(
+            bcolz_dest,
+            self.trading_calendar,
+            TEST_CALENDAR_START,
+            TEST_CALENDAR_STOP,
+            US_EQUITIES_MINUTES_PER_DAY,
+        )
+
+        # The window spans the early close of the day after thanksgiving.
+        thanksgiving_friday = Timestamp('2015-11-27', tz='UTC')
+        minutes = [
+            self.market_closes[thanksgiving_friday] - timedelta(minutes=1),
+            self.market_opens[Timestamp('2015-11-30', tz='UTC')],
+            self.market_opens[Timestamp('2015-11-30', tz='UTC')] +
+            timedelta(minutes=3),
+        ]
+        for sid in self.SIDS:
+            bars = self.make_bars(minutes[sid - 1:], offset=sid)
+            self.writer.write_sid(sid, bars)
+            bcolz_writer.write_sid(sid, bars)
+
+        bcolz_reader = BcolzMinuteBarReader(bcolz_dest)
+        fields = ['open', 'high', 'low', 'close', 'volume']
+        sids = [3, 1]
+
+        start = self.market_opens[thanksgiving_friday]
+        end = minutes[-1]
+        for expected, result in zip(
+                bcolz_reader.load_raw_arrays(fields, start, end, sids),
+                self.reader.load_raw_arrays(fields, start, end, sids)):
+            self.assertEqual(expected.dtype, result.dtype)
+            assert_array_equal(expected, result)
+
+        for minute in minutes:
+            assert_array_equal(
+                bcolz_reader.get_values(sids, minute, fields),
+                self.reader.get_values(sids, minute, fields),
+            )
+
+    def test_last_traded_dt(self):
+        minute = self.market_opens[TEST_CALENDAR_START] + timedelta(minutes=5)
+        self.writer.write_sid(1, self.make_bars([minute]))
+
+        later = self.market_closes[Timestamp('2015-11-24', tz='UTC')]
+        self.assertEqual(minute,
+                         self.reader.get_last_traded_dt(FakeAsset(1), later))
+        self.assertIs(NaT, self.reader.get_last_traded_dt(
+            FakeAsset(1), minute - timedelta(minutes=1),
+        ))
+
+    def assert_last_traded_matches_scan(self, reader, sids, dts):
+        # A reader without the index scans the volumes backwards.
+        scanning_reader = MmapMinuteBarReader(self.dest)
+        scanning_reader._last_traded = None
+        for sid in sids:
+            for dt in dts:
+                self.assertEqual(
+                    reader.get_last_traded_dt(FakeAsset(sid), dt),
+                    scanning_reader.get_last_traded_dt(FakeAsset(sid), dt),
+                    "sid={0}, dt={1}".format(sid, dt),
+                )
+
+    def test_last_traded_dt_index(self):
+        days = self.market_opens.index
+        # Sid 1 trades on the sessions 1 and 4, written in two calls, and a
+        # minute of session 4 is written by a third call. Sid 2 trades on
+        # the first minute of the data set. Sid 3 never trades.
+        self.writer.write_sid(1, self.make_bars([
+            self.market_opens[days[1]] + timedelta(minutes=10),
+            self.market_opens[days[1]] + timedelta(minutes=20),
+        ]))
+        self.writer.write_sid(1, self.make_bars([
+            self.market_opens[days[4]] + timedelta(minutes=5),
+        ]))
+        self.writer.write_sid(1, self.make_bars([
+            self.market_opens[days[4]] + timedelta(minutes=30),
+        ]))
+        self.writer.write_sid(2, self.make_bars([self.market_opens[days[0]]]))
+
+        self.assertEqual(
+            self.reader.get_last_traded_dt(
+                FakeAsset(1), self.market_closes[days[3]],
+            ),
+            self.market_opens[days[1]] + timedelta(minutes=20),
+        )
+
+        dts = [
+            dt
+            for day in days[:7]
+            for dt in (
+                self.market_opens[day],
+                self.market_opens[day] + timedelta(minutes=5),
+                self.market_opens[day] + timedelta(minutes=25),
+                self.market_closes[day],
+                self.market_closes[day] + timedelta(hours=1),
+            )
+        ]
+        self.assert_last_traded_matches_scan(self.reader, self.SIDS, dts)
+
+        # The index of a data set written before it existed is rebuilt by
+        # the writer.
+        os.remove(os.path.join(self.dest, LAST_TRADED_FILENAME))
+        self.assertIsNone(MmapMinuteBarReader(self.dest)._last_traded)
+        MmapMinuteBarWriter.open(self.dest)
+        self.assert_last_traded_matches_scan(
+            MmapMinuteBarReader(self.dest), self.SIDS, dts,
+        )
+
+    def test_truncated_file(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+        self.writer.write_sid(1, self.make_bars([minute]))
+        self.writer.flush()
+
+        path = os.path.join(self.dest, 'close.u32')
+        with open(path, 'ab') as f:
+            f.truncate(os.path.getsize(path) - 4)
+
+        with self.assertRaises(ValueError) as e:
+            MmapMinuteBarReader(self.dest)
+        self.assertIn('close.u32', str(e.exception))
+
+    def test_no_overwrite(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+        self.writer.write_sid(1, self.make_bars([minute]))
+
+        with self.assertRaises(BcolzMinuteOverlappingData):
+            self.writer.write_sid(1, self.make_bars([minute]))
+
+    def test_unknown_sid(self):
+        minute = self.market_opens[TEST_CALENDAR_START]
+
+        with self.assertRaises(KeyError):
+            self.writer.write_sid(4, self.make_bars([minute]))
+        with self.assertRaises(KeyError):
+            self.reader.get_values([1, 4], minute, ['close'])
+
+        # The sids of a data set can not change.
+        with self.assertRaises(ValueError):
+            MmapMinuteBarWriter(
+                self.dest,
+                self.trading_calendar,
+                TEST_CALENDAR_START,
+                TEST_CALENDAR_STOP,
+                US_EQUITIES_MINUTES_PER_DAY,
+                [1, 2],
+            )
+
+    def test_append_new_sessions(self):
+        first_stop = Timestamp('2015-11-30', tz='UTC')
+        dest = self.instance_tmpdir.getpath('appended_minute_bars')
+        os.makedirs(dest)
+        MmapMinuteBarWriter(
+            dest,
+            self.trading_calendar,
+            TEST_CALENDAR_START,
+            first_stop,
+            US_EQUITIES_MINUTES_PER_DAY,
+            self.SIDS,
+        ).write_sid(1, self.make_bars([self.market_opens[first_stop]]))
+
+        writer = MmapMinuteBarWriter.open(dest, TEST_CALENDAR_STOP)
+        minute = self.market_opens[TEST_CALENDAR_STOP]
+        writer.write_sid(1, self.make_bars([minute], offset=1.0))
+
+        reader = MmapMinuteBarReader(dest)
+        self.assertEqual(
+            10.0, reader.get_value(1, self.market_opens[first_stop], 'open'),
+        )
+        self.assertEqual(11.0, reader.get_value(1, minute, 'open'))
+
+    def test_truncate(self):
+        days = self.market_opens.index[1:3]
+        minutes = [self.market_opens[day] + timedelta(minutes=60)
+                   for day in days]
+        self.writer.write_sid(1, self.make_bars(minutes))
+
+        writer = MmapMinuteBarWriter.open(self.dest)
+        writer.truncate(days[0])
+        self.assertEqual(writer.last_date_in_output_for_sid(1), days[0])
+
+        reader = MmapMinuteBarReader(self.dest)
+        _, last_close = self.trading_calendar.open_and_close_for_session(
+            days[0],
+        )
+        self.assertEqual(reader.last_available_dt, last_close)
+        self.assertEqual(10.0, reader.get_value(1, minutes[0], 'open'))
+
+    def test_write_from_reader(self):
+        bcolz_dest = self.instance_tmpdir.getpath('bcolz_minute_bars')
+        os.makedirs(bcolz_dest)
+        bcolz_writer = BcolzMinuteBarWriter(
+            bcolz_dest,
+            self.trading_calendar,
+            TEST_CALENDAR_START,
+            TEST_CALENDAR_STOP,
+            US_EQUITIES_MINUTES_PER_DAY,
+            ohlc_ratios_per_sid={2: 10},
+        )
+        minute = self.market_opens[TEST_CALENDAR_START]
+        bcolz_writer.write_sid(1, self.make_bars([minute]))
+        bcolz_writer.write_sid(2, self.make_bars([minute], offset=0.12))
+
+        self.assertIsInstance(minute_bar_reader(bcolz_dest),
+                              BcolzMinuteBarReader)
+        self.assertNotIsInstance(minute_bar_reader(bcolz_dest),
+                                 MmapMinuteBarReader)
+
+        # Convert the data in place, the bundles then load the new format.
+        write_from_reader(BcolzMinuteBarReader(bcolz_dest), [1, 2],
+                          bcolz_dest)
+        reader = minute_bar_reader(bcolz_dest)
+
+        self.assertIsInstance(reader, MmapMinuteBarReader)
+        assert_almost_equal(
+            array([[10.0, 10.1], [100.0, 100.0]]),
+            reader.get_values([1, 2], minute, ['open', 'volume']),
+        )
+        assert_array_equal(
+            array([[nan, nan]]),
+            reader.get_values([1, 2], minute + timedelta(minutes=1),
+                              ['open']),
+        )
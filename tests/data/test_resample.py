@@ -523,6 +523,28 @@ class MinuteToDailyAggregationTestCase(WithBcolzEquityMinuteBarReader,
                     err_msg='sid={0} field={1} dt={2}'.format(
                         asset, field, minute))
 
+    @parameterized.expand(OHLCV)
+    def test_mixed_last_visited_minutes(self, field):
+        # Assets visited up to different minutes are aggregated in the same
+        # call.
+        method_name = field + 's'
+        aggregator = self.equity_daily_aggregator
+        asset_1, asset_2 = assets = self.asset_finder.retrieve_all([1, 2])
+        minutes = EQUITY_CASES[1].index
+
+        getattr(aggregator, method_name)([asset_1], minutes[2])
+        getattr(aggregator, method_name)([asset_2], minutes[3])
+
+        for i in [4, 5]:
+            values = getattr(aggregator, method_name)(assets, minutes[i])
+            for asset, value in zip(assets, values):
+                self.assertIsInstance(value, Real)
+                assert_almost_equal(
+                    value,
+                    EXPECTED_AGGREGATION[asset][field][i],
+                    err_msg='sid={0} field={1} dt={2}'.format(
+                        asset, field, minutes[i]))
+
 
 class TestMinuteToSession(WithEquityMinuteBarData,
                           ZiplineTestCase):
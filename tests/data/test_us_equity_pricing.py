@@ -12,9 +12,12 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from os import listdir
 from sys import maxsize
 import re
 
+from mock import patch
+
 from nose_parameterized import parameterized
 from numpy import (
     arange,
@@ -29,6 +32,7 @@ from pandas import (
     Timestamp,
 )
 from pandas.util.testing import assert_index_equal
+from six import iteritems
 
 from zipline.data.us_equity_pricing import (
     BcolzDailyBarReader,
@@ -36,6 +40,7 @@ from zipline.data.us_equity_pricing import (
     NoDataBeforeDate,
     NoDataAfterDate,
 )
+from zipline.data.shared_cache import SharedArrayCache
 from zipline.pipeline.loaders.synthetic import (
     OHLCV,
     asset_start,
@@ -369,6 +374,121 @@ class BcolzDailyBarNeverReadAllTestCase(BcolzDailyBarTestCase):
     BCOLZ_DAILY_BAR_READ_ALL_THRESHOLD = maxsize
 
 
+class BcolzDailyBarColumnCacheTestCase(BcolzDailyBarTestCase):
+    """
+    Run the tests defined in BcolzDailyBarTestCase with the columns read from
+    a cache of decompressed columns, with room for two columns only.
+    """
+    @classmethod
+    def init_class_fixtures(cls):
+        super(BcolzDailyBarColumnCacheTestCase, cls).init_class_fixtures()
+        table = cls.bcolz_daily_bar_ctable
+        cls.bcolz_equity_daily_bar_reader = BcolzDailyBarReader(
+            table,
+            column_cache_nbytes=2 * table['close'][:].nbytes,
+        )
+
+    def test_column_cache_eviction(self):
+        reader = self.bcolz_equity_daily_bar_reader
+        column_cache = reader._column_cache
+        column_cache.clear()
+
+        self._check_read_results(
+            ['open', 'high', 'low'],
+            self.assets,
+            TEST_QUERY_START,
+            TEST_QUERY_STOP,
+        )
+        self.assertEqual(len(column_cache), 2)
+        self.assertNotIn('open', column_cache)
+
+        # Reads of cached columns do not decompress them again.
+        high = column_cache.get('high')
+        self._check_read_results(
+            ['high'],
+            self.assets,
+            TEST_QUERY_START,
+            TEST_QUERY_STOP,
+        )
+        self.assertIs(column_cache.get('high'), high)
+
+    def test_column_larger_than_cache(self):
+        table = self.bcolz_daily_bar_ctable
+        reader = BcolzDailyBarReader(
+            table,
+            column_cache_nbytes=table['close'][:].nbytes - 1,
+        )
+
+        self.assertIs(reader._spot_col('close'), reader._spot_col('close'))
+        self.assertEqual(len(reader._column_cache), 0)
+
+        columns = ['open', 'high', 'low', 'close', 'volume']
+        # The columns which aren't cached are read from the carrays.
+        with patch('zipline.data.us_equity_pricing._read_columns') as read:
+            results = reader.load_raw_arrays(
+                columns,
+                TEST_QUERY_START,
+                TEST_QUERY_STOP,
+                self.assets,
+            )
+        self.assertFalse(read.called)
+
+        expected = BcolzDailyBarReader(table).load_raw_arrays(
+            columns,
+            TEST_QUERY_START,
+            TEST_QUERY_STOP,
+            self.assets,
+        )
+        for result, expected_result in zip(results, expected):
+            assert_array_equal(result, expected_result)
+
+
+class BcolzDailyBarSharedCacheTestCase(BcolzDailyBarTestCase):
+    """
+    Run the tests defined in BcolzDailyBarTestCase with the columns read
+    from a shared cache.
+    """
+    @classmethod
+    def init_class_fixtures(cls):
+        super(BcolzDailyBarSharedCacheTestCase, cls).init_class_fixtures()
+        cls.shared_cache = SharedArrayCache(cls.tmpdir.getpath('shared'))
+        cls.bcolz_equity_daily_bar_reader.attach_shared_cache(
+            cls.shared_cache,
+        )
+
+    def test_unadjusted_get_value_empty_value(self):
+        # The shared columns can not be written to.
+        with self.assertRaises(ValueError):
+            self.bcolz_equity_daily_bar_reader._spot_col('close')[0] = 0
+
+    def test_shared_columns(self):
+        columns = ['open', 'volume']
+        expected = self.bcolz_equity_daily_bar_reader.load_raw_arrays(
+            columns,
+            TEST_QUERY_START,
+            TEST_QUERY_STOP,
+            self.assets,
+        )
+
+        arrays = listdir(self.shared_cache.path)
+        reader = BcolzDailyBarReader(self.bcolz_daily_bar_path,
+                                     shared_cache=self.shared_cache)
+        results = reader.load_raw_arrays(
+            columns,
+            TEST_QUERY_START,
+            TEST_QUERY_STOP,
+            self.assets,
+        )
+        for expected_column, result in zip(expected, results):
+            assert_array_equal(expected_column, result)
+
+        # The second reader maps the arrays loaded by the first one.
+        self.assertEqual(
+            sorted(arrays),
+            sorted(listdir(self.shared_cache.path)),
+        )
+
+
 class BcolzDailyBarWriterMissingDataTestCase(WithAssetFinder,
                                              WithTmpDir,
                                              WithTradingCalendars,
@@ -409,3 +529,161 @@ class BcolzDailyBarWriterMissingDataTestCase(WithAssetFinder,
         )
         with self.assertRaisesRegexp(AssertionError, expected_msg):
             writer.write(bar_data)
+
+
+class BcolzDailyBarAppendTestCase(WithTmpDir,
+                                  WithTradingCalendars,
+                                  ZiplineTestCase):
+    # Assets 1 and 4 stop trading on or before the split, asset 2 starts
+    # trading after it.
+    SPLIT_DAY = Timestamp('2015-06-15', tz='UTC')
+
+    @classmethod
+    def init_class_fixtures(cls):
+        super(BcolzDailyBarAppendTestCase, cls).init_class_fixtures()
+        cls.sessions = cls.trading_calendar.sessions_in_range(
+            TEST_CALENDAR_START,
+            TEST_CALENDAR_STOP,
+        )
+        cls.bar_data = dict(make_bar_data(EQUITY_INFO, cls.sessions))
+
+    def bars(self, before_split):
+        for asset_id, frame in iteritems(self.bar_data):
+            mask = frame.index <= self.SPLIT_DAY
+            frame = frame[mask if before_split else ~mask]
+            if len(frame):
+                yield asset_id, frame
+
+    def test_append(self):
+        path = self.tmpdir.getpath('daily_bars')
+        BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.SPLIT_DAY,
+        ).write(self.bars(before_split=True))
+
+        table = BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.sessions[-1],
+        ).append(self.bars(before_split=False))
+
+        self.assertEqual(
+            table.attrs['end_session_ns'],
+            self.sessions[-1].value,
+        )
+        self.assertEqual(
+            table.attrs['calendar_offset'],
+            {'1': 0, '2': 15, '3': 1, '4': 0, '5': 9, '6': 10},
+        )
+
+        reader = BcolzDailyBarReader(table)
+        columns = ['open', 'high', 'low', 'close', 'volume']
+        results = reader.load_raw_arrays(
+            columns,
+            self.sessions[0],
+            self.sessions[-1],
+            EQUITY_INFO.index,
+        )
+        for column, result in zip(columns, results):
+            assert_array_equal(
+                result,
+                expected_bar_values_2d(self.sessions, EQUITY_INFO, column),
+            )
+
+    def test_append_written_session(self):
+        path = self.tmpdir.getpath('written_daily_bars')
+        BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.SPLIT_DAY,
+        ).write(self.bars(before_split=True))
+
+        writer = BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.sessions[-1],
+        )
+        with self.assertRaises(ValueError):
+            writer.append(self.bars(before_split=True))
+
+        # The original table is left untouched.
+        reader = BcolzDailyBarReader(path)
+        self.assertEqual(reader.last_available_dt, self.SPLIT_DAY)
+
+    def test_append_in_place(self):
+        path = self.tmpdir.getpath('in_place_daily_bars')
+        BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.SPLIT_DAY,
+        ).write(
+            (sid, frame) for sid, frame in self.bars(before_split=True)
+            if sid in (1, 3)
+        )
+
+        # Asset 3 ends the table and asset 2 is new: the columns are
+        # extended without copying the table.
+        with patch.object(BcolzDailyBarWriter, '_write_internal') as write:
+            table = BcolzDailyBarWriter(
+                path,
+                self.trading_calendar,
+                self.sessions[0],
+                self.sessions[-1],
+            ).append(
+                (sid, frame) for sid, frame in self.bars(before_split=False)
+                if sid in (2, 3)
+            )
+        self.assertFalse(write.called)
+
+        self.assertEqual(
+            table.attrs['end_session_ns'],
+            self.sessions[-1].value,
+        )
+        self.assertEqual(table.attrs['calendar_offset'],
+                         {'1': 0, '2': 15, '3': 1})
+
+        assets = EQUITY_INFO.loc[[1, 2, 3]]
+        reader = BcolzDailyBarReader(table)
+        columns = ['open', 'high', 'low', 'close', 'volume']
+        results = reader.load_raw_arrays(
+            columns,
+            self.sessions[0],
+            self.sessions[-1],
+            assets.index,
+        )
+        for column, result in zip(columns, results):
+            assert_array_equal(
+                result,
+                expected_bar_values_2d(self.sessions, assets, column),
+            )
+
+    def test_append_missing_sessions(self):
+        path = self.tmpdir.getpath('gap_daily_bars')
+        BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.SPLIT_DAY,
+        ).write(self.bars(before_split=True))
+
+        bars = dict(self.bars(before_split=False))
+        skipped = bars[3].index[0]
+        bars[3] = bars[3].iloc[1:]
+
+        writer = BcolzDailyBarWriter(
+            path,
+            self.trading_calendar,
+            self.sessions[0],
+            self.sessions[-1],
+        )
+        with self.assertRaisesRegexp(ValueError, re.escape(repr(skipped))):
+            writer.append(iteritems(bars))
+
+        reader = BcolzDailyBarReader(path)
+        self.assertEqual(reader.last_available_dt, self.SPLIT_DAY)
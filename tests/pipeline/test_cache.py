@@ -0,0 +1,108 @@
+"""
+Tests for zipline.pipeline.cache
+"""
+import os
+
+from numpy import arange
+from numpy.testing import assert_array_equal
+import pandas as pd
+
+from zipline.pipeline import CustomFactor, TermCache
+from zipline.pipeline.data.testing import TestingDataSet
+from zipline.pipeline.factors import SimpleMovingAverage
+from zipline.testing import ZiplineTestCase
+from zipline.testing.fixtures import WithInstanceTmpDir
+
+
+def make_factor(offset):
+    class Offset(CustomFactor):
+        inputs = [TestingDataSet.float_col]
+        window_length = 1
+
+        if offset:
+            def compute(self, today, assets, out, floats):
+                out[:] = floats[0] + 1
+        else:
+            def compute(self, today, assets, out, floats):
+                out[:] = floats[0]
+
+    return Offset()
+
+
+class TermCacheTestCase(WithInstanceTmpDir, ZiplineTestCase):
+
+    dates = pd.date_range('2017-01-03', periods=4, tz='UTC')
+    assets = pd.Int64Index([1, 2, 3])
+
+    def init_instance_fixtures(self):
+        super(TermCacheTestCase, self).init_instance_fixtures()
+        self.path = self.instance_tmpdir.getpath('terms')
+        self.value = arange(12.0).reshape(4, 3)
+
+    def test_get_set(self):
+        cache = TermCache(self.path, 'v1')
+        sma = SimpleMovingAverage(
+            inputs=[TestingDataSet.float_col],
+            window_length=3,
+        )
+        self.assertIsNone(cache.get(sma, self.dates, self.assets))
+
+        cache.set(sma, self.dates, self.assets, self.value)
+        assert_array_equal(
+            cache.get(sma, self.dates, self.assets),
+            self.value,
+        )
+
+        # The same term with other labels or another data version.
+        self.assertIsNone(cache.get(sma, self.dates[1:], self.assets))
+        self.assertIsNone(cache.get(sma, self.dates, self.assets[1:]))
+        self.assertIsNone(
+            TermCache(self.path, 'v2').get(sma, self.dates, self.assets),
+        )
+
+        # The raw data of loadable terms isn't cached.
+        cache.set(TestingDataSet.float_col, self.dates, self.assets,
+                  self.value)
+        self.assertEqual(len(os.listdir(self.path)), 1)
+
+    def test_changed_code(self):
+        cache = TermCache(self.path, 'v1')
+        cache.set(make_factor(0), self.dates, self.assets, self.value)
+
+        assert_array_equal(
+            cache.get(make_factor(0), self.dates, self.assets),
+            self.value,
+        )
+        self.assertIsNone(cache.get(make_factor(1), self.dates, self.assets))
+
+    def test_eviction(self):
+        terms = [
+            SimpleMovingAverage(
+                inputs=[TestingDataSet.float_col],
+                window_length=window_length,
+            )
+            for window_length in range(2, 7)
+        ]
+        cache = TermCache(self.path, 'v1')
+        cache.set(terms[0], self.dates, self.assets, self.value)
+        nbytes = os.path.getsize(os.path.join(self.path,
+                                              os.listdir(self.path)[0]))
+
+        cache = TermCache(self.path, 'v1', max_nbytes=3 * nbytes)
+        for i, term in enumerate(terms[1:]):
+            # Keep the first term in use, and make the modification times of
+            # the values distinct.
+            os.utime(cache._filename(terms[0], self.dates, self.assets),
+                     (i, i + 1))
+            cache.set(term, self.dates, self.assets, self.value)
+            os.utime(cache._filename(term, self.dates, self.assets),
+                     (i, i + 0.5))
+
+        self.assertEqual(len(os.listdir(self.path)), 3)
+        for term in terms[0], terms[3], terms[4]:
+            self.assertIsNotNone(cache.get(term, self.dates, self.assets))
+        for term in terms[1:3]:
+            self.assertIsNone(cache.get(term, self.dates, self.assets))
+
+        cache.clear()
+        self.assertFalse(os.path.exists(self.path))
@@ -4,7 +4,9 @@ Tests for SimplePipelineEngine
 from __future__ import division
 from collections import OrderedDict
 from itertools import product
+from multiprocessing.pool import ThreadPool
 from operator import add, sub
+from os import listdir
 
 from nose_parameterized import parameterized
 from numpy import (
@@ -28,6 +30,7 @@ from pandas import (
     date_range,
     Int64Index,
     MultiIndex,
+    read_pickle,
     Series,
     Timestamp,
 )
@@ -40,10 +43,10 @@ from zipline.assets.synthetic import make_rotating_equity_info
 from zipline.errors import NoFurtherDataError
 from zipline.lib.adjustment import MULTIPLY
 from zipline.lib.labelarray import LabelArray
-from zipline.pipeline import CustomFactor, Pipeline
+from zipline.pipeline import CustomFactor, Pipeline, TermCache
 from zipline.pipeline.data import Column, DataSet, USEquityPricing
 from zipline.pipeline.data.testing import TestingDataSet
-from zipline.pipeline.engine import SimplePipelineEngine
+from zipline.pipeline.engine import PipelineEngine, SimplePipelineEngine
 from zipline.pipeline.factors import (
     AverageDollarVolume,
     EWMA,
@@ -51,6 +54,8 @@ from zipline.pipeline.factors import (
     ExponentialWeightedMovingAverage,
     ExponentialWeightedMovingStdDev,
     MaxDrawdown,
+    RollingPearsonOfReturns,
+    RollingSpearmanOfReturns,
     SimpleMovingAverage,
 )
 from zipline.pipeline.loaders.equity_pricing_loader import (
@@ -74,7 +79,9 @@ from zipline.testing import (
     OpenPrice,
     parameter_space,
     product_upper_triangle,
+    tmp_dir,
 )
+from zipline.testing.core import UnexpectedAttributeAccess
 from zipline.testing.fixtures import (
     WithAdjustmentReader,
     WithSeededRandomPipelineEngine,
@@ -84,6 +91,7 @@ from zipline.testing.fixtures import (
 from zipline.testing.predicates import assert_equal
 from zipline.utils.memoize import lazyval
 from zipline.utils.numpy_utils import bool_dtype, datetime64ns_dtype
+from zipline.utils.pool import SequentialPool
 
 
 class RollingSumDifference(CustomFactor):
@@ -1075,6 +1083,299 @@ class SyntheticBcolzTestCase(WithAdjustmentReader,
 
         assert_frame_equal(expected, result)
 
+    def test_concurrent_terms(self):
+        def make_engine(pool=None):
+            return SimplePipelineEngine(
+                lambda column: self.pipeline_loader,
+                self.trading_calendar.all_sessions,
+                self.asset_finder,
+                pool=pool,
+            )
+
+        dates = date_range(
+            self.first_asset_start + self.trading_calendar.day,
+            self.last_asset_end,
+            freq=self.trading_calendar.day,
+        )
+        close = USEquityPricing.close
+        columns = {
+            'sma_%d' % window_length: SimpleMovingAverage(
+                inputs=(close,),
+                window_length=window_length,
+            )
+            for window_length in range(2, 10)
+        }
+        columns['ewma'] = EWMA.from_span(
+            inputs=(close,),
+            window_length=5,
+            span=3,
+        )
+        columns['dollar_volume'] = AverageDollarVolume(window_length=3)
+        columns['rank'] = columns['sma_3'].rank()
+        columns['diff'] = columns['sma_3'] - columns['sma_9']
+        pipeline = Pipeline(
+            columns=columns,
+            screen=columns['dollar_volume'] > 0,
+        )
+
+        expected = make_engine().run_pipeline(pipeline, dates[9], dates[-1])
+
+        assert_frame_equal(
+            make_engine(SequentialPool()).run_pipeline(
+                pipeline, dates[9], dates[-1],
+            ),
+            expected,
+        )
+
+        pool = ThreadPool(4)
+        try:
+            assert_frame_equal(
+                make_engine(pool).run_pipeline(
+                    pipeline, dates[9], dates[-1],
+                ),
+                expected,
+            )
+
+            class Explodes(CustomFactor):
+                inputs = (close,)
+                window_length = 1
+
+                def compute(self, today, assets, out, close):
+                    raise ValueError('boom')
+
+            with self.assertRaises(ValueError):
+                make_engine(pool).run_pipeline(
+                    Pipeline(columns={'sma': columns['sma_2'],
+                                      'explodes': Explodes()}),
+                    dates[9],
+                    dates[-1],
+                )
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_asset_shards(self):
+        def make_engine(asset_shards=1, shard_processes=None):
+            return SimplePipelineEngine(
+                lambda column: self.pipeline_loader,
+                self.trading_calendar.all_sessions,
+                self.asset_finder,
+                asset_shards=asset_shards,
+                shard_processes=shard_processes,
+            )
+
+        dates = date_range(
+            self.first_asset_start + self.trading_calendar.day,
+            self.last_asset_end,
+            freq=self.trading_calendar.day,
+        )
+        close = USEquityPricing.close
+
+        class Demeaned(CustomFactor):
+            inputs = (close,)
+            window_length = 1
+            cross_sectional = True
+
+            def compute(self, today, assets, out, close):
+                out[:] = close[-1] - close[-1].mean()
+
+        sma = SimpleMovingAverage(inputs=(close,), window_length=5)
+        dollar_volume = AverageDollarVolume(window_length=3)
+        columns = {
+            'sma': sma,
+            'ewma': EWMA.from_span(inputs=(close,), window_length=5, span=3),
+            'rank': sma.rank(),
+            'demean': sma.demean(groupby=dollar_volume.quantiles(2)),
+            'zscore': sma.zscore(mask=dollar_volume.top(3)),
+            'custom': Demeaned(),
+            'sma_of_rank': SimpleMovingAverage(
+                inputs=(sma.rank(),),
+                window_length=2,
+            ),
+            'close': close.latest,
+        }
+        pipeline = Pipeline(columns=columns, screen=dollar_volume > 0)
+
+        expected = make_engine().run_pipeline(pipeline, dates[9], dates[-1])
+        for asset_shards, shard_processes in (2, None), (3, 2), (100, 4):
+            assert_frame_equal(
+                make_engine(asset_shards, shard_processes).run_pipeline(
+                    pipeline, dates[9], dates[-1],
+                ),
+                expected,
+            )
+
+    def test_asset_shards_single_asset(self):
+        def make_engine(asset_shards=1, shard_processes=None):
+            return SimplePipelineEngine(
+                lambda column: self.pipeline_loader,
+                self.trading_calendar.all_sessions,
+                self.asset_finder,
+                asset_shards=asset_shards,
+                shard_processes=shard_processes,
+            )
+
+        # The Returns of these factors are masked with a SingleAsset filter,
+        # which has to see the target asset.
+        target = self.asset_finder.retrieve_asset(self.all_asset_ids[2])
+        sessions = self.trading_calendar.all_sessions
+        start = sessions.get_loc(target.start_date)
+        pipeline = Pipeline(
+            columns={
+                'pearson': RollingPearsonOfReturns(
+                    target=target,
+                    returns_length=2,
+                    correlation_length=3,
+                ),
+                'spearman': RollingSpearmanOfReturns(
+                    target=target,
+                    returns_length=2,
+                    correlation_length=3,
+                ),
+            },
+        )
+        start_date, end_date = sessions[start + 4], sessions[start + 5]
+
+        expected = make_engine().run_pipeline(pipeline, start_date, end_date)
+        for asset_shards, shard_processes in (2, None), (3, 2):
+            assert_frame_equal(
+                make_engine(asset_shards, shard_processes).run_pipeline(
+                    pipeline, start_date, end_date,
+                ),
+                expected,
+            )
+
+    def test_run_chunked_pipeline(self):
+        engine = SimplePipelineEngine(
+            lambda column: self.pipeline_loader,
+            self.trading_calendar.all_sessions,
+            self.asset_finder,
+        )
+        self.assertIsInstance(engine, PipelineEngine)
+        dates = date_range(
+            self.first_asset_start + self.trading_calendar.day,
+            self.last_asset_end,
+            freq=self.trading_calendar.day,
+        )
+        sma = SimpleMovingAverage(
+            inputs=(USEquityPricing.close,),
+            window_length=10,
+        )
+        pipeline = Pipeline(
+            columns={
+                'sma': sma,
+                'rank': sma.rank(),
+                'close': USEquityPricing.close.latest,
+            },
+            screen=AverageDollarVolume(window_length=3) > 0,
+        )
+        start_date, end_date = dates[9], dates[-1]
+
+        expected = engine.run_pipeline(pipeline, start_date, end_date)
+        for chunksize in 1, 7, len(dates):
+            assert_frame_equal(
+                engine.run_chunked_pipeline(
+                    pipeline, start_date, end_date, chunksize,
+                ),
+                expected,
+            )
+
+        chunks = list(engine.iter_chunked_pipeline(
+            pipeline, start_date, end_date, 7,
+        ))
+        self.assertEqual(len(chunks), -(-(len(dates) - 9) // 7))
+        for chunk in chunks:
+            chunk_dates = chunk.index.get_level_values(0).unique()
+            self.assertLessEqual(len(chunk_dates), 7)
+            assert_frame_equal(chunk, expected.loc[chunk_dates])
+
+        with tmp_dir() as d:
+            filenames = engine.run_chunked_pipeline(
+                pipeline, start_date, end_date, 7, path=d.getpath('chunks'),
+            )
+            self.assertEqual(len(filenames), len(chunks))
+            for filename, chunk in zip(filenames, chunks):
+                assert_frame_equal(read_pickle(filename), chunk)
+
+    def test_run_chunked_pipeline_default(self):
+        calls = []
+
+        class Engine(PipelineEngine):
+            # An engine which only implements the abstract method.
+            def run_pipeline(self, pipeline, start_date, end_date):
+                calls.append((pipeline, start_date, end_date))
+                return DataFrame({'a': [1]})
+
+        sessions = self.trading_calendar.all_sessions
+        start_date, end_date = sessions[10], sessions[30]
+        result = Engine().run_chunked_pipeline(
+            Pipeline(), start_date, end_date, 7,
+        )
+
+        assert_frame_equal(result, DataFrame({'a': [1]}))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][1:], (start_date, end_date))
+
+    def test_term_cache(self):
+        dates = date_range(
+            self.first_asset_start + self.trading_calendar.day,
+            self.last_asset_end,
+            freq=self.trading_calendar.day,
+        )
+        sma = SimpleMovingAverage(
+            inputs=(USEquityPricing.close,),
+            window_length=5,
+        )
+        pipeline = Pipeline(
+            columns={
+                'sma': sma,
+                'rank': sma.rank(),
+                'close': USEquityPricing.close.latest,
+            },
+            screen=AverageDollarVolume(window_length=3) > 0,
+        )
+
+        with tmp_dir() as d:
+            def make_engine(loader, data_version='v1'):
+                return SimplePipelineEngine(
+                    lambda column: loader,
+                    self.trading_calendar.all_sessions,
+                    self.asset_finder,
+                    term_cache=TermCache(d.getpath('terms'), data_version),
+                )
+
+            expected = make_engine(self.pipeline_loader).run_pipeline(
+                pipeline, dates[9], dates[-1],
+            )
+            self.assertTrue(listdir(d.getpath('terms')))
+
+            # Every output is cached, so nothing is loaded.
+            assert_frame_equal(
+                make_engine(ExplodingObject()).run_pipeline(
+                    pipeline, dates[9], dates[-1],
+                ),
+                expected,
+            )
+
+            # Other pipelines reuse the terms they share with the first one.
+            zscore = Pipeline(columns={'zscore': sma.zscore()})
+            assert_frame_equal(
+                make_engine(ExplodingObject()).run_pipeline(
+                    zscore, dates[9], dates[-1],
+                ),
+                SimplePipelineEngine(
+                    lambda column: self.pipeline_loader,
+                    self.trading_calendar.all_sessions,
+                    self.asset_finder,
+                ).run_pipeline(zscore, dates[9], dates[-1]),
+            )
+
+            # Values computed from another version of the data are not read.
+            with self.assertRaises(UnexpectedAttributeAccess):
+                make_engine(ExplodingObject(), 'v2').run_pipeline(
+                    pipeline, dates[9], dates[-1],
+                )
+
 
 class ParameterizedFactorTestCase(WithTradingEnvironment, ZiplineTestCase):
     sids = ASSET_FINDER_EQUITY_SIDS = Int64Index([1, 2, 3])
@@ -6,7 +6,9 @@ from os.path import (
     join,
     realpath,
 )
+from threading import current_thread
 
+from mock import patch
 from nose_parameterized import parameterized
 import numpy as np
 from numpy import (
@@ -28,6 +30,7 @@ from pandas import (
     Timestamp,
 )
 from pandas.tseries.tools import normalize_date
+from pandas.util.testing import assert_frame_equal
 from six import iteritems, itervalues
 
 from zipline.algorithm import TradingAlgorithm
@@ -42,7 +45,7 @@ from zipline.errors import (
     NoSuchPipeline,
 )
 from zipline.lib.adjustment import MULTIPLY
-from zipline.pipeline import Pipeline
+from zipline.pipeline import Pipeline, SimplePipelineEngine
 from zipline.pipeline.factors import VWAP
 from zipline.pipeline.data import USEquityPricing
 from zipline.pipeline.loaders.frame import DataFrameLoader
@@ -344,6 +347,54 @@ class ClosesOnly(WithDataPortal, ZiplineTestCase):
         # Run for a week in the middle of our data.
         algo.run(self.data_portal)
 
+    def test_pipeline_lookahead(self):
+        """
+        Assert that the chunks after the first one are computed in the
+        background, with the same results.
+        """
+        run_pipeline = SimplePipelineEngine.run_pipeline
+
+        def run(pipeline_lookahead):
+            outputs = []
+            threads = []
+
+            def recording_run_pipeline(self, *args, **kwargs):
+                threads.append(current_thread().name)
+                return run_pipeline(self, *args, **kwargs)
+
+            def initialize(context):
+                p = attach_pipeline(Pipeline(), 'test', chunks=2)
+                p.add(USEquityPricing.close.latest, 'close')
+
+            def before_trading_start(context, data):
+                outputs.append(pipeline_output('test'))
+
+            algo = TradingAlgorithm(
+                initialize=initialize,
+                before_trading_start=before_trading_start,
+                data_frequency='daily',
+                get_pipeline_loader=lambda column: self.pipeline_loader,
+                start=self.first_asset_start,
+                end=self.last_asset_end,
+                env=self.env,
+                pipeline_lookahead=pipeline_lookahead,
+            )
+            with patch.object(SimplePipelineEngine,
+                              'run_pipeline',
+                              recording_run_pipeline):
+                algo.run(self.data_portal)
+            return outputs, threads
+
+        outputs, threads = run(pipeline_lookahead=True)
+        expected_outputs, expected_threads = run(pipeline_lookahead=False)
+
+        # 6 sessions in chunks of 3 sessions.
+        self.assertEqual(threads, ['MainThread', 'PipelinePrefetch'])
+        self.assertEqual(expected_threads, ['MainThread', 'MainThread'])
+        self.assertEqual(len(outputs), len(expected_outputs))
+        for output, expected in zip(outputs, expected_outputs):
+            assert_frame_equal(output, expected)
+
 
 class MockDailyBarSpotReader(object):
     """
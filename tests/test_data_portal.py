@@ -18,6 +18,7 @@ from numpy import array, append, nan, full
 from numpy.testing import assert_almost_equal
 import pandas as pd
 from pandas.tslib import Timedelta
+from pandas.util.testing import assert_frame_equal
 
 from zipline.assets import Equity, Future
 from zipline.data.data_portal import HISTORY_FREQUENCIES, OHLCV_FIELDS
@@ -370,6 +371,47 @@ class DataPortalTestBase(WithDataPortal,
         ]
         assert_almost_equal(expected.values.tolist(), result)
 
+    def test_get_spot_values(self):
+        equity = self.asset_finder.retrieve_asset(1)
+        future = self.asset_finder.retrieve_asset(10000)
+        trading_calendar = self.trading_calendars[Future]
+        dts = trading_calendar.minutes_for_session(self.trading_days[3])
+        fields = ['open', 'high', 'low', 'close', 'volume', 'price']
+
+        result = self.data_portal.get_spot_values(
+            assets=[equity, future],
+            fields=fields,
+            dt=dts[1],
+            data_frequency='minute',
+        )
+
+        expected = pd.DataFrame(
+            {
+                field: [
+                    self.data_portal.get_spot_value(
+                        assets=asset,
+                        field=field,
+                        dt=dts[1],
+                        data_frequency='minute',
+                    )
+                    for asset in (equity, future)
+                ]
+                for field in fields
+            },
+            index=[equity, future],
+        )
+        assert_frame_equal(expected[fields], result[fields],
+                           check_dtype=False)
+
+        # The lists returned for many assets match the single asset lookups.
+        for field in fields:
+            assert_almost_equal(
+                self.data_portal.get_spot_value(
+                    [equity, future], field, dts[1], 'minute',
+                ),
+                list(expected[field]),
+            )
+
     def test_bar_count_for_simple_transforms(self):
         # July 2015
         # Su Mo Tu We Th Fr Sa
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from textwrap import dedent
+import warnings
 
 from nose_parameterized import parameterized
 import numpy as np
@@ -23,6 +24,7 @@ from six import iteritems
 from zipline import TradingAlgorithm
 from zipline._protocol import handle_non_market_minutes, BarData
 from zipline.assets import Asset, Equity
+from zipline.data.history_loader import DailyHistoryLoader
 from zipline.errors import (
     HistoryInInitialize,
     HistoryWindowStartsBeforeData,
@@ -40,6 +42,7 @@ from zipline.testing.fixtures import (
     ZiplineTestCase,
     alias,
 )
+from zipline.zipline_warnings import ZiplineDeprecationWarning
 
 
 OHLC = ['open', 'high', 'low', 'close']
@@ -2090,6 +2093,160 @@ class DailyEquityHistoryTestCase(WithHistory, ZiplineTestCase):
             # we expect a nan value for this asset.
             assert_window_prices(window_4, [12, nan, 13, 14])
 
+    def test_adaptive_prefetch(self):
+        def make_loader(**kwargs):
+            return DailyHistoryLoader(
+                self.trading_calendar,
+                self.bcolz_equity_daily_bar_reader,
+                self.adjustment_reader,
+                self.asset_finder,
+                **kwargs
+            )
+
+        adaptive = make_loader(prefetch_length=2, max_prefetch_length=8)
+        fixed = make_loader(adaptive_prefetch=False)
+
+        sessions = self.bcolz_equity_daily_bar_reader.sessions
+        assets = [self.ASSET1, self.SPLIT_ASSET]
+        start = sessions.get_loc(pd.Timestamp('2014-12-31', tz='UTC'))
+
+        def check_history(end):
+            dts = sessions[end - 4:end + 1]
+            np.testing.assert_array_equal(
+                adaptive.history(assets, dts, 'close', False),
+                fixed.history(assets, dts, 'close', False),
+            )
+
+        # Consecutive windows use all of the prefetched sessions, the
+        # horizon grows to the window size and then doubles.
+        for end in range(start, start + 20):
+            check_history(end)
+
+        stats = adaptive.prefetch_stats['close', 5]
+        self.assertEqual(stats.length, 8)
+        self.assertEqual((stats.hits, stats.misses), (16, 4))
+
+        # Windows far apart never use the prefetched sessions, the horizon
+        # is halved on each load.
+        for end in range(start + 40, start + 120, 20):
+            check_history(end)
+
+        self.assertEqual(stats.length, 0)
+        self.assertEqual((stats.hits, stats.misses), (16, 8))
+        self.assertEqual(stats.values_loaded, 2 * (7 + 10 + 13 + 13 +
+                                                   9 + 7 + 6 + 5))
+
+    def make_history_loader(self, **kwargs):
+        return DailyHistoryLoader(
+            self.trading_calendar,
+            self.bcolz_equity_daily_bar_reader,
+            self.adjustment_reader,
+            self.asset_finder,
+            **kwargs
+        )
+
+    def test_window_block_reuse(self):
+        loader = self.make_history_loader(prefetch_length=5,
+                                          adaptive_prefetch=False)
+        sessions = self.bcolz_equity_daily_bar_reader.sessions
+        assets = [self.ASSET1, self.ASSET2]
+        start = sessions.get_loc(pd.Timestamp('2015-06-01', tz='UTC'))
+
+        for end in range(start, start + 6):
+            dts = sessions[end - 2:end + 1]
+            np.testing.assert_array_equal(
+                loader.history(assets, dts, 'close', False),
+                # A new loader computes the window without the cache.
+                self.make_history_loader().history(
+                    assets, dts, 'close', False,
+                ),
+            )
+
+        # The block of both assets is loaded once, with the 5 following
+        # sessions.
+        stats = loader.prefetch_stats['close', 3]
+        self.assertEqual((stats.hits, stats.misses), (5, 1))
+        self.assertEqual(stats.values_loaded, 2 * (3 + 5))
+
+    def test_window_block_adjustments(self):
+        loader = self.make_history_loader(prefetch_length=5,
+                                          adaptive_prefetch=False)
+        sessions = self.bcolz_equity_daily_bar_reader.sessions
+        assets = [self.ASSET1, self.SPLIT_ASSET]
+        # SPLIT_ASSET splits on 2015-01-06 and 2015-01-07.
+        start = sessions.get_loc(pd.Timestamp('2015-01-05', tz='UTC'))
+
+        windows = []
+        for end in range(start + 2, start + 5):
+            dts = sessions[end - 2:end + 1]
+            window = loader.history(assets, dts, 'close', False)
+            np.testing.assert_array_equal(
+                window,
+                self.make_history_loader().history(
+                    assets, dts, 'close', False,
+                ),
+            )
+            windows.append(window)
+
+        stats = loader.prefetch_stats['close', 3]
+        self.assertEqual((stats.hits, stats.misses), (2, 1))
+
+        # The window ending on 2015-01-07 has both splits applied to the
+        # earlier sessions, and only to the SPLIT_ASSET column.
+        raw = np.array([
+            [
+                self.bcolz_equity_daily_bar_reader.get_value(
+                    asset.sid, session, 'close',
+                )
+                for asset in assets
+            ]
+            for session in sessions[start:start + 3]
+        ])
+        np.testing.assert_almost_equal(
+            windows[0],
+            raw * np.array([[1, 0.125], [1, 0.5], [1, 1]]),
+            decimal=3,
+        )
+
+    def test_window_block_asset_order(self):
+        loader = self.make_history_loader(prefetch_length=5,
+                                          adaptive_prefetch=False)
+        sessions = self.bcolz_equity_daily_bar_reader.sessions
+        end = sessions.get_loc(pd.Timestamp('2015-01-08', tz='UTC'))
+        dts = sessions[end - 2:end + 1]
+
+        window = loader.history(
+            [self.ASSET1, self.SPLIT_ASSET], dts, 'close', False,
+        )
+        reversed_window = loader.history(
+            [self.SPLIT_ASSET, self.ASSET1], dts, 'close', False,
+        )
+
+        # Another order of the assets is another block, with the adjustments
+        # in the right columns.
+        stats = loader.prefetch_stats['close', 3]
+        self.assertEqual((stats.hits, stats.misses), (0, 2))
+        np.testing.assert_array_equal(reversed_window, window[:, ::-1])
+
+        # The first block is still cached.
+        np.testing.assert_array_equal(
+            loader.history(
+                [self.ASSET1, self.SPLIT_ASSET], dts, 'close', False,
+            ),
+            window,
+        )
+        self.assertEqual((stats.hits, stats.misses), (1, 2))
+
+    def test_sid_cache_size_deprecated(self):
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter('always')
+            self.make_history_loader(sid_cache_size=1000)
+
+        self.assertEqual(
+            [warning.category for warning in w],
+            [ZiplineDeprecationWarning],
+        )
+
 
 class NoPrefetchDailyEquityHistoryTestCase(DailyEquityHistoryTestCase):
     DATA_PORTAL_MINUTE_HISTORY_PREFETCH = 0
@@ -2,9 +2,11 @@
 Tests for live trading.
 """
 from unittest import TestCase
+import numpy as np
 import pandas as pd
 from datetime import time
 from collections import defaultdict
+from threading import Condition
 
 # fix to allow zip_longest on Python 2.X and 3.X
 try:                                    # Python 3
@@ -14,23 +16,33 @@ except ImportError:                     # Python 2
 
 import os
 
-from mock import patch, sentinel, Mock, MagicMock
+from mock import patch, sentinel, Mock, MagicMock, PropertyMock, call
 from testfixtures import tempdir
 
 from zipline.algorithm import TradingAlgorithm
 from zipline.algorithm_live import LiveTradingAlgorithm, LiveAlgorithmExecutor
+from zipline.data.data_portal_live import DataPortalLive
 from zipline.gens.realtimeclock import (RealtimeClock,
                                         SESSION_START,
+                                        BAR,
                                         BEFORE_TRADING_START_BAR)
 from zipline.gens.sim_engine import MinuteSimulationClock
 from zipline.gens.brokers.broker import Broker
-from zipline.gens.brokers.ib_broker import IBBroker
+from zipline.gens.brokers.ib_broker import IBBroker, TWSConnection
+from zipline.gens.brokers.tick_store import (MinuteBarHistory,
+                                             MinuteSealedSignal,
+                                             TickRingBuffer,
+                                             TickStore)
 from zipline.testing.fixtures import WithSimParams
 from zipline.utils.calendars import get_calendar
 from zipline.utils.calendars.trading_calendar import days_at_time
-from zipline.utils.serialization_utils import load_context, store_context
+from zipline.utils.serialization_utils import (load_context,
+                                               store_context,
+                                               ContextPersister)
 from zipline.testing.fixtures import ZiplineTestCase, WithTradingEnvironment
 from zipline.errors import CannotOrderDelistedAsset
+from zipline.finance.execution import MarketOrder
+from zipline.finance.order import ORDER_STATUS
 
 
 class TestRealtimeClock(TestCase):
@@ -193,6 +205,124 @@ class TestRealtimeClock(TestCase):
                               pd.Timestamp("2017-04-20 20:05", tz='UTC'))
             self.assertEquals(event_type, BEFORE_TRADING_START_BAR)
 
+    def test_sleeps_until_next_event(self):
+        """Tests that RealtimeClock sleeps until the next event instead of
+        polling"""
+        sleeps = []
+
+        def sleep_for(seconds):
+            sleeps.append(seconds)
+            self.internal_clock += pd.Timedelta(seconds=seconds)
+
+        with patch('zipline.gens.realtimeclock.pd.to_datetime') as to_dt, \
+                patch('zipline.gens.realtimeclock.sleep') as sleep:
+            rtc = RealtimeClock(
+                self.sessions,
+                self.opens,
+                self.closes,
+                days_at_time(self.sessions, time(8, 45), "US/Eastern"),
+                False
+            )
+            to_dt.side_effect = self.get_clock
+            sleep.side_effect = sleep_for
+            self.internal_clock = pd.Timestamp("2017-04-20 12:00:30",
+                                               tz='UTC')
+
+            events = list(rtc)
+
+        # Until before_trading_start, then until the open, then a minute
+        # between each bar.
+        assert sleeps[0] == 44 * 60 + 30
+        assert sleeps[1] == 46 * 60
+        assert sleeps[2:] == [60] * 389
+        assert len(events) == 1 + 1 + 390 + 1
+
+    def test_minute_ready_wakes_early(self):
+        """Tests that RealtimeClock emits a bar as soon as the broker reports
+        the minute as complete"""
+        minute_ready = Mock()
+        minute_ready.wait.return_value = True
+
+        with patch('zipline.gens.realtimeclock.pd.to_datetime') as to_dt, \
+                patch('zipline.gens.realtimeclock.sleep') as sleep:
+            rtc = RealtimeClock(
+                self.sessions,
+                self.opens,
+                self.closes,
+                days_at_time(self.sessions, time(8, 45), "US/Eastern"),
+                False,
+                minute_ready=minute_ready
+            )
+            to_dt.side_effect = self.get_clock
+            self.internal_clock = pd.Timestamp("2017-04-20 13:00", tz='UTC')
+
+            events = list(rtc)
+            assert not sleep.called
+
+        minute_ready.wait.assert_any_call(self.opens[0].tz_localize('UTC'),
+                                          31 * 60)
+        bars = [dt for dt, event_type in events if event_type == BAR]
+        assert bars == list(self.nyse_calendar.minutes_for_session(
+            self.sessions[0]))
+
+    def test_multiple_sessions(self):
+        """Tests that RealtimeClock runs through every session like
+        MinuteSimulationClock does"""
+        sessions = self.nyse_calendar.sessions_in_range(
+            pd.Timestamp("2017-04-19"),
+            pd.Timestamp("2017-04-24")
+        )
+        trading_o_and_c = self.nyse_calendar.schedule.ix[sessions]
+        opens = trading_o_and_c['market_open']
+        closes = trading_o_and_c['market_close']
+        before_trading_start_minutes = days_at_time(sessions, time(8, 45),
+                                                    "US/Eastern")
+
+        msc = MinuteSimulationClock(sessions, opens, closes,
+                                    before_trading_start_minutes, False)
+        msc_events = list(msc)
+
+        with patch('zipline.gens.realtimeclock.pd.to_datetime') as to_dt, \
+                patch('zipline.gens.realtimeclock.sleep') as sleep:
+            rtc = RealtimeClock(sessions, opens, closes,
+                                before_trading_start_minutes, False)
+            to_dt.side_effect = self.get_clock
+            sleep.side_effect = self.advance_clock
+            self.internal_clock = pd.Timestamp("2017-04-19 00:00", tz='UTC')
+
+            rtc_events = list(rtc)
+
+        self.assertEquals(rtc_events, msc_events)
+
+    def test_skips_past_sessions(self):
+        """Tests that RealtimeClock does not emit anything for sessions which
+        were over when it was started"""
+        sessions = self.nyse_calendar.sessions_in_range(
+            pd.Timestamp("2017-04-19"),
+            pd.Timestamp("2017-04-20")
+        )
+        trading_o_and_c = self.nyse_calendar.schedule.ix[sessions]
+
+        with patch('zipline.gens.realtimeclock.pd.to_datetime') as to_dt, \
+                patch('zipline.gens.realtimeclock.sleep') as sleep:
+            rtc = RealtimeClock(
+                sessions,
+                trading_o_and_c['market_open'],
+                trading_o_and_c['market_close'],
+                days_at_time(sessions, time(8, 45), "US/Eastern"),
+                False
+            )
+            to_dt.side_effect = self.get_clock
+            sleep.side_effect = self.advance_clock
+            self.internal_clock = pd.Timestamp("2017-04-20 15:00", tz='UTC')
+
+            events = list(rtc)
+
+        self.assertEquals(events[0], (sessions[1], SESSION_START))
+        self.assertEquals(
+            [event_type for _, event_type in events].count(SESSION_START), 1
+        )
+
 
 class TestPersistence(WithSimParams, WithTradingEnvironment, ZiplineTestCase):
     def noop(*args, **kwargs):
@@ -247,7 +377,9 @@ class TestPersistence(WithSimParams, WithTradingEnvironment, ZiplineTestCase):
                                         handle_data=handle_data_1)
 
         algo_1.initialize()
-        algo_1.handle_data(data=sentinel.data)
+        algo_1.event_manager.handle_data(algo_1, sentinel.data, sentinel.dt)
+        # The state is persisted in the background after the bar's events
+        algo_1._context_persister.flush()
 
         def initialize_2(context):
             assert False, "initialize shouldn't be called if state is loaded"
@@ -356,6 +488,139 @@ class TestPersistence(WithSimParams, WithTradingEnvironment, ZiplineTestCase):
         assert restored_context.trading_client is None
         assert restored_context.event_manager is None
 
+    @tempdir()
+    def test_context_persister(self, tmpdir):
+        class Context(object):
+            pass
+
+        state_file_path = os.path.join(tmpdir.path, "state_file")
+        persister = ContextPersister(state_file_path, 'robocop',
+                                     exclude_list=['trading_client'])
+
+        context = Context()
+        context.rsi = 17.2
+        context.history = [1, 2]
+        context.trading_client = lambda x: x + 3
+
+        persister.checkpoint(context)
+        persister.flush()
+
+        restored_context = Context()
+        load_context(state_file_path, restored_context, 'robocop')
+        assert restored_context.__dict__ == {'rsi': 17.2, 'history': [1, 2]}
+        assert not os.path.exists(state_file_path + '.tmp')
+
+        pickled_rsi = persister._serialized['rsi'][1]
+        pickled_history = persister._serialized['history'][1]
+
+        # The state file is not rewritten if no field changed.
+        os.remove(state_file_path)
+        persister.checkpoint(context)
+        persister.flush()
+        assert not os.path.exists(state_file_path)
+
+        context.history.append(3)
+        persister.checkpoint(context)
+        persister.wait_for_snapshot()
+        # The snapshot is serialized, so the context may change again.
+        context.history.append(4)
+        persister.close()
+
+        # The unchanged immutable field is not serialized again, the mutable
+        # one is.
+        assert persister._serialized['rsi'][1] is pickled_rsi
+        assert persister._serialized['history'][1] is not pickled_history
+
+        restored_context = Context()
+        load_context(state_file_path, restored_context, 'robocop')
+        assert restored_context.rsi == 17.2
+        assert restored_context.history == [1, 2, 3]
+
+    @tempdir()
+    def test_context_persister_mark_dirty(self, tmpdir):
+        class Context(object):
+            pass
+
+        state_file_path = os.path.join(tmpdir.path, "state_file")
+        persister = ContextPersister(state_file_path, 'robocop',
+                                     exclude_list=[],
+                                     reserialize_mutable=False)
+
+        context = Context()
+        context.history = [1, 2]
+        context.weights = {'A': 1}
+
+        persister.checkpoint(context)
+        persister.flush()
+        pickled_history = persister._serialized['history'][1]
+        pickled_weights = persister._serialized['weights'][1]
+
+        # Fields changed in place are only serialized again once marked.
+        context.history.append(3)
+        context.weights['B'] = 2
+        persister.checkpoint(context)
+        persister.flush()
+        assert persister._serialized['history'][1] is pickled_history
+        assert persister._serialized['weights'][1] is pickled_weights
+
+        persister.mark_dirty('history')
+        persister.checkpoint(context)
+        persister.flush()
+        assert persister._serialized['history'][1] is not pickled_history
+        assert persister._serialized['weights'][1] is pickled_weights
+
+        # A reassigned field is serialized again without being marked.
+        context.weights = {'C': 3}
+        persister.checkpoint(context)
+        persister.close()
+
+        restored_context = Context()
+        load_context(state_file_path, restored_context, 'robocop')
+        assert restored_context.history == [1, 2, 3]
+        assert restored_context.weights == {'C': 3}
+
+    @tempdir()
+    def test_context_persister_checkpoint_interval(self, tmpdir):
+        class Context(object):
+            pass
+
+        state_file_path = os.path.join(tmpdir.path, "state_file")
+        persister = ContextPersister(state_file_path, 'robocop',
+                                     exclude_list=[],
+                                     checkpoint_interval=3)
+        context = Context()
+
+        for i in range(5):
+            context.bar = i
+            persister.checkpoint(context)
+            persister.flush()
+            if i < 2:
+                assert not os.path.exists(state_file_path)
+
+        restored_context = Context()
+        load_context(state_file_path, restored_context, 'robocop')
+        assert restored_context.bar == 2
+
+        persister.checkpoint(context, force=True)
+        persister.close()
+
+        load_context(state_file_path, restored_context, 'robocop')
+        assert restored_context.bar == 4
+
+    @tempdir()
+    def test_context_persister_write_error(self, tmpdir):
+        class Context(object):
+            pass
+
+        state_file_path = os.path.join(tmpdir.path, "missing", "state_file")
+        persister = ContextPersister(state_file_path, 'robocop',
+                                     exclude_list=[])
+
+        persister.checkpoint(Context())
+        with self.assertRaises(IOError):
+            persister.flush()
+        persister.close()
+
 
 class TestLiveTradingAlgorithm(WithSimParams, WithTradingEnvironment,
                                ZiplineTestCase):
@@ -408,22 +673,28 @@ class TestIBBroker(WithSimParams, ZiplineTestCase):
 
     @patch('zipline.gens.brokers.ib_broker.TWSConnection')
     def test_get_spot_value(self, tws):
-        dt = None  # dt is not used in real broker
+        # The bar labelled 10:31 covers the trades in [10:30, 10:31)
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
         data_freq = 'minute'
         asset = self.env.asset_finder.retrieve_asset(1)
         bars = {'last_trade_price': [12, 10, 11, 14],
                 'last_trade_size': [1, 2, 3, 4],
                 'total_volume': [10, 10, 10, 10],
-                'vwap': [12.1, 10.1, 11.1, 14.1],
-                'single_trade_flag': [0, 1, 0, 1]}
+                'vwap': [12.1, 10.1, 11.1, 14.1]}
         last_trade_times = [pd.to_datetime('2017-06-16 10:30:00', utc=True),
                             pd.to_datetime('2017-06-16 10:30:11', utc=True),
                             pd.to_datetime('2017-06-16 10:30:30', utc=True),
-                            pd.to_datetime('2017-06-17 10:31:9', utc=True)]
-        index = pd.DatetimeIndex(last_trade_times)
+                            pd.to_datetime('2017-06-16 10:31:9', utc=True)]
         broker = IBBroker(sentinel.tws_uri)
-        tws.return_value.bars = {asset.symbol: pd.DataFrame(
-            index=index, data=bars)}
+        ticks = TickStore()
+        for i, last_trade_time in enumerate(last_trade_times):
+            ticks.add_tick(asset.symbol,
+                           bars['last_trade_price'][i],
+                           bars['last_trade_size'][i],
+                           last_trade_time.value // 1000000,
+                           bars['total_volume'][i],
+                           bars['vwap'][i])
+        tws.return_value.bars = ticks
 
         price = broker.get_spot_value(asset, 'price', dt, data_freq)
         last_trade = broker.get_spot_value(asset, 'last_traded', dt, data_freq)
@@ -433,12 +704,488 @@ class TestIBBroker(WithSimParams, ZiplineTestCase):
         close = broker.get_spot_value(asset, 'close', dt, data_freq)
         volume = broker.get_spot_value(asset, 'volume', dt, data_freq)
 
-        # Only the last minute is taken into account, therefore
-        # the first bar is ignored
+        # price and last_traded reflect the last tick, the OHLCV fields only
+        # the ticks of the requested minute, therefore the last tick is
+        # ignored for those
         assert price == bars['last_trade_price'][-1]
         assert last_trade == last_trade_times[-1]
-        assert open_ == bars['last_trade_price'][1]
-        assert high == max(bars['last_trade_price'][1:])
-        assert low == min(bars['last_trade_price'][1:])
-        assert close == bars['last_trade_price'][-1]
-        assert volume == sum(bars['last_trade_size'][1:])
+        assert open_ == bars['last_trade_price'][0]
+        assert high == max(bars['last_trade_price'][:-1])
+        assert low == min(bars['last_trade_price'][:-1])
+        assert close == bars['last_trade_price'][-2]
+        assert volume == sum(bars['last_trade_size'][:-1])
+
+        # Without dt the minute currently being built is used
+        assert broker.get_spot_value(asset, 'open', None, data_freq) == \
+            bars['last_trade_price'][-1]
+        assert broker.get_spot_value(asset, 'volume', None, data_freq) == \
+            bars['last_trade_size'][-1]
+
+        # Minutes without trades have no price and zero volume
+        empty_dt = pd.Timestamp('2017-06-16 10:29', tz='UTC')
+        assert np.isnan(broker.get_spot_value(asset, 'close', empty_dt,
+                                              data_freq))
+        assert broker.get_spot_value(asset, 'volume', empty_dt,
+                                     data_freq) == 0
+
+    @patch('zipline.gens.brokers.ib_broker.TWSConnection')
+    def test_get_spot_values(self, tws):
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
+        asset = self.env.asset_finder.retrieve_asset(1)
+        unsubscribed = Mock(symbol='UNSUBSCRIBED')
+        broker = IBBroker(sentinel.tws_uri)
+        ticks = TickStore()
+        last_trade_time = pd.Timestamp('2017-06-16 10:30:30', tz='UTC')
+        ticks.add_tick(asset.symbol, 12.0, 3,
+                       last_trade_time.value // 1000000, 3, 12.0)
+        tws.return_value.bars = ticks
+
+        fields = ['price', 'last_traded', 'open', 'volume']
+        values = broker.get_spot_values([asset, unsubscribed], fields, dt,
+                                        'minute')
+
+        assert list(values.index) == [asset, unsubscribed]
+        for field in fields:
+            assert values.loc[asset, field] == \
+                broker.get_spot_value(asset, field, dt, 'minute')
+
+        assert values.loc[unsubscribed, 'last_traded'] is pd.NaT
+        assert values.loc[unsubscribed, ['price', 'open', 'volume']] \
+            .isnull().all()
+        tws.return_value.subscribe_to_market_data.assert_called_with(
+            'UNSUBSCRIBED'
+        )
+
+    @patch('zipline.gens.brokers.ib_broker.TWSConnection')
+    def test_get_minute_bars(self, tws):
+        asset = self.env.asset_finder.retrieve_asset(1)
+        unsubscribed = Mock(symbol='UNSUBSCRIBED')
+        broker = IBBroker(sentinel.tws_uri)
+        ticks = TickStore()
+        for price, minute in ((10.0, '10:30:10'), (11.0, '10:30:50'),
+                              (12.0, '10:32:05')):
+            dt = pd.Timestamp('2017-06-16 ' + minute, tz='UTC')
+            ticks.add_tick(asset.symbol, price, 1, dt.value // 1000000, 1,
+                           price)
+        tws.return_value.bars = ticks
+
+        bars = broker.get_minute_bars(
+            [asset, unsubscribed],
+            'price',
+            pd.Timestamp('2017-06-16 10:31', tz='UTC'),
+            pd.Timestamp('2017-06-16 10:32', tz='UTC'),
+        )
+
+        assert list(bars.columns) == [asset, unsubscribed]
+        assert list(bars.index) == [
+            pd.Timestamp('2017-06-16 10:31', tz='UTC'),
+            pd.Timestamp('2017-06-16 10:32', tz='UTC'),
+        ]
+        assert bars[asset].iloc[0] == 11.0
+        assert np.isnan(bars[asset].iloc[1])
+        assert bars[unsubscribed].isnull().all()
+
+        with self.assertRaises(ValueError):
+            broker.get_minute_bars([asset], 'vwap', None, None)
+
+    @patch('zipline.gens.brokers.ib_broker.TWSConnection')
+    def test_order_indexes(self, tws):
+        asset = self.env.asset_finder.retrieve_asset(1)
+        type(tws.return_value).next_order_id = PropertyMock(
+            side_effect=[101, 102, 103])
+        broker = IBBroker(sentinel.tws_uri)
+
+        zp_order_ids = [broker.order(asset, 100, None, None, MarketOrder())
+                        for _ in range(3)]
+
+        assert broker._get_zp_order_id(102) == zp_order_ids[1]
+        assert broker._get_zp_order_id(999) is None
+        assert [o.id for o in broker.get_open_orders(asset)] == zp_order_ids
+
+        broker._order_update(101, 'Filled', 100)
+        broker._order_update(103, 'Cancelled', 0)
+        # Updates for orders of previous sessions are ignored
+        broker._order_update(999, 'Filled', 100)
+
+        assert broker.get_order(zp_order_ids[0]).status == \
+            ORDER_STATUS.FILLED
+        assert [o.id for o in broker.get_open_orders(asset)] == \
+            [zp_order_ids[1]]
+        assert list(broker.get_open_orders(None)) == [asset]
+
+        broker._order_update(102, 'Filled', 100)
+        assert broker.get_open_orders(asset) == []
+        assert broker.get_open_orders(None) == {}
+
+    @patch('zipline.gens.brokers.ib_broker.symbol_lookup')
+    @patch('zipline.gens.brokers.ib_broker.TWSConnection')
+    def test_cached_portfolio(self, tws, symbol_lookup):
+        asset = self.env.asset_finder.retrieve_asset(1)
+        symbol_lookup.side_effect = lambda symbol: asset
+        broker = IBBroker(sentinel.tws_uri)
+        broker.account_id = 'DU123'
+        broker.currency = 'USD'
+
+        tws.return_value.accounts = {
+            'DU123': {
+                'USD': defaultdict(lambda: 1.0, TotalCashValue=100.0),
+                '': defaultdict(lambda: 1.0),
+            }
+        }
+        tws.return_value.accounts_version = 1
+        tws.return_value.positions = {
+            asset.symbol: Mock(position=10, market_price=12.5),
+        }
+        tws.return_value.pop_dirty_positions.return_value = {asset.symbol}
+
+        portfolio = broker.portfolio
+        account = broker.account
+        assert portfolio.cash == 100.0
+        assert portfolio.positions[asset].amount == 10
+        assert portfolio.positions[asset].cost_basis == 12.5
+
+        # Changes made by the caller don't leak into the broker's state
+        portfolio.cash = 0.0
+        portfolio.positions[asset].amount = 0
+        account.buying_power = 0.0
+
+        # Nothing changed: the cached state is returned without a refresh
+        tws.return_value.accounts['DU123']['USD']['TotalCashValue'] = 50.0
+        tws.return_value.pop_dirty_positions.return_value = set()
+        assert broker.portfolio is not portfolio
+        assert broker.portfolio.cash == 100.0
+        assert broker.portfolio.positions[asset].amount == 10
+        assert broker.account.buying_power == 1.0
+
+        # Only the reported changes are applied
+        tws.return_value.accounts_version = 2
+        tws.return_value.positions[asset.symbol] = Mock(position=20,
+                                                        market_price=13.0)
+        tws.return_value.pop_dirty_positions.return_value = {asset.symbol}
+        assert broker.portfolio.cash == 50.0
+        assert broker.positions[asset].amount == 20
+        assert symbol_lookup.call_count == 1
+
+    @patch('zipline.gens.brokers.ib_broker.TWSConnection')
+    def test_subscribe_to_universe(self, tws):
+        asset = self.env.asset_finder.retrieve_asset(1)
+        missing = Mock(symbol='MISSING')
+        tws.return_value.wait_for_market_data.return_value = {asset.symbol}
+        broker = IBBroker(sentinel.tws_uri)
+
+        ready = broker.subscribe_to_universe([missing, asset], timeout=5)
+
+        assert ready == [asset]
+        tws.return_value.subscribe_to_market_data.assert_has_calls(
+            [call('MISSING'), call(asset.symbol)])
+        tws.return_value.wait_for_market_data.assert_called_once_with(
+            ['MISSING', asset.symbol], 5)
+
+    def test_market_data_readiness(self):
+        tws = TWSConnection.__new__(TWSConnection)
+        tws.ticker_id_to_symbol = {0: 'SPY', 1: 'BOGUS', 2: 'ILLIQUID'}
+        tws._ready_symbols = set()
+        tws._failed_symbols = set()
+        tws._market_data_ready = Condition()
+        tws.bars = TickStore()
+
+        assert tws.wait_for_market_data(['SPY', 'BOGUS'], 0) == set()
+
+        # Only a trade makes the market data ready
+        tws.tickPrice(0, 9, 212.5, False)
+        tws.tickString(0, 48, ';0;1469805548873;240304;216.648653;true')
+        assert tws.wait_for_market_data(['SPY'], 0) == set()
+
+        tws.tickString(0, 48, '212.5;100;1469805548873;240404;212.4;true')
+        tws.error(1, 200, 'No security definition has been found')
+
+        # Both subscriptions are resolved, so this does not block
+        assert tws.wait_for_market_data(['SPY', 'BOGUS']) == {'SPY'}
+        assert tws.wait_for_market_data(['SPY', 'ILLIQUID'], 0.01) == \
+            {'SPY'}
+
+
+class TestDataPortalLive(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.nyse_calendar = get_calendar("NYSE")
+
+    def make_data_portal(self, broker):
+        data_portal = DataPortalLive.__new__(DataPortalLive)
+        data_portal.broker = broker
+        data_portal.trading_calendar = self.nyse_calendar
+        data_portal._live_history_cache = {}
+        data_portal._live_history_dt = None
+        return data_portal
+
+    def test_minute_history_includes_live_bars(self):
+        asset = sentinel.asset
+        end_dt = pd.Timestamp('2017-04-20 13:33', tz='UTC')
+        live_index = pd.DatetimeIndex(['2017-04-20 13:31', '2017-04-20 13:33'],
+                                      tz='UTC')
+        broker = Mock()
+        broker.get_minute_bars.return_value = pd.DataFrame(
+            {asset: [10.0, 12.0]}, index=live_index)
+
+        history_index = pd.DatetimeIndex(['2017-04-19 19:59',
+                                          '2017-04-19 20:00'], tz='UTC')
+        history_window = pd.DataFrame({asset: [8.0, 9.0]},
+                                      index=history_index)
+
+        data_portal = self.make_data_portal(broker)
+        with patch('zipline.data.data_portal.DataPortal.get_history_window',
+                   return_value=history_window) as get_history_window:
+            window = data_portal.get_history_window(
+                [asset], end_dt, 5, '1m', 'price', 'minute')
+
+            # The bundle is only asked for the bars before today's session.
+            get_history_window.assert_called_once_with(
+                [asset], pd.Timestamp('2017-04-19 20:00', tz='UTC'), 2,
+                '1m', 'price', 'minute', True)
+
+            # Repeated calls in the same minute are served from the cache.
+            cached = data_portal.get_history_window(
+                [asset], end_dt, 5, '1m', 'price', 'minute')
+            assert get_history_window.call_count == 1
+            assert broker.get_minute_bars.call_count == 1
+
+        expected_index = history_index.append(pd.DatetimeIndex(
+            ['2017-04-20 13:31', '2017-04-20 13:32', '2017-04-20 13:33'],
+            tz='UTC'))
+        assert list(window.index) == list(expected_index)
+        # price is forward filled over the minute without trades
+        assert list(window[asset]) == [8.0, 9.0, 10.0, 10.0, 12.0]
+        assert cached.equals(window)
+
+    def test_minute_history_within_session(self):
+        asset = sentinel.asset
+        end_dt = pd.Timestamp('2017-04-20 13:33', tz='UTC')
+        broker = Mock()
+        broker.get_minute_bars.return_value = pd.DataFrame(
+            {asset: [1, 2]}, index=pd.DatetimeIndex(
+                ['2017-04-20 13:32', '2017-04-20 13:33'], tz='UTC'))
+
+        data_portal = self.make_data_portal(broker)
+        with patch('zipline.data.data_portal.DataPortal.get_history_window') \
+                as get_history_window:
+            window = data_portal.get_history_window(
+                [asset], end_dt, 3, '1m', 'volume', 'minute')
+            assert not get_history_window.called
+
+        assert list(window[asset]) == [0, 1, 2]
+
+    def test_minute_history_fills_leading_prices(self):
+        asset = sentinel.asset
+        end_dt = pd.Timestamp('2017-04-20 13:34', tz='UTC')
+
+        # The price of an earlier minute of the session is carried into the
+        # window without reading the bundle.
+        broker = Mock()
+        broker.get_minute_bars.return_value = pd.DataFrame(
+            {asset: [10.0, 12.0]}, index=pd.DatetimeIndex(
+                ['2017-04-20 13:31', '2017-04-20 13:34'], tz='UTC'))
+        data_portal = self.make_data_portal(broker)
+        with patch('zipline.data.data_portal.DataPortal.get_history_window') \
+                as get_history_window:
+            window = data_portal.get_history_window(
+                [asset], end_dt, 2, '1m', 'price', 'minute')
+            assert not get_history_window.called
+
+        assert list(window[asset]) == [10.0, 12.0]
+
+        # Before the first trade of the session the bundle's last price is
+        # used.
+        broker.get_minute_bars.return_value = pd.DataFrame(
+            {asset: [12.0]}, index=pd.DatetimeIndex(
+                ['2017-04-20 13:34'], tz='UTC'))
+        history_window = pd.DataFrame(
+            {asset: [9.0]},
+            index=pd.DatetimeIndex(['2017-04-19 20:00'], tz='UTC'))
+        data_portal = self.make_data_portal(broker)
+        with patch('zipline.data.data_portal.DataPortal.get_history_window',
+                   return_value=history_window) as get_history_window:
+            window = data_portal.get_history_window(
+                [asset], end_dt, 2, '1m', 'price', 'minute')
+            get_history_window.assert_called_once_with(
+                [asset], pd.Timestamp('2017-04-19 20:00', tz='UTC'), 1,
+                '1m', 'price', 'minute', True)
+
+        assert list(window.index) == list(pd.DatetimeIndex(
+            ['2017-04-20 13:33', '2017-04-20 13:34'], tz='UTC'))
+        assert list(window[asset]) == [9.0, 12.0]
+
+
+class TestTickStore(TestCase):
+    def test_ring_buffer_wraps_around(self):
+        ticks = TickRingBuffer(capacity=4)
+        for i in range(10):
+            ticks.append(float(i), i, 1000 * i, 10 * i, float(i))
+
+        assert len(ticks) == 4
+        np.testing.assert_array_equal(ticks.window('last_trade_price'),
+                                      [6., 7., 8., 9.])
+        np.testing.assert_array_equal(ticks.window('last_trade_time'),
+                                      [6000, 7000, 8000, 9000])
+        assert ticks.last('total_volume') == 90
+        assert ticks.last_trade_dt == pd.Timestamp(9, unit='s', tz='UTC')
+
+        # Windows are views into the buffer, not copies.
+        assert not ticks.window('vwap').flags.owndata
+        assert not ticks.window('vwap').flags.writeable
+
+    def test_window_start(self):
+        ticks = TickRingBuffer(capacity=8)
+        for i in range(6):
+            ticks.append(float(i), i, 1000 * i, 10 * i, float(i))
+
+        windows = ticks.windows(start_ms=3000)
+        np.testing.assert_array_equal(windows['last_trade_size'], [3, 4, 5])
+        np.testing.assert_array_equal(windows['vwap'], [3., 4., 5.])
+
+    def test_retention(self):
+        ticks = TickRingBuffer(capacity=8, retention=pd.Timedelta('2s'))
+        for i in range(6):
+            ticks.append(float(i), i, 1000 * i, 10 * i, float(i))
+
+        np.testing.assert_array_equal(ticks.window('last_trade_price'),
+                                      [3., 4., 5.])
+        np.testing.assert_array_equal(
+            ticks.window('last_trade_price', start_ms=4000),
+            [4., 5.],
+        )
+
+    def test_empty(self):
+        ticks = TickRingBuffer(capacity=4)
+        assert len(ticks) == 0
+        assert len(ticks.window('last_trade_price')) == 0
+        assert ticks.last_trade_dt is pd.NaT
+        with self.assertRaises(IndexError):
+            ticks.last('last_trade_price')
+
+    def test_get_values(self):
+        store = TickStore(capacity=4)
+        store.add_tick('SPY', 1.0, 1, 61000, 1, 1.0)
+        store.add_tick('SPY', 2.0, 2, 62000, 3, 1.5)
+        store.add_tick('QQQ', 5.0, 7, 125000, 7, 5.0)
+
+        values = store.get_values(
+            ['SPY', 'MISSING', 'QQQ'],
+            ['price', 'last_traded', 'high', 'volume', 'unknown'],
+            pd.Timestamp(2, unit='m', tz='UTC'),
+        )
+
+        np.testing.assert_array_equal(values, [
+            [2.0, np.nan, 5.0],
+            [62000, np.nan, 125000],
+            [2.0, np.nan, np.nan],
+            [3, np.nan, 0],
+            [np.nan, np.nan, np.nan],
+        ])
+
+    def test_tick_store(self):
+        store = TickStore(capacity=4)
+        assert 'SPY' not in store
+
+        store.add_tick('SPY', 1.0, 1, 1000, 1, 1.0)
+        store.add_tick('SPY', 2.0, 1, 2000, 2, 1.5)
+
+        assert 'SPY' in store
+        assert list(store) == ['SPY']
+        assert store['SPY'].capacity == 4
+        assert len(store['SPY']) == 2
+
+
+class TestMinuteBarHistory(TestCase):
+    @staticmethod
+    def ms(dt):
+        return pd.Timestamp(dt, tz='UTC').value // 1000000
+
+    def test_fold_ticks_into_minutes(self):
+        bars = MinuteBarHistory(capacity=16)
+        bars.add_tick(10.0, 1, self.ms('2017-06-16 10:30:00'))
+        bars.add_tick(12.0, 2, self.ms('2017-06-16 10:30:20'))
+        bars.add_tick(9.0, 3, self.ms('2017-06-16 10:30:59.999'))
+        bars.add_tick(11.0, 4, self.ms('2017-06-16 10:33:01'))
+
+        # 10:31 is sealed, 10:32 and 10:33 had no trades, 10:34 is current
+        assert len(bars) == 4
+
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
+        assert bars.get_value('open', dt) == 10.0
+        assert bars.get_value('high', dt) == 12.0
+        assert bars.get_value('low', dt) == 9.0
+        assert bars.get_value('close', dt) == 9.0
+        assert bars.get_value('volume', dt) == 6
+
+        empty_dt = pd.Timestamp('2017-06-16 10:33', tz='UTC')
+        assert np.isnan(bars.get_value('open', empty_dt))
+        assert bars.get_value('volume', empty_dt) == 0
+
+        assert bars.get_value('close') == 11.0
+        assert bars.get_value(
+            'close', pd.Timestamp('2017-06-16 10:34', tz='UTC')) == 11.0
+
+        # Outside of the retained minutes
+        assert np.isnan(bars.get_value(
+            'close', pd.Timestamp('2017-06-16 10:35', tz='UTC')))
+        assert bars.get_value(
+            'volume', pd.Timestamp('2017-06-16 10:00', tz='UTC')) == 0
+
+    def test_late_tick_updates_sealed_minute(self):
+        bars = MinuteBarHistory(capacity=16)
+        bars.add_tick(10.0, 1, self.ms('2017-06-16 10:30:10'))
+        bars.add_tick(11.0, 1, self.ms('2017-06-16 10:31:10'))
+        bars.add_tick(13.0, 5, self.ms('2017-06-16 10:30:50'))
+
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
+        assert bars.get_value('high', dt) == 13.0
+        assert bars.get_value('volume', dt) == 6
+        assert bars.get_value('volume') == 1
+
+    def test_window(self):
+        bars = MinuteBarHistory(capacity=4)
+        start = pd.Timestamp('2017-06-16 10:30')
+        for i in range(6):
+            bars.add_tick(float(i), i,
+                          self.ms(start + pd.Timedelta(minutes=i)))
+
+        # Only the last 4 minutes are retained: 10:33 .. 10:36
+        np.testing.assert_array_equal(bars.window('close'), [2., 3., 4., 5.])
+        windows = bars.windows(
+            start_dt=pd.Timestamp('2017-06-16 10:34', tz='UTC'),
+            end_dt=pd.Timestamp('2017-06-16 10:35', tz='UTC'),
+        )
+        np.testing.assert_array_equal(windows['close'], [3., 4.])
+        np.testing.assert_array_equal(windows['volume'], [3, 4])
+
+    def test_gap_longer_than_capacity_resets(self):
+        bars = MinuteBarHistory(capacity=4)
+        bars.add_tick(1.0, 1, self.ms('2017-06-16 10:30'))
+        bars.add_tick(2.0, 1, self.ms('2017-06-17 10:30'))
+
+        assert len(bars) == 1
+        assert bars.get_value('close') == 2.0
+
+
+class TestMinuteSealedSignal(TestCase):
+    def test_seal(self):
+        signal = MinuteSealedSignal()
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
+
+        assert not signal.wait(dt, 0.01)
+
+        signal.seal(dt.value // (60 * 10 ** 9))
+        assert signal.wait(dt, 0.01)
+        assert signal.wait(dt - pd.Timedelta('1 min'), 0.01)
+        assert not signal.wait(dt + pd.Timedelta('1 min'), 0.01)
+
+    def test_tick_store_seals_previous_minute(self):
+        store = TickStore(capacity=4)
+        signal = store.minute_sealed
+        dt = pd.Timestamp('2017-06-16 10:31', tz='UTC')
+
+        store.add_tick('SPY', 1.0, 1, dt.value // 10 ** 6 - 1, 1, 1.0)
+        assert not signal.wait(dt, 0)
+
+        store.add_tick('SPY', 1.0, 1, dt.value // 10 ** 6, 2, 1.0)
+        assert signal.wait(dt, 0)
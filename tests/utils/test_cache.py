@@ -1,8 +1,14 @@
 from unittest import TestCase
 
+from numpy import zeros
 from pandas import Timestamp, Timedelta
 
-from zipline.utils.cache import CachedObject, Expired, ExpiringCache
+from zipline.utils.cache import (
+    ArrayCache,
+    CachedObject,
+    Expired,
+    ExpiringCache,
+)
 
 
 class CachedObjectTestCase(TestCase):
@@ -58,3 +64,59 @@ class ExpiringCacheTestCase(TestCase):
         with self.assertRaises(KeyError) as e:
             self.assertEqual(cache.get('baz', expiry_3))
         self.assertEqual(e.exception.args, ('baz',))
+
+
+class ArrayCacheTestCase(TestCase):
+
+    def test_array_cache(self):
+        cache = ArrayCache(100)
+
+        cache.set('foo', zeros(5))
+        cache.set('bar', zeros(5))
+        self.assertEqual(cache.nbytes, 80)
+
+        # Reading foo makes bar the least recently used array.
+        self.assertEqual(len(cache.get('foo')), 5)
+        cache.set('baz', zeros(4))
+        self.assertEqual(cache.nbytes, 72)
+        self.assertNotIn('bar', cache)
+        self.assertIn('foo', cache)
+
+        with self.assertRaises(KeyError) as e:
+            cache.get('bar')
+        self.assertEqual(e.exception.args, ('bar',))
+
+        # Replacing an array releases its bytes.
+        cache.set('foo', zeros(1))
+        self.assertEqual(cache.nbytes, 40)
+        self.assertEqual(len(cache), 2)
+
+        # Arrays larger than the budget are not cached.
+        cache.set('big', zeros(13))
+        self.assertNotIn('big', cache)
+        self.assertEqual(cache.nbytes, 40)
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+    def test_expiring_array_cache(self):
+        expiry = Timestamp('2014')
+        after = expiry + Timedelta('1 minute')
+
+        def sizeof(cached):
+            return cached._unsafe_get_value().nbytes
+
+        cache = ExpiringCache(ArrayCache(100, sizeof=sizeof))
+        cache.set('foo', zeros(5), expiry)
+        cache.set('bar', zeros(5), expiry)
+        self.assertEqual(len(cache.get('foo', expiry)), 5)
+
+        # The budget is enforced on the wrapped values.
+        cache.set('baz', zeros(4), expiry)
+        with self.assertRaises(KeyError):
+            cache.get('bar', expiry)
+
+        # Expired values are deleted from the array cache.
+        with self.assertRaises(KeyError):
+            cache.get('foo', after)
+        self.assertEqual(cache._cache.nbytes, 32)
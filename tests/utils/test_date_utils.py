@@ -0,0 +1,64 @@
+"""
+Tests for zipline/utils/date_utils.py
+"""
+import pandas as pd
+
+from zipline.testing import ZiplineTestCase
+from zipline.utils.calendars import get_calendar
+from zipline.utils.date_utils import compute_date_chunks
+
+
+def T(s):
+    return pd.Timestamp(s, tz='UTC')
+
+
+class TestDateUtils(ZiplineTestCase):
+
+    @classmethod
+    def init_class_fixtures(cls):
+        super(TestDateUtils, cls).init_class_fixtures()
+        cls.calendar = get_calendar('NYSE')
+
+    def test_compute_date_chunks(self):
+        sessions = self.calendar.sessions_in_range(
+            T('2017-01-03'), T('2017-01-31'),
+        )
+
+        self.assertEqual(
+            list(compute_date_chunks(
+                sessions, T('2017-01-03'), T('2017-01-31'), 10,
+            )),
+            [
+                (T('2017-01-03'), T('2017-01-17')),
+                (T('2017-01-18'), T('2017-01-31')),
+            ],
+        )
+        self.assertEqual(
+            list(compute_date_chunks(
+                sessions, T('2017-01-05'), T('2017-01-06'), None,
+            )),
+            [(T('2017-01-05'), T('2017-01-06'))],
+        )
+
+    def test_compute_date_chunks_invalid_input(self):
+        sessions = self.calendar.sessions_in_range(
+            T('2017-05-01'), T('2017-05-31'),
+        )
+
+        # Start date not found in calendar
+        with self.assertRaises(KeyError):
+            compute_date_chunks(
+                sessions, T('2017-05-06'), T('2017-05-15'), 30,
+            )
+
+        # End date not found in calendar
+        with self.assertRaises(KeyError):
+            compute_date_chunks(
+                sessions, T('2017-05-01'), T('2017-05-27'), 30,
+            )
+
+        # End date before start date
+        with self.assertRaises(ValueError):
+            compute_date_chunks(
+                sessions, T('2017-05-30'), T('2017-05-02'), 30,
+            )
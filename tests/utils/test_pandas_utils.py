@@ -4,7 +4,10 @@ Tests for zipline/utils/pandas_utils.py
 import pandas as pd
 
 from zipline.testing import parameter_space, ZiplineTestCase
-from zipline.utils.pandas_utils import nearest_unequal_elements
+from zipline.utils.pandas_utils import (
+    categorical_df_concat,
+    nearest_unequal_elements,
+)
 
 
 class TestNearestUnequalElements(ZiplineTestCase):
@@ -80,3 +83,33 @@ class TestNearestUnequalElements(ZiplineTestCase):
             str(e.exception),
             'dts must be sorted in increasing order',
         )
+
+
+class TestCategoricalDfConcat(ZiplineTestCase):
+
+    def test_categorical_df_concat(self):
+        frames = [
+            pd.DataFrame({
+                'label': pd.Categorical(['a', 'b']),
+                'value': [1.0, 2.0],
+            }),
+            pd.DataFrame({
+                'label': pd.Categorical(['c', 'a']),
+                'value': [3.0, 4.0],
+            }),
+        ]
+
+        result = categorical_df_concat(frames)
+
+        self.assertEqual(result['label'].dtype.name, 'category')
+        self.assertEqual(list(result['label'].cat.categories),
+                         ['a', 'b', 'c'])
+        self.assertEqual(list(result['label']), ['a', 'b', 'c', 'a'])
+        self.assertEqual(list(result['value']), [1.0, 2.0, 3.0, 4.0])
+
+    def test_categorical_df_concat_different_columns(self):
+        with self.assertRaises(ValueError):
+            categorical_df_concat([
+                pd.DataFrame({'a': [1.0]}),
+                pd.DataFrame({'b': [1.0]}),
+            ])
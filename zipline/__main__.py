@@ -163,7 +163,9 @@ def ipython_only(option):
     '-e',
     '--end',
     type=Date(tz='utc', as_timestamp=True),
-    help='The end date of the simulation.',
+    help='The end date of the simulation. When live trading this is the'
+    ' last session to trade, by default the last session of the trading'
+    ' calendar.',
 )
 @click.option(
     '-o',
@@ -349,7 +351,24 @@ def zipline_magic(line, cell=None):
     default=True,
     help='Print progress information to the terminal.'
 )
-def ingest(bundle, assets_version, show_progress):
+@click.option(
+    '--minute-bar-processes',
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help='The number of processes writing the minute bars.',
+)
+@click.option(
+    '--incremental/--no-incremental',
+    default=False,
+    help='Extend the most recent ingestion instead of ingesting all of the'
+    ' data again.',
+)
+def ingest(bundle,
+           assets_version,
+           show_progress,
+           minute_bar_processes,
+           incremental):
     """Ingest the data for the given bundle.
     """
     bundles_module.ingest(
@@ -358,6 +377,8 @@ def ingest(bundle, assets_version, show_progress):
         pd.Timestamp.utcnow(),
         assets_version,
         show_progress,
+        minute_bar_processes,
+        incremental,
     )
 
 
@@ -373,15 +373,12 @@ cdef class BarData:
                 # assume assets is iterable
                 # return a Series indexed by asset
                 if not self._adjust_minutes:
-                    return pd.Series(data={
-                        asset: self.data_portal.get_spot_value(
-                                    asset,
-                                    field,
-                                    self._get_current_minute(),
-                                    self.data_frequency
-                               )
-                        for asset in assets
-                        }, index=assets, name=fields)
+                    return self.data_portal.get_spot_values(
+                        assets,
+                        [field],
+                        self._get_current_minute(),
+                        self.data_frequency
+                    )[field]
                 else:
                     return pd.Series(data={
                         asset: self.data_portal.get_adjusted_value(
@@ -396,21 +393,15 @@ cdef class BarData:
 
             else:
                 # both assets and fields are iterable
-                data = {}
-
                 if not self._adjust_minutes:
-                    for field in fields:
-                        series = pd.Series(data={
-                            asset: self.data_portal.get_spot_value(
-                                        asset,
-                                        field,
-                                        self._get_current_minute(),
-                                        self.data_frequency
-                                   )
-                            for asset in assets
-                            }, index=assets, name=field)
-                        data[field] = series
+                    return self.data_portal.get_spot_values(
+                        assets,
+                        fields,
+                        self._get_current_minute(),
+                        self.data_frequency
+                    )
                 else:
+                    data = {}
                     for field in fields:
                         series = pd.Series(data={
                             asset: self.data_portal.get_adjusted_value(
@@ -424,7 +415,7 @@ cdef class BarData:
                             }, index=assets, name=field)
                         data[field] = series
 
-                return pd.DataFrame(data)
+                    return pd.DataFrame(data)
 
     @check_parameters(('continuous_future',),
                       (ContinuousFuture,))
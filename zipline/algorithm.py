@@ -15,6 +15,7 @@
 from collections import Iterable
 from copy import copy
 import operator as op
+from threading import Thread
 import warnings
 from datetime import tzinfo, time
 import logbook
@@ -141,6 +142,66 @@ from zipline.zipline_warnings import ZiplineDeprecationWarning
 log = logbook.Logger("ZiplineLog")
 
 
+class _PipelinePrefetch(object):
+    """
+    Computes a chunk of pipeline results in a background thread.
+
+    Parameters
+    ----------
+    run : callable[(Pipeline, pd.Timestamp, int) -> (pd.DataFrame,
+                                                     pd.Timestamp)]
+        The function computing the chunk.
+    pipeline : Pipeline
+        The pipeline to compute.
+    start_session : pd.Timestamp
+        The first session of the chunk.
+    chunksize : int
+        The number of sessions in the chunk after ``start_session``.
+    """
+    def __init__(self, run, pipeline, start_session, chunksize):
+        self.start_session = start_session
+        self.chunksize = chunksize
+
+        self._result = None
+        self._error = None
+        self._thread = Thread(target=self._run,
+                              args=(run, pipeline),
+                              name='PipelinePrefetch')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self, run, pipeline):
+        try:
+            self._result = run(pipeline, self.start_session, self.chunksize)
+        except Exception as e:
+            self._error = e
+
+    def result(self):
+        """Wait for the chunk to be computed.
+
+        Returns
+        -------
+        (data, valid_until) : tuple (pd.DataFrame, pd.Timestamp)
+            The chunk, or None if computing it failed.
+        """
+        self._thread.join()
+        if self._error is not None:
+            log.warn(
+                "Failed to compute the pipeline chunk starting on {0} in the"
+                " background, computing it again: {1!r}".format(
+                    self.start_session.date(), self._error,
+                )
+            )
+            return None
+        return self._result
+
+    def join(self):
+        """Wait for the background thread to stop, discarding its chunk.
+        """
+        self._thread.join()
+        self._result = None
+
+
 class TradingAlgorithm(object):
     """A class that represents a trading strategy and parameters to execute
     the strategy.
@@ -195,6 +256,13 @@ class TradingAlgorithm(object):
         equities_metadata, but will be traded by this TradingAlgorithm.
     get_pipeline_loader : callable[BoundColumn -> PipelineLoader], optional
         The function that maps pipeline columns to their loaders.
+    pipeline_lookahead : bool, optional
+        Compute the next chunk of the attached pipeline in a background thread
+        while the current chunk is being used, so that moving to the next
+        chunk doesn't stall the simulation. This holds up to two chunks in
+        memory at once. The pipeline loaders, and the readers behind them,
+        are used from both threads, so they must support concurrent reads.
+        default: False
     create_event_context : callable[BarData -> context manager], optional
         A function used to create a context mananger that wraps the
         execution of all events that are scheduled for a bar.
@@ -310,6 +378,9 @@ class TradingAlgorithm(object):
         # Create an always-expired cache so that we compute the first time data
         # is requested.
         self._pipeline_cache = CachedObject(None, pd.Timestamp(0, tz='UTC'))
+        self._pipeline_lookahead = kwargs.pop('pipeline_lookahead', False)
+        # The computation of the next chunk of the pipeline, if any.
+        self._pipeline_prefetch = None
 
         self.blotter = kwargs.pop('blotter', None)
         self.cancel_policy = kwargs.pop('cancel_policy', NeverCancel())
@@ -715,6 +786,11 @@ class TradingAlgorithm(object):
             self.analyze(daily_stats)
         finally:
             self.data_portal = None
+            # Don't leave a chunk being computed from the readers after the
+            # run ends.
+            prefetch, self._pipeline_prefetch = self._pipeline_prefetch, None
+            if prefetch is not None:
+                prefetch.join()
 
         return daily_stats
 
@@ -2494,12 +2570,16 @@ class TradingAlgorithm(object):
             # 1. Clear the reference to self._pipeline_cache.
             self._pipeline_cache = None
 
-            # Calculate the next block.
-            data, valid_until = self._run_pipeline(
-                pipeline, today, next(chunks),
+            # Calculate the next block, unless it was computed in the
+            # background.
+            data, valid_until = self._next_pipeline_chunk(
+                pipeline, today, chunks,
             )
             self._pipeline_cache = CachedObject(data, valid_until)
 
+            if self._pipeline_lookahead:
+                self._prefetch_pipeline_chunk(pipeline, valid_until, chunks)
+
         # Now that we have a cached result, try to return the data for today.
         try:
             return data.loc[today]
@@ -2508,6 +2588,49 @@ class TradingAlgorithm(object):
             # day.
             return pd.DataFrame(index=[], columns=data.columns)
 
+    def _next_pipeline_chunk(self, pipeline, today, chunks):
+        """
+        Get the chunk of `pipeline` results starting on `today`, from the
+        chunk computed in the background if it holds `today`.
+
+        Returns
+        -------
+        (data, valid_until) : tuple (pd.DataFrame, pd.Timestamp)
+        """
+        prefetch, self._pipeline_prefetch = self._pipeline_prefetch, None
+        if prefetch is None:
+            return self._run_pipeline(pipeline, today, next(chunks))
+
+        result = prefetch.result()
+        if result is not None and prefetch.start_session <= today <= result[1]:
+            return result
+        # Computing the chunk failed, or the algorithm didn't ask for results
+        # during the whole chunk. Drop it before computing the next one.
+        del result
+
+        return self._run_pipeline(pipeline, today, prefetch.chunksize)
+
+    def _prefetch_pipeline_chunk(self, pipeline, valid_until, chunks):
+        """
+        Start computing the chunk of `pipeline` results following the chunk
+        ending on `valid_until` in a background thread.
+        """
+        sessions = self.trading_calendar.all_sessions
+        if valid_until >= self.sim_params.end_session:
+            return
+
+        try:
+            chunksize = next(chunks)
+        except StopIteration:
+            return
+
+        self._pipeline_prefetch = _PipelinePrefetch(
+            self._run_pipeline,
+            pipeline,
+            sessions[sessions.get_loc(valid_until) + 1],
+            chunksize,
+        )
+
     def _run_pipeline(self, pipeline, start_session, chunksize):
         """
         Compute `pipeline`, providing values for at least `start_date`.
@@ -10,7 +10,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+from contextlib import contextmanager
 from datetime import time
+from functools import partial
 import os.path
 import logbook
 import pandas as pd
@@ -30,7 +32,9 @@ from zipline.utils.api_support import (
     allowed_only_in_before_trading_start)
 
 from zipline.utils.calendars.trading_calendar import days_at_time
-from zipline.utils.serialization_utils import load_context, store_context
+from zipline.utils.context_tricks import nop_context
+from zipline.utils.serialization_utils import (load_context,
+                                               ContextPersister)
 
 log = logbook.Logger("Live Trading")
 
@@ -47,7 +51,20 @@ class LiveTradingAlgorithm(TradingAlgorithm):
 
         self.algo_filename = kwargs.get('algo_filename', "<algorithm>")
         self.state_filename = kwargs.pop('state_filename', None)
+        self.state_checkpoint_interval = kwargs.pop(
+            'state_checkpoint_interval', 1)
+        # If False, the context fields holding the same mutable objects are
+        # only persisted again once passed to mark_context_dirty().
+        self.state_reserialize_mutable = kwargs.pop(
+            'state_reserialize_mutable', True)
         self._context_persistence_excludes = []
+        self._context_persister = None
+        # The data of the next chunk of the pipeline doesn't exist yet.
+        kwargs.setdefault('pipeline_lookahead', False)
+        kwargs['create_event_context'] = partial(
+            self._persisting_event_context,
+            kwargs.get('create_event_context') or (lambda *_: nop_context),
+        )
 
         super(self.__class__, self).__init__(*args, **kwargs)
 
@@ -56,6 +73,12 @@ class LiveTradingAlgorithm(TradingAlgorithm):
     def initialize(self, *args, **kwargs):
         self._context_persistence_excludes = (list(self.__dict__.keys()) +
                                               ['trading_client'])
+        self._context_persister = ContextPersister(
+            self.state_filename,
+            checksum=self.algo_filename,
+            exclude_list=self._context_persistence_excludes,
+            checkpoint_interval=self.state_checkpoint_interval,
+            reserialize_mutable=self.state_reserialize_mutable)
 
         if os.path.isfile(self.state_filename):
             log.info("Loading state from {}".format(self.state_filename))
@@ -66,17 +89,24 @@ class LiveTradingAlgorithm(TradingAlgorithm):
 
         with ZiplineAPI(self):
             super(self.__class__, self).initialize(*args, **kwargs)
-            store_context(self.state_filename,
-                          context=self,
-                          checksum=self.algo_filename,
-                          exclude_list=self._context_persistence_excludes)
-
-    def handle_data(self, data):
-        super(self.__class__, self).handle_data(data)
-        store_context(self.state_filename,
-                      context=self,
-                      checksum=self.algo_filename,
-                      exclude_list=self._context_persistence_excludes)
+            # The initial state is written synchronously: initialize() is
+            # only called once in the algorithm's life.
+            self._context_persister.checkpoint(self, force=True)
+            self._context_persister.flush()
+
+    @contextmanager
+    def _persisting_event_context(self, create_event_context, data):
+        # The context is checkpointed once every event of the bar, including
+        # the scheduled functions, ran. It is serialized in the background,
+        # so the events of the next bar may only run once that is done.
+        self._context_persister.wait_for_snapshot()
+        with create_event_context(data):
+            yield
+        self._context_persister.checkpoint(self)
+
+    def before_trading_start(self, data):
+        self._context_persister.wait_for_snapshot()
+        super(self.__class__, self).before_trading_start(data)
 
     def _create_clock(self):
         # This method is taken from TradingAlgorithm.
@@ -113,7 +143,8 @@ class LiveTradingAlgorithm(TradingAlgorithm):
             execution_closes,
             before_trading_start_minutes,
             minute_emission=minutely_emission,
-            time_skew=self.broker.time_skew
+            time_skew=self.broker.time_skew,
+            minute_ready=self.broker.minute_ready
         )
 
     def _create_generator(self, sim_params):
@@ -187,6 +218,50 @@ class LiveTradingAlgorithm(TradingAlgorithm):
         tradeable_asset['auto_close_date'] = tradeable_asset['end_date']
         return Asset.from_dict(tradeable_asset)
 
+    @api_method
+    def subscribe_to_market_data(self, assets, timeout=0):
+        """Subscribe to the realtime market data of assets.
+
+        Subscribing to the universe up front (e.g. to the output of a
+        pipeline in ``before_trading_start``) avoids missing prices the first
+        time an asset is looked up. The subscription requests are sent in
+        the background at a rate the broker accepts.
+
+        Parameters
+        ----------
+        assets : Asset or iterable[Asset]
+            The assets to subscribe to.
+        timeout : float, optional
+            The number of seconds to wait for the market data to arrive. If
+            None, wait until every subscription delivered data or failed.
+
+        Returns
+        -------
+        ready : list[Asset]
+            The assets whose market data is flowing.
+        """
+        if isinstance(assets, Asset):
+            assets = [assets]
+        return self.broker.subscribe_to_universe(assets, timeout)
+
+    @api_method
+    def mark_context_dirty(self, *fields):
+        """Mark fields of the context as changed in place.
+
+        When the algorithm is created with
+        ``state_reserialize_mutable=False``, a field of the context which
+        still holds the same list, dict, DataFrame, etc. is only persisted
+        again after it was marked. Persisting large unchanged fields on every
+        bar would otherwise delay the next bar.
+
+        Parameters
+        ----------
+        *fields : str
+            The names of the changed fields, e.g. ``'history'`` for
+            ``context.history``.
+        """
+        self._context_persister.mark_dirty(*fields)
+
     @api_method
     @disallowed_in_before_trading_start(OrderInBeforeTradingStart())
     def order(self,
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from abc import ABCMeta, abstractmethod, abstractproperty
+
+import numpy as np
 from six import with_metaclass
 
 
@@ -115,6 +117,44 @@ class BarReader(with_metaclass(ABCMeta, object)):
         """
         pass
 
+    def get_values(self, sids, dt, fields):
+        """
+        Retrieve the values of many fields for many assets at the given dt.
+
+        Parameters
+        ----------
+        sids : iterable[int]
+            The asset identifiers.
+        dt : pd.Timestamp
+            The timestamp for the desired data points.
+        fields : iterable[str]
+            The OHLCV names for the desired data points.
+
+        Returns
+        -------
+        values : np.ndarray[float64]
+            An array of shape (len(fields), len(sids)) with the value of
+            ``fields[i]`` for ``sids[j]`` at ``out[i, j]``.
+
+        Raises
+        ------
+        NoDataOnDate
+            If the given dt is not a valid market minute (in minute mode) or
+            session (in daily mode) according to this reader's tradingcalendar.
+
+        Notes
+        -----
+        This implementation calls :meth:`get_value` for every cell; readers
+        which can do better should override it.
+        """
+        sids = list(sids)
+        fields = list(fields)
+        out = np.empty((len(fields), len(sids)), dtype=np.float64)
+        for i, field in enumerate(fields):
+            for j, sid in enumerate(sids):
+                out[i, j] = self.get_value(sid, dt, field)
+        return out
+
     @abstractmethod
     def get_last_traded_dt(self, asset, dt):
         """
@@ -1,6 +1,7 @@
 # These imports are necessary to force module-scope register calls to happen.
 from . import quandl  # noqa
 from .core import (
+    PreviousIngestion,
     UnknownBundle,
     bundles,
     clean,
@@ -16,6 +17,7 @@ from .yahoo import yahoo_equities
 
 
 __all__ = [
+    'PreviousIngestion',
     'UnknownBundle',
     'bundles',
     'clean',
@@ -18,6 +18,12 @@ from ..us_equity_pricing import (
 from ..minute_bars import (
     BcolzMinuteBarReader,
     BcolzMinuteBarWriter,
+    link_minute_bars,
+)
+from ..mmap_minute_bars import (
+    MmapMinuteBarReader,
+    MmapMinuteBarWriter,
+    has_mmap_minute_bars,
 )
 from zipline.assets import AssetDBWriter, AssetFinder, ASSET_DB_VERSION
 from zipline.assets.asset_db_migrations import downgrade
@@ -33,6 +39,14 @@ from zipline.utils.preprocess import preprocess
 from zipline.utils.calendars import get_calendar
 
 
+def minute_bar_reader(path):
+    """Open the minute bars at ``path`` with the reader of their format.
+    """
+    if has_mmap_minute_bars(path):
+        return MmapMinuteBarReader(path)
+    return BcolzMinuteBarReader(path)
+
+
 def asset_db_path(bundle_name, timestr, environ=None, db_version=None):
     return pth.data_path(
         asset_db_relative(bundle_name, timestr, environ, db_version),
@@ -132,6 +146,54 @@ def ingestions_for_bundle(bundle, environ=None):
     )
 
 
+def previous_ingestion(bundle_name, timestamp, environ=None):
+    """Find the most recent complete ingestion of a bundle before
+    ``timestamp``.
+
+    Parameters
+    ----------
+    bundle_name : str
+        The name of the bundle.
+    timestamp : pd.Timestamp
+        The time of the new ingestion.
+    environ : mapping, optional
+        The environment variables.
+
+    Returns
+    -------
+    previous : PreviousIngestion or None
+        The paths of the previous ingestion, or None if there is none.
+    """
+    try:
+        ingestions = ingestions_for_bundle(bundle_name, environ)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+        return None
+
+    for ingestion in ingestions:
+        if ingestion >= timestamp:
+            continue
+        timestr = to_bundle_ingest_dirname(ingestion)
+        previous = PreviousIngestion(
+            timestamp=ingestion,
+            asset_db_path=asset_db_path(bundle_name, timestr, environ),
+            minute_equity_path=minute_equity_path(
+                bundle_name, timestr, environ,
+            ),
+            daily_equity_path=daily_equity_path(
+                bundle_name, timestr, environ,
+            ),
+            adjustment_db_path=adjustment_db_path(
+                bundle_name, timestr, environ,
+            ),
+        )
+        # A failed ingestion leaves an empty directory behind.
+        if all(map(os.path.exists, previous[1:])):
+            return previous
+    return None
+
+
 RegisteredBundle = namedtuple(
     'RegisteredBundle',
     ['calendar_name',
@@ -139,7 +201,14 @@ RegisteredBundle = namedtuple(
      'end_session',
      'minutes_per_day',
      'ingest',
-     'create_writers']
+     'create_writers',
+     'incremental']
+)
+
+PreviousIngestion = namedtuple(
+    'PreviousIngestion',
+    'timestamp asset_db_path minute_equity_path daily_equity_path '
+    'adjustment_db_path',
 )
 
 BundleData = namedtuple(
@@ -228,7 +297,8 @@ def _make_bundle_core():
                  start_session=None,
                  end_session=None,
                  minutes_per_day=390,
-                 create_writers=True):
+                 create_writers=True,
+                 incremental=False):
         """Register a data bundle ingest function.
 
         Parameters
@@ -278,6 +348,18 @@ def _make_bundle_core():
             Should the ingest machinery create the writers for the ingest
             function. This can be disabled as an optimization for cases where
             they are not needed, like the ``quantopian-quandl`` bundle.
+        incremental : bool, optional
+            Can the ingest function extend a previous ingestion. If True, the
+            function is also passed:
+
+              previous_ingestion : PreviousIngestion or None
+                  The paths of the ingestion being extended, or None if the
+                  data is ingested from scratch. When extending, the minute
+                  bar writer already holds the minute bars of the previous
+                  ingestion and appends to them, and the daily bars of the
+                  previous ingestion are extended with
+                  ``daily_bar_writer.append``. The asset db and the
+                  adjustments are written in full.
 
         Notes
         -----
@@ -310,6 +392,7 @@ def _make_bundle_core():
             minutes_per_day=minutes_per_day,
             ingest=f,
             create_writers=create_writers,
+            incremental=incremental,
         )
         return f
 
@@ -339,7 +422,9 @@ def _make_bundle_core():
                environ=os.environ,
                timestamp=None,
                assets_versions=(),
-               show_progress=False):
+               show_progress=False,
+               minute_bar_processes=1,
+               incremental=False):
         """Ingest data for a given bundle.
 
         Parameters
@@ -355,12 +440,25 @@ def _make_bundle_core():
             Versions of the assets db to which to downgrade.
         show_progress : bool, optional
             Tell the ingest function to display the progress where possible.
+        minute_bar_processes : int, optional
+            The number of processes writing the minute bars.
+        incremental : bool, optional
+            Extend the most recent ingestion of the bundle instead of
+            ingesting all of the data again. The unchanged minute bar files
+            are shared with the previous ingestion. The bundle must have been
+            registered with ``incremental=True``.
         """
         try:
             bundle = bundles[name]
         except KeyError:
             raise UnknownBundle(name)
 
+        if incremental and not (bundle.incremental and
+                                bundle.create_writers):
+            raise ValueError(
+                'Bundle %r does not support incremental ingestion.' % name,
+            )
+
         calendar = get_calendar(bundle.calendar_name)
 
         start_session = bundle.start_session
@@ -376,6 +474,11 @@ def _make_bundle_core():
             timestamp = pd.Timestamp.utcnow()
         timestamp = timestamp.tz_convert('utc').tz_localize(None)
 
+        previous = (
+            previous_ingestion(name, timestamp, environ=environ)
+            if incremental else None
+        )
+
         timestr = to_bundle_ingest_dirname(timestamp)
         cachepath = cache_path(name, environ=environ)
         pth.ensure_directory(pth.data_path([name, timestr], environ=environ))
@@ -385,35 +488,68 @@ def _make_bundle_core():
             # we use `cleanup_on_failure=False` so that we don't purge the
             # cache directory if the load fails in the middle
             if bundle.create_writers:
+                # The working directory is created next to the ingestions
+                # so that committing it does not copy the data.
                 wd = stack.enter_context(working_dir(
-                    pth.data_path([], environ=environ))
-                )
-                daily_bars_path = wd.ensure_dir(
+                    pth.data_path([], environ=environ),
+                    prefix='.ingest-',
+                    dir=pth.data_path([name], environ=environ),
+                ))
+                daily_bars_path = wd.getpath(
                     *daily_equity_relative(
                         name, timestr, environ=environ,
                     )
                 )
+                minute_bars_path = wd.getpath(
+                    *minute_equity_relative(
+                        name, timestr, environ=environ,
+                    )
+                )
                 daily_bar_writer = BcolzDailyBarWriter(
                     daily_bars_path,
                     calendar,
                     start_session,
                     end_session,
                 )
-                # Do an empty write to ensure that the daily ctables exist
-                # when we create the SQLiteAdjustmentWriter below. The
-                # SQLiteAdjustmentWriter needs to open the daily ctables so
-                # that it can compute the adjustment ratios for the dividends.
-
-                daily_bar_writer.write(())
-                minute_bar_writer = BcolzMinuteBarWriter(
-                    wd.ensure_dir(*minute_equity_relative(
-                        name, timestr, environ=environ)
-                    ),
-                    calendar,
-                    start_session,
-                    end_session,
-                    minutes_per_day=bundle.minutes_per_day,
-                )
+                if previous is None:
+                    # Do an empty write to ensure that the daily ctables
+                    # exist when we create the SQLiteAdjustmentWriter below.
+                    # The SQLiteAdjustmentWriter needs to open the daily
+                    # ctables so that it can compute the adjustment ratios
+                    # for the dividends.
+                    pth.ensure_directory(daily_bars_path)
+                    daily_bar_writer.write(())
+                    pth.ensure_directory(minute_bars_path)
+                    minute_bar_writer = BcolzMinuteBarWriter(
+                        minute_bars_path,
+                        calendar,
+                        start_session,
+                        end_session,
+                        minutes_per_day=bundle.minutes_per_day,
+                        write_processes=minute_bar_processes,
+                    )
+                else:
+                    # The daily bars are rewritten by append, only the
+                    # minute bars can share files with the previous
+                    # ingestion.
+                    shutil.copytree(previous.daily_equity_path,
+                                    daily_bars_path)
+                    if has_mmap_minute_bars(previous.minute_equity_path):
+                        # The mmap files are written in place.
+                        shutil.copytree(previous.minute_equity_path,
+                                        minute_bars_path)
+                        minute_bar_writer = MmapMinuteBarWriter.open(
+                            minute_bars_path,
+                            end_session,
+                        )
+                    else:
+                        link_minute_bars(previous.minute_equity_path,
+                                         minute_bars_path)
+                        minute_bar_writer = BcolzMinuteBarWriter.open(
+                            minute_bars_path,
+                            end_session,
+                            write_processes=minute_bar_processes,
+                        )
                 assets_db_path = wd.getpath(*asset_db_relative(
                     name, timestr, environ=environ,
                 ))
@@ -437,6 +573,9 @@ def _make_bundle_core():
                     raise ValueError('Need to ingest a bundle that creates '
                                      'writers in order to downgrade the assets'
                                      ' db.')
+            ingest_kwargs = {}
+            if bundle.incremental:
+                ingest_kwargs['previous_ingestion'] = previous
             bundle.ingest(
                 environ,
                 asset_db_writer,
@@ -449,6 +588,7 @@ def _make_bundle_core():
                 cache,
                 show_progress,
                 pth.data_path([name, timestr], environ=environ),
+                **ingest_kwargs
             )
 
             for version in sorted(set(assets_versions), reverse=True):
@@ -523,7 +663,7 @@ def _make_bundle_core():
             asset_finder=AssetFinder(
                 asset_db_path(name, timestr, environ=environ),
             ),
-            equity_minute_bar_reader=BcolzMinuteBarReader(
+            equity_minute_bar_reader=minute_bar_reader(
                 minute_equity_path(name, timestr, environ=environ),
             ),
             equity_daily_bar_reader=BcolzDailyBarReader(
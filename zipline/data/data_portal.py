@@ -53,7 +53,8 @@ from zipline.data.history_loader import (
     DailyHistoryLoader,
     MinuteHistoryLoader,
 )
-from zipline.data.us_equity_pricing import NoDataOnDate
+from zipline.data.minute_bars import BcolzMinuteBarReader
+from zipline.data.us_equity_pricing import BcolzDailyBarReader, NoDataOnDate
 
 from zipline.utils.math_utils import (
     nansum,
@@ -139,6 +140,16 @@ class DataPortal(object):
         The last session to make available in session-level data.
     last_available_minute : pd.Timestamp, optional
         The last minute to make available in minute-level data.
+    minute_history_prefetch_length : int, optional
+        The initial number of minutes loaded past the end of minute history
+        windows. The history loader adapts it to the cadence of the calls.
+    daily_history_prefetch_length : int, optional
+        The initial number of sessions loaded past the end of daily history
+        windows. The history loader adapts it to the cadence of the calls.
+    shared_cache : SharedArrayCache, optional
+        Host wide cache of decompressed pricing data. The bcolz readers are
+        attached to it, so that concurrent backtests on the same bundle
+        decompress the data once and share it in memory.
     """
     def __init__(self,
                  asset_finder,
@@ -152,7 +163,8 @@ class DataPortal(object):
                  last_available_session=None,
                  last_available_minute=None,
                  minute_history_prefetch_length=_DEF_M_HIST_PREFETCH,
-                 daily_history_prefetch_length=_DEF_D_HIST_PREFETCH):
+                 daily_history_prefetch_length=_DEF_D_HIST_PREFETCH,
+                 shared_cache=None):
 
         self.trading_calendar = trading_calendar
         self.asset_finder = asset_finder
@@ -174,6 +186,15 @@ class DataPortal(object):
 
         self._first_available_session = first_trading_day
 
+        if shared_cache is not None:
+            for reader in (equity_daily_reader,
+                           equity_minute_reader,
+                           future_daily_reader,
+                           future_minute_reader):
+                if isinstance(reader,
+                              (BcolzDailyBarReader, BcolzMinuteBarReader)):
+                    reader.attach_shared_cache(shared_cache)
+
         if last_available_session:
             self._last_available_session = last_available_session
         else:
@@ -526,9 +547,137 @@ class DataPortal(object):
 
         if assets_is_scalar:
             return get_single_asset_value(assets)
+        elif data_frequency == 'minute' and field in OHLCVP_FIELDS:
+            return self._get_minute_spot_values(list(assets), [field], dt)[0]
         else:
             return list(map(get_single_asset_value, assets))
 
+    def get_spot_values(self, assets, fields, dt, data_frequency):
+        """
+        Public API method that returns the values of many fields for many
+        assets at the given dt.
+
+        Parameters
+        ----------
+        assets : iterable of Asset or ContinuousFuture
+            The assets whose data is desired.
+        fields : iterable of str
+            The desired fields of the assets. See :meth:`get_spot_value` for
+            the valid values.
+        dt : pd.Timestamp
+            The timestamp for the desired values.
+        data_frequency : str
+            The frequency of the data to query; i.e. whether the data is
+            'daily' or 'minute' bars
+
+        Returns
+        -------
+        values : pd.DataFrame
+            A frame indexed by asset with a column per field.
+
+        Notes
+        -----
+        Subclasses which can look up many values at once should override this
+        method. This implementation reads the minute OHLCV and price fields
+        of all the assets at once and calls :meth:`get_spot_value` for every
+        asset and field otherwise.
+        """
+        assets = list(assets)
+        fields = list(fields)
+
+        data = {}
+        if data_frequency == 'minute':
+            batched_fields = [f for f in fields if f in OHLCVP_FIELDS]
+            if batched_fields:
+                values = self._get_minute_spot_values(assets,
+                                                      batched_fields,
+                                                      dt)
+                for field, row in zip(batched_fields, values):
+                    data[field] = pd.Series(row, index=assets, name=field)
+
+        for field in fields:
+            if field not in data:
+                data[field] = pd.Series(data=[
+                    self.get_spot_value(asset, field, dt, data_frequency)
+                    for asset in assets
+                ], index=assets, name=field)
+
+        return pd.DataFrame(data, index=assets, columns=fields)
+
+    def _get_minute_spot_values(self, assets, fields, dt):
+        """
+        Internal method that looks up the OHLCV and price ``fields`` of many
+        assets at ``dt``.
+
+        The bars of all the equities and futures are read from the minute
+        reader with a single call. Only the prices of the assets which did
+        not trade at ``dt`` need to be looked up one by one.
+
+        Returns
+        -------
+        values : list[list]
+            The values of ``fields[i]`` for ``assets`` at ``values[i]``, with
+            the same types as returned by :meth:`get_spot_value`.
+        """
+        session_label = self.trading_calendar.minute_to_session_label(dt)
+
+        # Only the assets which are alive at dt are read; the others have no
+        # data, just like in get_spot_value.
+        batched = []
+        fallback = []
+        for i, asset in enumerate(assets):
+            if not isinstance(asset, (Equity, Future)):
+                fallback.append(i)
+            elif dt >= asset.start_date and session_label <= asset.end_date:
+                batched.append(i)
+
+        out = np.full((len(fields), len(assets)), np.nan)
+        out[[i for i, field in enumerate(fields) if field == 'volume']] = 0
+
+        read_fields = [f for f in OHLCV_FIELDS if f in fields]
+        if 'price' in fields:
+            read_fields = list(set(read_fields) | {'close', 'volume'})
+
+        read = None
+        if batched:
+            try:
+                values = self._get_pricing_reader('minute').get_values(
+                    [assets[i].sid for i in batched], dt, read_fields,
+                )
+            except NoDataOnDate:
+                pass
+            else:
+                read = dict(zip(read_fields, values))
+
+        for row, field in zip(out, fields):
+            if field != 'price':
+                if read is not None:
+                    row[batched] = read[field]
+                continue
+
+            if read is not None:
+                # An asset which traded in this minute is priced at its close,
+                # the others need to look back for their last trade.
+                traded = read['volume'] > 0
+                row[batched] = np.where(traded, read['close'], np.nan)
+                stale = [i for i, t in zip(batched, traded) if not t]
+            else:
+                stale = batched
+            for i in stale:
+                row[i] = self._get_minute_spot_value(
+                    assets[i], 'close', dt, ffill=True,
+                )
+
+        results = [
+            row.astype(int64).tolist() if field == 'volume' else row.tolist()
+            for row, field in zip(out, fields)
+        ]
+        for i in fallback:
+            for field, row in zip(fields, results):
+                row[i] = self.get_spot_value(assets[i], field, dt, 'minute')
+
+        return results
+
     def get_adjustments(self, assets, field, dt, perspective_dt):
         """
         Returns a list of adjustments between the dt and perspective_dt for the
@@ -972,6 +1121,28 @@ class DataPortal(object):
                     df.loc[normed_index > asset.end_date, asset] = nan
         return df
 
+    def get_history_prefetch_stats(self, frequency):
+        """
+        Get the prefetch horizon and the hit and miss counters of the history
+        windows, to tune the prefetch lengths.
+
+        Parameters
+        ----------
+        frequency : {'1d', '1m'}
+            The frequency of the history windows.
+
+        Returns
+        -------
+        stats : dict[(str, int) -> PrefetchStats]
+            The prefetch statistics by (field, window size).
+        """
+        if frequency == '1d':
+            return self._history_loader.prefetch_stats
+        elif frequency == '1m':
+            return self._minute_history_loader.prefetch_stats
+        else:
+            raise ValueError("Invalid frequency: {0}".format(frequency))
+
     def _get_minute_window_data(self, assets, field, minutes_for_window):
         """
         Internal method that gets a window of adjusted minute data for an asset
@@ -13,6 +13,7 @@
 
 import pandas as pd
 
+from zipline.assets import AssetConvertible, PricingDataAssociable
 from zipline.data.data_portal import DataPortal
 
 from logbook import Logger
@@ -23,6 +24,9 @@ log = Logger('DataPortalLive')
 class DataPortalLive(DataPortal):
     def __init__(self, broker, *args, **kwargs):
         self.broker = broker
+        # Cache of minute history windows served at _live_history_dt
+        self._live_history_cache = {}
+        self._live_history_dt = None
         super(DataPortalLive, self).__init__(*args, **kwargs)
 
     def get_history_window(self,
@@ -33,6 +37,10 @@ class DataPortalLive(DataPortal):
                            field,
                            data_frequency,
                            ffill=True):
+        if frequency == '1m' and field != 'sid':
+            return self._get_live_minute_history_window(
+                assets, end_dt, bar_count, field, ffill)
+
         history_window = super(self.__class__, self).get_history_window(
             assets,
             end_dt,
@@ -48,8 +56,106 @@ class DataPortalLive(DataPortal):
         today = pd.to_datetime('now').date()
         return history_window[history_window.index.date != today]
 
+    def _get_live_minute_history_window(self,
+                                        assets,
+                                        end_dt,
+                                        bar_count,
+                                        field,
+                                        ffill):
+        """Minute history window whose past sessions are read from the bundle
+        and whose current session is made of the broker's minute bars.
+
+        Windows are cached until ``end_dt`` moves to the next minute.
+        """
+        if end_dt != self._live_history_dt:
+            self._live_history_cache.clear()
+            self._live_history_dt = end_dt
+
+        key = (tuple(assets), bar_count, field, ffill)
+        try:
+            return self._live_history_cache[key].copy()
+        except KeyError:
+            pass
+
+        session = self.trading_calendar.minute_to_session_label(end_dt)
+        session_minutes = self.trading_calendar.minutes_for_session(session)
+        live_minutes = session_minutes[session_minutes <= end_dt]
+        live_minutes = live_minutes[max(len(live_minutes) - bar_count, 0):]
+
+        fill_price = field == 'price' and ffill
+        live_window = self.broker.get_minute_bars(
+            assets,
+            field,
+            session_minutes[0],
+            end_dt,
+        ).reindex(index=session_minutes[session_minutes <= end_dt],
+                  columns=assets)
+        if fill_price:
+            # Carry prices from the earlier minutes of the session into
+            # the window before cutting it.
+            live_window = live_window.ffill()
+        live_window = live_window.loc[live_minutes]
+
+        history_bar_count = bar_count - len(live_minutes)
+        # Minutes before the first trade of the session are NaN in the
+        # live bars; they are filled from the bundle's last price.
+        prior_bar_count = 0
+        if (fill_price and history_bar_count <= 0 and len(live_window) and
+                live_window.iloc[0].isnull().any()):
+            prior_bar_count = 1
+
+        if history_bar_count > 0 or prior_bar_count:
+            history_window = super(self.__class__, self).get_history_window(
+                assets,
+                self.trading_calendar.previous_minute(session_minutes[0]),
+                max(history_bar_count, prior_bar_count),
+                '1m',
+                field,
+                'minute',
+                ffill)
+            window = pd.concat([history_window, live_window])
+        else:
+            window = live_window
+
+        if field == 'volume':
+            window = window.fillna(0)
+        elif fill_price:
+            window = window.ffill()
+
+        if prior_bar_count:
+            window = window.iloc[prior_bar_count:]
+
+        self._live_history_cache[key] = window
+        return window.copy()
+
     def get_spot_value(self, assets, field, dt, data_frequency):
-        return self.broker.get_spot_value(assets, field, dt, data_frequency)
+        if isinstance(assets, (AssetConvertible, PricingDataAssociable)):
+            return self.broker.get_spot_value(assets, field, dt,
+                                              data_frequency)
+
+        return self.broker.get_spot_values(
+            assets, [field], dt, data_frequency)[field].tolist()
+
+    def get_spot_values(self, assets, fields, dt, data_frequency):
+        return self.broker.get_spot_values(assets, fields, dt, data_frequency)
+
+    def get_realtime_ticks(self, asset, start_dt=None):
+        """Return the ticks received for ``asset`` in the current session.
+
+        Parameters
+        ----------
+        asset : Asset
+            The asset whose ticks should be returned.
+        start_dt : pd.Timestamp, optional
+            If given, only ticks at or after this time are returned.
+
+        Returns
+        -------
+        ticks : dict[str -> np.ndarray] or None
+            Read-only array views keyed by tick field, oldest tick first, or
+            None if the asset has not been subscribed to yet.
+        """
+        return self.broker.get_realtime_ticks(asset, start_dt)
 
     def get_adjusted_value(self, asset, field, dt,
                            perspective_dt,
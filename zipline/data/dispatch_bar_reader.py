@@ -15,6 +15,8 @@
 from abc import ABCMeta, abstractmethod
 
 from numpy import (
+    empty,
+    float64,
     full,
     nan,
     int64,
@@ -96,6 +98,25 @@ class AssetDispatchBarReader(with_metaclass(ABCMeta)):
         r = self._readers[type(asset)]
         return r.get_value(asset, dt, field)
 
+    def get_values(self, sids, dt, fields):
+        fields = list(fields)
+        assets = self._asset_finder.retrieve_all(sids)
+
+        sid_groups = {t: [] for t in self._asset_types}
+        out_pos = {t: [] for t in self._asset_types}
+        for i, asset in enumerate(assets):
+            t = type(asset)
+            sid_groups[t].append(asset)
+            out_pos[t].append(i)
+
+        out = empty((len(fields), len(assets)), dtype=float64)
+        for t, group in iteritems(sid_groups):
+            if group:
+                out[:, out_pos[t]] = self._readers[t].get_values(group,
+                                                                 dt,
+                                                                 fields)
+        return out
+
     def get_last_traded_dt(self, asset, dt):
         r = self._readers[type(asset)]
         return r.get_last_traded_dt(asset, dt)
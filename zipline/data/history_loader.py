@@ -17,29 +17,46 @@ from abc import (
     abstractmethod,
     abstractproperty,
 )
+from collections import defaultdict
+from time import time
+import warnings
 
-from numpy import concatenate
-from lru import LRU
+from numpy import array, empty_like, intp
 from pandas import isnull
 from pandas.tslib import normalize_date
 from toolz import sliding_window
 
-from six import with_metaclass
+from six import iteritems, itervalues, with_metaclass
 
 from zipline.assets import Equity, Future
 from zipline.assets.continuous_futures import ContinuousFuture
 from zipline.lib._int64window import AdjustedArrayWindow as Int64Window
 from zipline.lib._float64window import AdjustedArrayWindow as Float64Window
 from zipline.lib.adjustment import Float64Multiply, Float64Add
-from zipline.utils.cache import ExpiringCache
+from zipline.utils.cache import ArrayCache, ExpiringCache
 from zipline.utils.math_utils import number_of_decimal_places
 from zipline.utils.memoize import lazyval
 from zipline.utils.numpy_utils import float64_dtype
 from zipline.utils.pandas_utils import find_in_sorted_index
+from zipline.zipline_warnings import ZiplineDeprecationWarning
 
 # Default number of decimal places used for rounding asset prices.
 DEFAULT_ASSET_PRICE_DECIMALS = 3
 
+# The default budget of the sliding windows cached by a HistoryLoader.
+DEFAULT_WINDOW_CACHE_NBYTES = 512 * 1024 * 1024
+
+
+def _merge_adjustments(out, adjustments):
+    """Add the lists of adjustments in ``adjustments`` to the lists in ``out``
+    with the same index.
+    """
+    for loc, loc_adjustments in iteritems(adjustments):
+        try:
+            out[loc].extend(loc_adjustments)
+        except KeyError:
+            out[loc] = list(loc_adjustments)
+
 
 class HistoryCompatibleUSEquityAdjustmentReader(object):
 
@@ -57,13 +74,15 @@ class HistoryCompatibleUSEquityAdjustmentReader(object):
         out = [None] * len(columns)
         for i, column in enumerate(columns):
             adjs = {}
-            for asset in assets:
-                adjs.update(self._get_adjustments_in_range(
-                    asset, dts, column))
+            for col, asset in enumerate(assets):
+                if not isinstance(asset, Equity):
+                    continue
+                _merge_adjustments(adjs, self._get_adjustments_in_range(
+                    asset, dts, column, col))
             out[i] = adjs
         return out
 
-    def _get_adjustments_in_range(self, asset, dts, field):
+    def _get_adjustments_in_range(self, asset, dts, field, col=0):
         """
         Get the Float64Multiply objects to pass to an AdjustedArrayWindow.
 
@@ -86,6 +105,8 @@ class HistoryCompatibleUSEquityAdjustmentReader(object):
             The dts for which adjustment data is needed.
         field : str
             OHLCV field for which to get the adjustments.
+        col : int, optional
+            The column of the asset in the window.
 
         Returns
         -------
@@ -106,8 +127,8 @@ class HistoryCompatibleUSEquityAdjustmentReader(object):
                     adj_loc = end_loc
                     mult = Float64Multiply(0,
                                            end_loc - 1,
-                                           0,
-                                           0,
+                                           col,
+                                           col,
                                            m[1])
                     try:
                         adjs[adj_loc].append(mult)
@@ -122,8 +143,8 @@ class HistoryCompatibleUSEquityAdjustmentReader(object):
                     adj_loc = end_loc
                     mult = Float64Multiply(0,
                                            end_loc - 1,
-                                           0,
-                                           0,
+                                           col,
+                                           col,
                                            d[1])
                     try:
                         adjs[adj_loc].append(mult)
@@ -142,8 +163,8 @@ class HistoryCompatibleUSEquityAdjustmentReader(object):
                 adj_loc = end_loc
                 mult = Float64Multiply(0,
                                        end_loc - 1,
-                                       0,
-                                       0,
+                                       col,
+                                       col,
                                        ratio)
                 try:
                     adjs[adj_loc].append(mult)
@@ -181,9 +202,11 @@ class ContinuousFutureAdjustmentReader(object):
         out = [None] * len(columns)
         for i, column in enumerate(columns):
             adjs = {}
-            for asset in assets:
-                adjs.update(self._get_adjustments_in_range(
-                    asset, dts, column))
+            for col, asset in enumerate(assets):
+                if not isinstance(asset, ContinuousFuture):
+                    continue
+                _merge_adjustments(adjs, self._get_adjustments_in_range(
+                    asset, dts, column, col))
             out[i] = adjs
         return out
 
@@ -191,7 +214,8 @@ class ContinuousFutureAdjustmentReader(object):
                          adjustment_type,
                          front_close,
                          back_close,
-                         end_loc):
+                         end_loc,
+                         col=0):
         adj_base = back_close - front_close
         if adjustment_type == 'mul':
             adj_value = 1.0 + adj_base / front_close
@@ -201,11 +225,11 @@ class ContinuousFutureAdjustmentReader(object):
             adj_class = Float64Add
         return adj_class(0,
                          end_loc,
-                         0,
-                         0,
+                         col,
+                         col,
                          adj_value)
 
-    def _get_adjustments_in_range(self, cf, dts, field):
+    def _get_adjustments_in_range(self, cf, dts, field, col=0):
         if field == 'volume' or field == 'sid':
             return {}
         if cf.adjustment is None:
@@ -248,7 +272,8 @@ class ContinuousFutureAdjustmentReader(object):
             adj = self._make_adjustment(cf.adjustment,
                                         front_close,
                                         back_close,
-                                        end_loc)
+                                        end_loc,
+                                        col)
             try:
                 adjs[adj_loc].append(adj)
             except KeyError:
@@ -256,6 +281,10 @@ class ContinuousFutureAdjustmentReader(object):
         return adjs
 
 
+def _cached_window_nbytes(cached):
+    return cached._unsafe_get_value().nbytes
+
+
 class SlidingWindow(object):
     """
     Wrapper around an AdjustedArrayWindow which supports monotonically
@@ -265,18 +294,37 @@ class SlidingWindow(object):
     ----------
     window : AdjustedArrayWindow
        Window of pricing data with prefetched values beyond the current
-       simulation dt.
+       simulation dt, with one column per asset.
     cal_start : int
        Index in the overall calendar at which the window starts.
+    column_rounding : list[(int, np.ndarray[intp])], optional
+       Pairs of decimal places and the columns rounded to them, used when
+       the assets of the window are not all rounded to the same number of
+       decimal places by the window itself.
+    nbytes : int, optional
+       The size of the data held by the window.
     """
 
-    def __init__(self, window, size, cal_start, offset):
+    def __init__(self, window, size, cal_start, offset, column_rounding=None,
+                 nbytes=0):
         self.window = window
+        self.nbytes = nbytes
         self.cal_start = cal_start
-        self.current = next(window)
+        self.column_rounding = column_rounding
+        self.current = self._round(next(window))
         self.offset = offset
         self.most_recent_ix = self.cal_start + size
 
+    def _round(self, out):
+        if self.column_rounding is None:
+            return out
+
+        rounded = empty_like(out)
+        for places, cols in self.column_rounding:
+            rounded[:, cols] = out[:, cols].round(places)
+        rounded.setflags(write=False)
+        return rounded
+
     def get(self, end_ix):
         """
         Returns
@@ -288,12 +336,97 @@ class SlidingWindow(object):
             return self.current
 
         target = end_ix - self.cal_start - self.offset + 1
-        self.current = self.window.seek(target)
+        self.current = self._round(self.window.seek(target))
 
         self.most_recent_ix = end_ix
         return self.current
 
 
+class PrefetchStats(object):
+    """
+    Prefetch horizon and access counters of the history windows for one
+    (field, window size).
+
+    The horizon is adapted each time a window has to be loaded, from the
+    cadence of the history calls. When consecutive windows overlap, all of
+    the prefetched rows are eventually used and the horizon is doubled.
+    When the calls are more than two window sizes apart, most of the
+    prefetched rows are never read and the horizon is halved.
+
+    Parameters
+    ----------
+    length : int
+        The initial number of rows to load past the end of a window.
+    max_length : int
+        The largest horizon.
+    adaptive : bool
+        Whether to adapt the horizon.
+
+    Attributes
+    ----------
+    length : int
+        The current horizon.
+    hits : int
+        The number of history calls served by an existing window.
+    misses : int
+        The number of history calls which loaded a window.
+    values_loaded : int
+        The number of values (bars times assets) loaded by the misses.
+    load_time : float
+        The seconds spent loading windows.
+    stride : int or None
+        The last positive number of bars between two history calls.
+    """
+    def __init__(self, length, max_length, adaptive=True):
+        self.length = length
+        self.max_length = max_length
+        self.adaptive = adaptive
+        self.hits = 0
+        self.misses = 0
+        self.values_loaded = 0
+        self.load_time = 0.0
+        self.stride = None
+        self._last_end_ix = None
+
+    def __repr__(self):
+        return (
+            '%s(length=%d, hits=%d, misses=%d, values_loaded=%d, '
+            'load_time=%.3f)' % (
+                type(self).__name__,
+                self.length,
+                self.hits,
+                self.misses,
+                self.values_loaded,
+                self.load_time,
+            )
+        )
+
+    def observe(self, end_ix):
+        """Record a history call ending at the calendar index ``end_ix``.
+        """
+        last_end_ix = self._last_end_ix
+        if last_end_ix is not None and end_ix > last_end_ix:
+            self.stride = end_ix - last_end_ix
+        self._last_end_ix = end_ix
+
+    def adapt(self, size):
+        """Adapt the horizon before loading a window of ``size`` bars.
+
+        Returns
+        -------
+        length : int
+            The number of rows to load past the end of the window.
+        """
+        stride = self.stride
+        if self.adaptive and stride is not None:
+            if stride <= size:
+                self.length = min(max(2 * self.length, size),
+                                  self.max_length)
+            elif stride > 2 * size:
+                self.length //= 2
+        return self.length
+
+
 class HistoryLoader(with_metaclass(ABCMeta)):
     """
     Loader for sliding history windows, with support for adjustments.
@@ -306,14 +439,40 @@ class HistoryLoader(with_metaclass(ABCMeta)):
         Reader for pricing bars.
     adjustment_reader : SQLiteAdjustmentReader
         Reader for adjustment data.
+    sid_cache_size : int, optional
+        DEPRECATED: ignored, the windows are cached by block of assets and
+        bounded by ``window_cache_nbytes``.
+    prefetch_length : int, optional
+        The initial number of bars loaded past the end of a window.
+    max_prefetch_length : int, optional
+        The largest number of bars loaded past the end of a window. Defaults
+        to four times ``prefetch_length``.
+    adaptive_prefetch : bool, optional
+        Whether to adapt the number of prefetched bars to the cadence of the
+        history calls. See :class:`PrefetchStats`.
+    window_cache_nbytes : int, optional
+        The largest total size of the data of the cached windows, for all
+        fields. A window holds a block of assets, so the least recently used
+        windows are evicted by size rather than by count.
     """
     FIELDS = ('open', 'high', 'low', 'close', 'volume', 'sid')
 
     def __init__(self, trading_calendar, reader, equity_adjustment_reader,
                  asset_finder,
                  roll_finders=None,
-                 sid_cache_size=1000,
-                 prefetch_length=0):
+                 sid_cache_size=None,
+                 prefetch_length=0,
+                 max_prefetch_length=None,
+                 adaptive_prefetch=True,
+                 window_cache_nbytes=DEFAULT_WINDOW_CACHE_NBYTES):
+        if sid_cache_size is not None:
+            warnings.warn(
+                "The `sid_cache_size` argument of HistoryLoader is deprecated"
+                " and ignored. Use `window_cache_nbytes` instead.",
+                category=ZiplineDeprecationWarning,
+                stacklevel=2,
+            )
+
         self.trading_calendar = trading_calendar
         self._asset_finder = asset_finder
         self._reader = reader
@@ -329,11 +488,26 @@ class HistoryLoader(with_metaclass(ABCMeta)):
                                                  reader,
                                                  roll_finders,
                                                  self._frequency)
-        self._window_blocks = {
-            field: ExpiringCache(LRU(sid_cache_size))
-            for field in self.FIELDS
-        }
-        self._prefetch_length = prefetch_length
+        self._window_blocks = ExpiringCache(
+            ArrayCache(window_cache_nbytes, sizeof=_cached_window_nbytes),
+        )
+        if max_prefetch_length is None:
+            max_prefetch_length = 4 * prefetch_length
+        self._prefetch = defaultdict(
+            lambda: PrefetchStats(prefetch_length,
+                                  max_prefetch_length,
+                                  adaptive_prefetch),
+        )
+
+    @property
+    def prefetch_stats(self):
+        """
+        Returns
+        -------
+        stats : dict[(str, int) -> PrefetchStats]
+            The prefetch horizon and counters by (field, window size).
+        """
+        return dict(self._prefetch)
 
     @abstractproperty
     def _frequency(self):
@@ -362,10 +536,10 @@ class HistoryLoader(with_metaclass(ABCMeta)):
                     return number_of_decimal_places(contract.tick_size)
         return DEFAULT_ASSET_PRICE_DECIMALS
 
-    def _ensure_sliding_windows(self, assets, dts, field,
-                                is_perspective_after):
+    def _ensure_sliding_window(self, assets, dts, field,
+                               is_perspective_after):
         """
-        Ensure that there is a Float64Multiply window for each asset that can
+        Ensure that there is a window for the block of assets that can
         provide data for the given parameters.
         If the corresponding window for the (assets, len(dts), field) does not
         exist, then create a new one.
@@ -388,86 +562,105 @@ class HistoryLoader(with_metaclass(ABCMeta)):
 
         Returns
         -------
-        out : list of Float64Window with sufficient data so that each asset's
-        window can provide `get` for the index corresponding with the last
+        out : SlidingWindow with a column for each asset, with sufficient data
+        so that it can provide `get` for the index corresponding with the last
         value in `dts`
         """
         end = dts[-1]
         size = len(dts)
-        asset_windows = {}
-        needed_assets = []
         cal = self._calendar
 
-        assets = self._asset_finder.retrieve_all(assets)
+        assets = tuple(self._asset_finder.retrieve_all(assets))
         end_ix = find_in_sorted_index(cal, end)
+        key = (field, assets, size, is_perspective_after)
+        prefetch = self._prefetch[field, size]
+        prefetch.observe(end_ix)
+
+        try:
+            window = self._window_blocks.get(key, end)
+        except KeyError:
+            pass
+        else:
+            # If the requested end index occurs before the end index from the
+            # previous history call for this window, grab a new window
+            # instead of rewinding adjustments.
+            if end_ix >= window.most_recent_ix:
+                prefetch.hits += 1
+                return window
+
+        load_start = time()
+        offset = 0
+        start_ix = find_in_sorted_index(cal, dts[0])
+
+        prefetch_end_ix = min(end_ix + prefetch.adapt(size), len(cal) - 1)
+        prefetch_end = cal[prefetch_end_ix]
+        prefetch_dts = cal[start_ix:prefetch_end_ix + 1]
+        if is_perspective_after:
+            adj_end_ix = min(prefetch_end_ix + 1, len(cal) - 1)
+            adj_dts = cal[start_ix:adj_end_ix + 1]
+        else:
+            adj_dts = prefetch_dts
+        data = self._array(prefetch_dts, list(assets), field)
+
+        if field == 'sid':
+            window_type = Int64Window
+        else:
+            window_type = Float64Window
+
+        view_kwargs = {}
+        if field == 'volume':
+            data = data.astype(float64_dtype)
 
-        for asset in assets:
-            try:
-                window = self._window_blocks[field].get(
-                    (asset, size, is_perspective_after), end)
-            except KeyError:
-                needed_assets.append(asset)
-            else:
-                if end_ix < window.most_recent_ix:
-                    # Window needs reset. Requested end index occurs before the
-                    # end index from the previous history call for this window.
-                    # Grab new window instead of rewinding adjustments.
-                    needed_assets.append(asset)
-                else:
-                    asset_windows[asset] = window
-
-        if needed_assets:
-            offset = 0
-            start_ix = find_in_sorted_index(cal, dts[0])
-
-            prefetch_end_ix = min(end_ix + self._prefetch_length, len(cal) - 1)
-            prefetch_end = cal[prefetch_end_ix]
-            prefetch_dts = cal[start_ix:prefetch_end_ix + 1]
-            if is_perspective_after:
-                adj_end_ix = min(prefetch_end_ix + 1, len(cal) - 1)
-                adj_dts = cal[start_ix:adj_end_ix + 1]
-            else:
-                adj_dts = prefetch_dts
-            prefetch_len = len(prefetch_dts)
-            array = self._array(prefetch_dts, needed_assets, field)
-
-            if field == 'sid':
-                window_type = Int64Window
-            else:
-                window_type = Float64Window
-
-            view_kwargs = {}
-            if field == 'volume':
-                array = array.astype(float64_dtype)
-
-            for i, asset in enumerate(needed_assets):
-                adj_reader = None
-                try:
-                    adj_reader = self._adjustment_readers[type(asset)]
-                except KeyError:
-                    adj_reader = None
-                if adj_reader is not None:
-                    adjs = adj_reader.load_adjustments(
-                        [field], adj_dts, [asset])[0]
-                else:
-                    adjs = {}
-                window = window_type(
-                    array[:, i].reshape(prefetch_len, 1),
-                    view_kwargs,
-                    adjs,
-                    offset,
-                    size,
-                    int(is_perspective_after),
-                    self._decimal_places_for_asset(asset, dts[-1]),
-                )
-                sliding_window = SlidingWindow(window, size, start_ix, offset)
-                asset_windows[asset] = sliding_window
-                self._window_blocks[field].set(
-                    (asset, size, is_perspective_after),
-                    sliding_window,
-                    prefetch_end)
-
-        return [asset_windows[asset] for asset in assets]
+        adjs = {}
+        for adj_reader in itervalues(self._adjustment_readers):
+            _merge_adjustments(
+                adjs,
+                adj_reader.load_adjustments([field], adj_dts, assets)[0],
+            )
+
+        # Round the whole window at once unless the assets need different
+        # decimal places.
+        column_rounding = None
+        decimal_places = [
+            self._decimal_places_for_asset(asset, dts[-1])
+            for asset in assets
+        ]
+        distinct_places = set(decimal_places)
+        if len(distinct_places) == 1:
+            rounding_places = decimal_places[0]
+        else:
+            rounding_places = None
+            if field != 'sid':
+                column_rounding = [
+                    (places,
+                     array([col for col, asset_places
+                            in enumerate(decimal_places)
+                            if asset_places == places], dtype=intp))
+                    for places in distinct_places
+                ]
+
+        window = SlidingWindow(
+            window_type(
+                data,
+                view_kwargs,
+                adjs,
+                offset,
+                size,
+                int(is_perspective_after),
+                rounding_places,
+            ),
+            size,
+            start_ix,
+            offset,
+            column_rounding,
+            data.nbytes,
+        )
+        self._window_blocks.set(key, window, prefetch_end)
+
+        prefetch.misses += 1
+        prefetch.values_loaded += data.size
+        prefetch.load_time += time() - load_start
+        return window
 
     def history(self, assets, dts, field, is_perspective_after):
         """
@@ -544,16 +737,15 @@ class HistoryLoader(with_metaclass(ABCMeta)):
         -------
         out : np.ndarray with shape(len(days between start, end), len(assets))
         """
-        block = self._ensure_sliding_windows(assets,
+        window = self._ensure_sliding_window(assets,
                                              dts,
                                              field,
                                              is_perspective_after)
         end_ix = self._calendar.searchsorted(dts[-1])
 
-        return concatenate(
-            [window.get(end_ix) for window in block],
-            axis=1,
-        )
+        # The window's view is shared with later calls and is mutated by
+        # the adjustments, so the caller gets its own copy.
+        return window.get(end_ix).copy()
 
 
 class DailyHistoryLoader(HistoryLoader):
@@ -13,10 +13,14 @@
 # limitations under the License.
 from abc import ABCMeta, abstractmethod
 import json
+from multiprocessing import Process, Queue
 import os
 from glob import glob
 from os.path import join
+import re
+import shutil
 from textwrap import dedent
+from traceback import format_exc
 
 from lru import LRU
 import bcolz
@@ -27,7 +31,8 @@ import numpy as np
 import pandas as pd
 from pandas import HDFStore
 import tables
-from six import with_metaclass
+from six import itervalues, with_metaclass
+from six.moves.queue import Empty
 from toolz import keymap, valmap
 
 from zipline.data._minute_bar_internal import (
@@ -54,6 +59,10 @@ DEFAULT_EXPECTEDLEN = US_EQUITIES_MINUTES_PER_DAY * 252 * 15
 
 OHLC_RATIO = 1000
 
+# The number of (sid, data) pairs which may be waiting for each writer
+# process, bounding the memory used by a parallel write.
+WRITE_QUEUE_SIZE = 4
+
 
 class BcolzMinuteOverlappingData(Exception):
     pass
@@ -63,6 +72,10 @@ class BcolzMinuteWriterColumnMismatch(Exception):
     pass
 
 
+class BcolzMinuteWriterProcessError(Exception):
+    pass
+
+
 class MinuteBarReader(BarReader):
     @property
     def data_frequency(self):
@@ -113,6 +126,67 @@ def _sid_subdir_path(sid):
     )
 
 
+_CHUNK_FILENAME_RE = re.compile(r'__(\d+)\.blp$')
+
+
+def _link_or_copy(src, dest):
+    try:
+        os.link(src, dest)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dest)
+
+
+def link_minute_bars(src, dest):
+    """Populate ``dest`` with the minute bars in ``src``, sharing the files
+    which are not modified by appending to the data.
+
+    Parameters:
+    -----------
+    src : string
+        The root directory of the existing minute bars.
+    dest : string
+        The root directory to create, it must not exist.
+
+    Notes:
+    ------
+    The compressed chunks of a carray are not modified once they are full.
+    Appending only rewrites the last chunk, the carray metadata and the
+    attrs, which are copied. All the other chunks are hard linked, falling
+    back to a copy where hard links are not supported.
+    """
+    for root, _, filenames in os.walk(src):
+        dest_root = os.path.join(dest, os.path.relpath(root, src))
+        os.makedirs(dest_root)
+
+        chunks = {}
+        for filename in filenames:
+            match = _CHUNK_FILENAME_RE.match(filename)
+            if match is not None:
+                chunks[filename] = int(match.group(1))
+        last_chunk = max(chunks.values()) if chunks else None
+
+        for filename in filenames:
+            src_path = os.path.join(root, filename)
+            dest_path = os.path.join(dest_root, filename)
+            if chunks.get(filename, last_chunk) != last_chunk:
+                _link_or_copy(src_path, dest_path)
+            else:
+                shutil.copy2(src_path, dest_path)
+
+
+def _unshare(rootdir):
+    """Replace the hard linked files under ``rootdir`` by copies, so that
+    they can be modified in place.
+    """
+    for root, _, filenames in os.walk(rootdir):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if os.stat(path).st_nlink > 1:
+                tmp_path = path + '.unshare'
+                shutil.copy2(path, tmp_path)
+                os.rename(tmp_path, path)
+
+
 def convert_cols(cols, scale_factor, sid, invalid_data_behavior):
     """Adapt OHLCV columns into uint32 columns.
 
@@ -392,6 +466,9 @@ class BcolzMinuteBarWriter(object):
         If True, writes the minute bar metadata (on init of the writer).
         If False, no metadata is written (existing metadata is
         retained). Default is True.
+    write_processes : int, optional
+        The default number of processes used by ``write``. Default is 1,
+        writing in the calling process.
 
     Notes
     -----
@@ -449,7 +526,8 @@ class BcolzMinuteBarWriter(object):
                  default_ohlc_ratio=OHLC_RATIO,
                  ohlc_ratios_per_sid=None,
                  expectedlen=DEFAULT_EXPECTEDLEN,
-                 write_metadata=True):
+                 write_metadata=True,
+                 write_processes=1):
 
         self._rootdir = rootdir
         self._start_session = start_session
@@ -463,6 +541,7 @@ class BcolzMinuteBarWriter(object):
         self._expectedlen = expectedlen
         self._default_ohlc_ratio = default_ohlc_ratio
         self._ohlc_ratios_per_sid = ohlc_ratios_per_sid
+        self._write_processes = write_processes
 
         self._minute_index = _calc_minute_index(
             self._schedule.market_open, self._minutes_per_day)
@@ -479,7 +558,7 @@ class BcolzMinuteBarWriter(object):
             metadata.write(self._rootdir)
 
     @classmethod
-    def open(cls, rootdir, end_session=None):
+    def open(cls, rootdir, end_session=None, write_processes=1):
         """
         Open an existing ``rootdir`` for writing.
 
@@ -487,6 +566,8 @@ class BcolzMinuteBarWriter(object):
         ----------
         end_session : Timestamp (optional)
             When appending, the intended new ``end_session``.
+        write_processes : int (optional)
+            The default number of processes used by ``write``.
         """
         metadata = BcolzMinuteBarMetadata.read(rootdir)
         return BcolzMinuteBarWriter(
@@ -497,7 +578,8 @@ class BcolzMinuteBarWriter(object):
             metadata.minutes_per_day,
             metadata.default_ohlc_ratio,
             metadata.ohlc_ratios_per_sid,
-            write_metadata=end_session is not None
+            write_metadata=end_session is not None,
+            write_processes=write_processes,
         )
 
     @property
@@ -665,7 +747,11 @@ class BcolzMinuteBarWriter(object):
         for k, v in kwargs.items():
             table.attrs[k] = v
 
-    def write(self, data, show_progress=False, invalid_data_behavior='warn'):
+    def write(self,
+              data,
+              show_progress=False,
+              invalid_data_behavior='warn',
+              processes=None):
         """Write a stream of minute data.
 
         Parameters
@@ -684,6 +770,16 @@ class BcolzMinuteBarWriter(object):
             the dates must be strictly increasing.
         show_progress : bool, optional
             Whether or not to show a progress bar while writing.
+        processes : int, optional
+            The number of processes writing the data. Each sid is always
+            written by the same process, in the order of ``data``. Defaults
+            to the ``write_processes`` of the writer.
+
+        Raises
+        ------
+        BcolzMinuteWriterProcessError
+            If writing a sid failed in one of the processes. The other sids
+            are still written.
         """
         ctx = maybe_show_progress(
             data,
@@ -691,11 +787,66 @@ class BcolzMinuteBarWriter(object):
             item_show_func=lambda e: e if e is None else str(e[0]),
             label="Merging minute equity files:",
         )
+        if processes is None:
+            processes = self._write_processes
+        if processes > 1:
+            self._write_parallel(ctx, processes, invalid_data_behavior)
+            return
+
         write_sid = self.write_sid
         with ctx as it:
             for e in it:
                 write_sid(*e, invalid_data_behavior=invalid_data_behavior)
 
+    def _write_parallel(self, ctx, processes, invalid_data_behavior):
+        # The sids are written into separate directories, so the only
+        # constraint is that the data of a sid is appended in order. Routing
+        # every sid to the same process guarantees that.
+        errors = Queue()
+        queues = [Queue(WRITE_QUEUE_SIZE) for _ in range(processes)]
+        workers = [
+            Process(
+                target=_write_sids,
+                args=(self, queue, errors, invalid_data_behavior),
+            )
+            for queue in queues
+        ]
+        for worker in workers:
+            worker.daemon = True
+            worker.start()
+
+        try:
+            with ctx as it:
+                for sid, df in it:
+                    queues[int(sid) % processes].put((sid, df))
+        finally:
+            for queue in queues:
+                queue.put(None)
+
+            # Read the errors while waiting, a process can only exit once
+            # everything it put on a queue has been read.
+            failures = []
+            while any(worker.is_alive() for worker in workers):
+                try:
+                    failures.append(errors.get(timeout=0.1))
+                except Empty:
+                    pass
+            while True:
+                try:
+                    failures.append(errors.get_nowait())
+                except Empty:
+                    break
+            for worker in workers:
+                worker.join()
+
+        if failures:
+            raise BcolzMinuteWriterProcessError(
+                "Failed to write sids {0}:\n{1}".format(
+                    sorted(sid for sid, _ in failures),
+                    "\n".join(tb for _, tb in failures),
+                )
+            )
+
     def write_sid(self, sid, df, invalid_data_behavior='warn'):
         """
         Write the OHLCV data for the given sid.
@@ -875,6 +1026,10 @@ class BcolzMinuteBarWriter(object):
                 "Truncating {0} at end_date={1}", file_name, date.date()
             )
 
+            # Resizing rewrites chunks which may be shared with the minute
+            # bars this directory was linked from.
+            _unshare(sid_path)
+            table = bcolz.open(rootdir=sid_path)
             table.resize(truncate_slice_end)
 
         # Update end session in metadata.
@@ -883,6 +1038,29 @@ class BcolzMinuteBarWriter(object):
         metadata.write(self._rootdir)
 
 
+def _write_sids(writer, queue, errors, invalid_data_behavior):
+    """
+    Write the (sid, data) pairs put on ``queue`` until None is received.
+
+    Failures are reported on ``errors`` as (sid, traceback) pairs. The data of
+    a sid which failed is skipped from then on, the other sids are written.
+    """
+    failed = set()
+    while True:
+        item = queue.get()
+        if item is None:
+            return
+
+        sid, df = item
+        if sid in failed:
+            continue
+        try:
+            writer.write_sid(sid, df, invalid_data_behavior)
+        except Exception:
+            failed.add(sid)
+            errors.put((sid, format_exc()))
+
+
 class BcolzMinuteBarReader(MinuteBarReader):
     """
     Reader for data written by BcolzMinuteBarWriter
@@ -892,6 +1070,11 @@ class BcolzMinuteBarReader(MinuteBarReader):
     rootdir : string
         The root directory containing the metadata and asset bcolz
         directories.
+    sid_cache_size : int, optional
+        The number of carrays to keep open per field.
+    shared_cache : SharedArrayCache, optional
+        Cache of the decompressed carrays shared by all of the processes
+        reading the data on this host.
 
     See Also
     --------
@@ -899,8 +1082,9 @@ class BcolzMinuteBarReader(MinuteBarReader):
     """
     FIELDS = ('open', 'high', 'low', 'close', 'volume')
 
-    def __init__(self, rootdir, sid_cache_size=1000):
+    def __init__(self, rootdir, sid_cache_size=1000, shared_cache=None):
         self._rootdir = rootdir
+        self._shared_cache = shared_cache
 
         metadata = self._get_metadata()
 
@@ -938,6 +1122,13 @@ class BcolzMinuteBarReader(MinuteBarReader):
         self._last_get_value_dt_position = None
         self._last_get_value_dt_value = None
 
+        # The minutes of the session read by the last get_values call:
+        # (field, sid) -> values, and field -> values of _value_blocks_sids.
+        self._value_rows = {}
+        self._value_blocks = {}
+        self._value_blocks_session = None
+        self._value_blocks_sids = None
+
         # This is to avoid any bad data or other performance-killing situation
         # where there a consecutive streak of 0 (no volume) starting at an
         # asset's start date.
@@ -1051,15 +1242,35 @@ class BcolzMinuteBarReader(MinuteBarReader):
         # carrays are subdirectories of the sid's rootdir
         return os.path.join(self._rootdir, sid_subdir, field)
 
+    def attach_shared_cache(self, shared_cache):
+        """Read the decompressed carrays from ``shared_cache``.
+
+        Parameters
+        ----------
+        shared_cache : SharedArrayCache
+            The host wide cache of the carrays.
+        """
+        self._shared_cache = shared_cache
+        for carrays in itervalues(self._carrays):
+            carrays.clear()
+
     def _open_minute_file(self, field, sid):
         sid = int(sid)
 
         try:
             carray = self._carrays[field][sid]
         except KeyError:
-            carray = self._carrays[field][sid] = \
-                bcolz.carray(rootdir=self._get_carray_path(sid, field),
-                             mode='r')
+            path = self._get_carray_path(sid, field)
+            stored = bcolz.carray(rootdir=path, mode='r')
+            if self._shared_cache is None:
+                carray = stored
+            else:
+                # The decompressed array is indexed like the carray.
+                carray = self._shared_cache.get(
+                    ('minute', os.path.realpath(path), len(stored)),
+                    lambda: stored[:],
+                )
+            self._carrays[field][sid] = carray
 
         return carray
 
@@ -1104,16 +1315,7 @@ class BcolzMinuteBarReader(MinuteBarReader):
             Returns the integer value of the volume.
             (A volume of 0 signifies no trades for the given dt.)
         """
-        if self._last_get_value_dt_value == dt.value:
-            minute_pos = self._last_get_value_dt_position
-        else:
-            try:
-                minute_pos = self._find_position_of_minute(dt)
-            except ValueError:
-                raise NoDataOnDate()
-
-            self._last_get_value_dt_value = dt.value
-            self._last_get_value_dt_position = minute_pos
+        minute_pos = self._get_value_position(dt)
 
         try:
             value = self._open_minute_file(field, sid)[minute_pos]
@@ -1129,6 +1331,106 @@ class BcolzMinuteBarReader(MinuteBarReader):
             value *= self._ohlc_ratio_inverse_for_sid(sid)
         return value
 
+    def get_values(self, sids, dt, fields):
+        """
+        Retrieve the pricing info for many sids and fields at the given dt.
+
+        Parameters:
+        -----------
+        sids : iterable[int]
+            Asset identifiers.
+        dt : datetime-like
+            The datetime at which the trades occurred.
+        fields : iterable[str]
+            The types of pricing data to retrieve.
+            ('open', 'high', 'low', 'close', 'volume')
+
+        Returns:
+        --------
+        out : np.ndarray[float64]
+
+        An array of shape (len(fields), len(sids)) holding the market data
+        of ``fields[i]`` for ``sids[j]`` at ``out[i, j]``, with the same
+        conventions as ``get_value``: np.nan for OHLC and 0 for volume if no
+        trade occurred.
+        """
+        sids = list(sids)
+        fields = list(fields)
+        minute_pos = self._get_value_position(dt)
+        offset = minute_pos % self._minutes_per_day
+        blocks = self._session_value_blocks(minute_pos - offset, sids, fields)
+
+        out = np.empty((len(fields), len(sids)), dtype=np.float64)
+        for i, field in enumerate(fields):
+            out[i] = blocks[field][:, offset]
+
+        ohlc = np.array([field != 'volume' for field in fields])
+        if ohlc.any():
+            ohlc_values = out[ohlc]
+            ohlc_values[ohlc_values == 0] = np.nan
+            ohlc_values *= np.array([self._ohlc_ratio_inverse_for_sid(sid)
+                                     for sid in sids])
+            out[ohlc] = ohlc_values
+
+        return out
+
+    def _session_value_blocks(self, session_start, sids, fields):
+        """Return, for each of ``fields``, an array of shape
+        (len(sids), minutes_per_day) holding the values of ``sids`` over the
+        session whose first minute is at ``session_start``.
+
+        The blocks are kept until the session or the sids change, so every
+        (field, sid) is read from its carray once per session.
+        """
+        if session_start != self._value_blocks_session:
+            self._value_rows.clear()
+            self._value_blocks.clear()
+            self._value_blocks_session = session_start
+            self._value_blocks_sids = None
+        if sids != self._value_blocks_sids:
+            self._value_blocks.clear()
+            self._value_blocks_sids = sids
+
+        blocks = self._value_blocks
+        for field in fields:
+            if field in blocks:
+                continue
+            block = np.empty((len(sids), self._minutes_per_day),
+                             dtype=np.uint32)
+            for j, sid in enumerate(sids):
+                block[j] = self._session_value_row(field, sid, session_start)
+            blocks[field] = block
+
+        return blocks
+
+    def _session_value_row(self, field, sid, session_start):
+        try:
+            return self._value_rows[field, sid]
+        except KeyError:
+            pass
+
+        values = self._open_minute_file(field, sid)[
+            session_start:session_start + self._minutes_per_day
+        ]
+        # A sid's table ends with its last written minute.
+        row = np.zeros(self._minutes_per_day, dtype=np.uint32)
+        row[:len(values)] = values
+        self._value_rows[field, sid] = row
+        return row
+
+    def _get_value_position(self, dt):
+        if self._last_get_value_dt_value == dt.value:
+            return self._last_get_value_dt_position
+
+        try:
+            minute_pos = self._find_position_of_minute(dt)
+        except ValueError:
+            raise NoDataOnDate()
+
+        self._last_get_value_dt_value = dt.value
+        self._last_get_value_dt_position = minute_pos
+        return minute_pos
+
     def get_last_traded_dt(self, asset, dt):
         minute_pos = self._find_last_traded_position(asset, dt)
         if minute_pos == -1:
@@ -0,0 +1,789 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Minute bars stored as uncompressed, memory-mapped matrices.
+
+Every field is a single uint32 file holding a (minute position, sid column)
+matrix, so reads of any asset are served from the OS page cache and the
+pages are shared between all the processes reading the same data. A
+(session, sid column) index of the last traded minutes spares the reader
+from scanning a column backwards over many sessions.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from zipline.data._minute_bar_internal import find_position_of_minute
+from zipline.data.minute_bars import (
+    BcolzMinuteBarMetadata,
+    BcolzMinuteBarReader,
+    BcolzMinuteOverlappingData,
+    BcolzMinuteWriterColumnMismatch,
+    OHLC_RATIO,
+    _calc_minute_index,
+    convert_cols,
+)
+from zipline.gens.sim_engine import NANOS_IN_MINUTE
+from zipline.utils.cli import maybe_show_progress
+
+SIDS_FILENAME = 'sids.npy'
+LENGTHS_FILENAME = 'lengths.i64'
+LAST_TRADED_FILENAME = 'last_traded.i64'
+ATTRS_FILENAME = 'attrs.json'
+
+COL_NAMES = ('open', 'high', 'low', 'close', 'volume')
+
+
+def _field_path(rootdir, field):
+    return os.path.join(rootdir, '{0}.u32'.format(field))
+
+
+def _read_sids(rootdir):
+    return np.load(os.path.join(rootdir, SIDS_FILENAME))
+
+
+def _open_memmap(path, dtype, shape):
+    """
+    Map a file of the data set read only, checking that it holds at least
+    the values of ``shape``.
+
+    Raises
+    ------
+    ValueError
+        If the file is smaller than ``shape``, e.g. because it was truncated
+        or is still being written.
+    """
+    expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    size = os.path.getsize(path)
+    if size < expected:
+        raise ValueError(
+            "{0} holds {1} bytes, but the minute bar metadata calls for at "
+            "least {2} bytes ({3} {4} values). The file may be truncated or "
+            "still being written.".format(
+                path, size, expected, shape, np.dtype(dtype).name,
+            )
+        )
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+
+def has_mmap_minute_bars(rootdir):
+    """Whether ``rootdir`` holds minute bars written by MmapMinuteBarWriter.
+    """
+    return os.path.exists(os.path.join(rootdir, SIDS_FILENAME))
+
+
+def _sid_columns(all_sids, sids):
+    """
+    Map sids to their columns in the matrices of a dataset.
+
+    Parameters
+    ----------
+    all_sids : np.ndarray[int64]
+        The sorted sids of the dataset.
+    sids : iterable[int]
+        The sids to look up.
+
+    Returns
+    -------
+    columns : np.ndarray[intp]
+        The column of each sid.
+
+    Raises
+    ------
+    KeyError
+        If one of the sids is not part of the dataset.
+    """
+    sids = np.array([int(sid) for sid in sids], dtype=np.int64)
+    columns = all_sids.searchsorted(sids)
+    found = (columns < len(all_sids))
+    found[found] = all_sids[columns[found]] == sids[found]
+    if not found.all():
+        raise KeyError(
+            "sids {0} are not in the minute bar dataset".format(
+                sids[~found].tolist()
+            )
+        )
+    return columns
+
+
+class MmapMinuteBarWriter(object):
+    """
+    Class capable of writing minute OHLCV data to disk into memory-mapped
+    matrices.
+
+    Parameters
+    ----------
+    rootdir : string
+        Path to the root directory into which to write the metadata and
+        field files.
+    calendar : zipline.utils.calendars.trading_calendar.TradingCalendar
+        The trading calendar on which to base the minute bars.
+    start_session : datetime
+        The first trading session in the data set.
+    end_session : datetime
+        The last trading session in the data set.
+    minutes_per_day : int
+        The number of minutes per each period.
+    sids : iterable[int]
+        The sids of every asset in the data set.
+    default_ohlc_ratio : int, optional
+        The default ratio by which to multiply the pricing data to
+        convert from floats to integers that fit within np.uint32. If
+        ohlc_ratios_per_sid is None or does not contain a mapping for a
+        given sid, this ratio is used. Default is OHLC_RATIO (1000).
+    ohlc_ratios_per_sid : dict, optional
+        A dict mapping each sid in the output to the ratio by which to
+        multiply the pricing data to convert the floats from floats to
+        an integer to fit within the np.uint32.
+    write_metadata : bool, optional
+        If True, writes the minute bar metadata and the sids (on init of the
+        writer). If False, the existing metadata is retained.
+        Default is True.
+
+    Notes
+    -----
+    The data set is laid out like the one of the BcolzMinuteBarWriter: the
+    minute positions are a repeating period of ``minutes_per_day`` minutes
+    starting from each market open, and the metadata is the same
+    ``metadata.json``. Instead of a bcolz table per sid, each field is a
+    single uncompressed file holding a uint32 matrix with a row per minute
+    position and a column per sid, in the order of ``sids.npy``.
+
+    The files are created at their full size, so minutes which were never
+    written read as zeros, i.e. no trade. Extending the data set to a later
+    ``end_session`` only appends rows; the set of sids is fixed when the data
+    set is created.
+
+    ``last_traded.i64`` holds, for each session and sid, one plus the
+    position of the last minute with volume up to the end of the session, or
+    0 if the sid never traded by then. It is updated on every write.
+
+    See Also
+    --------
+    zipline.data.mmap_minute_bars.MmapMinuteBarReader
+    zipline.data.minute_bars.BcolzMinuteBarWriter
+    """
+    COL_NAMES = COL_NAMES
+
+    def __init__(self,
+                 rootdir,
+                 calendar,
+                 start_session,
+                 end_session,
+                 minutes_per_day,
+                 sids,
+                 default_ohlc_ratio=OHLC_RATIO,
+                 ohlc_ratios_per_sid=None,
+                 write_metadata=True):
+
+        self._rootdir = rootdir
+        self._start_session = start_session
+        self._end_session = end_session
+        self._calendar = calendar
+        slicer = (
+            calendar.schedule.index.slice_indexer(start_session, end_session))
+        self._schedule = calendar.schedule[slicer]
+        self._session_labels = self._schedule.index
+        self._minutes_per_day = minutes_per_day
+        self._default_ohlc_ratio = default_ohlc_ratio
+        self._ohlc_ratios_per_sid = ohlc_ratios_per_sid
+
+        self._minute_index = _calc_minute_index(
+            self._schedule.market_open, self._minutes_per_day)
+
+        self._sids = np.unique(np.asarray(sids, dtype=np.int64))
+
+        if write_metadata:
+            sids_path = os.path.join(self._rootdir, SIDS_FILENAME)
+            if os.path.exists(sids_path):
+                if not np.array_equal(_read_sids(self._rootdir), self._sids):
+                    raise ValueError(
+                        "{0} already holds minute bars of other sids".format(
+                            self._rootdir,
+                        )
+                    )
+            else:
+                np.save(sids_path, self._sids)
+
+            metadata = BcolzMinuteBarMetadata(
+                self._default_ohlc_ratio,
+                self._ohlc_ratios_per_sid,
+                self._calendar,
+                self._start_session,
+                self._end_session,
+                self._minutes_per_day,
+            )
+            metadata.write(self._rootdir)
+
+        last_traded_path = os.path.join(self._rootdir, LAST_TRADED_FILENAME)
+        index_missing = not os.path.exists(last_traded_path)
+        self._open_files(len(self._minute_index), shrink=False)
+        if index_missing:
+            # The data set was written before the index existed.
+            for column, length in enumerate(self._lengths):
+                if length:
+                    self._index_last_traded(column, 0, length)
+            self.flush()
+
+    @classmethod
+    def open(cls, rootdir, end_session=None):
+        """
+        Open an existing ``rootdir`` for writing.
+
+        Parameters
+        ----------
+        end_session : Timestamp (optional)
+            When appending, the intended new ``end_session``.
+        """
+        metadata = BcolzMinuteBarMetadata.read(rootdir)
+        return cls(
+            rootdir,
+            metadata.calendar,
+            metadata.start_session,
+            end_session if end_session is not None else metadata.end_session,
+            metadata.minutes_per_day,
+            _read_sids(rootdir),
+            metadata.default_ohlc_ratio,
+            metadata.ohlc_ratios_per_sid,
+            write_metadata=end_session is not None
+        )
+
+    def _open_files(self, num_minutes, shrink):
+        num_sids = len(self._sids)
+
+        def resize(path, size):
+            # Opening in append mode creates the file if it does not exist
+            # yet; growing it with truncate does not allocate the zeros.
+            with open(path, 'ab') as f:
+                if shrink or os.path.getsize(path) < size:
+                    f.truncate(size)
+
+        self._columns = {}
+        for field in self.COL_NAMES:
+            path = _field_path(self._rootdir, field)
+            resize(path, num_minutes * num_sids * np.dtype(np.uint32).itemsize)
+            self._columns[field] = np.memmap(
+                path,
+                dtype=np.uint32,
+                mode='r+',
+                shape=(num_minutes, num_sids),
+            )
+
+        path = os.path.join(self._rootdir, LENGTHS_FILENAME)
+        resize(path, num_sids * np.dtype(np.int64).itemsize)
+        self._lengths = np.memmap(path,
+                                  dtype=np.int64,
+                                  mode='r+',
+                                  shape=(num_sids,))
+
+        num_sessions = num_minutes // self._minutes_per_day
+        path = os.path.join(self._rootdir, LAST_TRADED_FILENAME)
+        resize(path, num_sessions * num_sids * np.dtype(np.int64).itemsize)
+        self._last_traded = np.memmap(path,
+                                      dtype=np.int64,
+                                      mode='r+',
+                                      shape=(num_sessions, num_sids))
+
+    @property
+    def first_trading_day(self):
+        return self._start_session
+
+    @property
+    def sids(self):
+        return self._sids
+
+    def ohlc_ratio_for_sid(self, sid):
+        if self._ohlc_ratios_per_sid is not None:
+            try:
+                return self._ohlc_ratios_per_sid[sid]
+            except KeyError:
+                pass
+
+        # If no ohlc_ratios_per_sid dict is passed, or if the specified
+        # sid is not in the dict, fallback to the general ohlc_ratio.
+        return self._default_ohlc_ratio
+
+    def last_date_in_output_for_sid(self, sid):
+        """
+        Parameters:
+        -----------
+        sid : int
+            Asset identifier.
+
+        Returns:
+        --------
+        out : pd.Timestamp
+            The midnight of the last date written in to the output for the
+            given sid.
+        """
+        column = _sid_columns(self._sids, [sid])[0]
+        num_days = int(self._lengths[column]) // self._minutes_per_day
+        if num_days == 0:
+            return pd.NaT
+        return self._session_labels[num_days - 1]
+
+    def set_sid_attrs(self, sid, **kwargs):
+        """Write all the supplied kwargs as attributes of the sid.
+        """
+        path = os.path.join(self._rootdir, ATTRS_FILENAME)
+        try:
+            with open(path) as fp:
+                attrs = json.load(fp)
+        except IOError:
+            attrs = {}
+        attrs.setdefault(str(int(sid)), {}).update(kwargs)
+        with open(path, 'w') as fp:
+            json.dump(attrs, fp)
+
+    def write(self, data, show_progress=False, invalid_data_behavior='warn'):
+        """Write a stream of minute data.
+
+        Parameters
+        ----------
+        data : iterable[(int, pd.DataFrame)]
+            The data to write. Each element should be a tuple of sid, data
+            where data has the following format:
+              columns : ('open', 'high', 'low', 'close', 'volume')
+                  open : float64
+                  high : float64
+                  low  : float64
+                  close : float64
+                  volume : float64|int64
+              index : DatetimeIndex of market minutes.
+            A given sid may appear more than once in ``data``; however,
+            the dates must be strictly increasing.
+        show_progress : bool, optional
+            Whether or not to show a progress bar while writing.
+        """
+        ctx = maybe_show_progress(
+            data,
+            show_progress=show_progress,
+            item_show_func=lambda e: e if e is None else str(e[0]),
+            label="Merging minute equity files:",
+        )
+        write_sid = self.write_sid
+        with ctx as it:
+            for e in it:
+                write_sid(*e, invalid_data_behavior=invalid_data_behavior)
+        self.flush()
+
+    def write_sid(self, sid, df, invalid_data_behavior='warn'):
+        """
+        Write the OHLCV data for the given sid.
+
+        Parameters:
+        -----------
+        sid : int
+            The asset identifer for the data being written.
+        df : pd.DataFrame
+            DataFrame of market data with the following characteristics.
+            columns : ('open', 'high', 'low', 'close', 'volume')
+                open : float64
+                high : float64
+                low  : float64
+                close : float64
+                volume : float64|int64
+            index : DatetimeIndex of market minutes.
+        """
+        cols = {
+            'open': df.open.values,
+            'high': df.high.values,
+            'low': df.low.values,
+            'close': df.close.values,
+            'volume': df.volume.values,
+        }
+        dts = df.index.values
+        # Call internal method, since DataFrame has already ensured matching
+        # index and value lengths.
+        self._write_cols(sid, dts, cols, invalid_data_behavior)
+
+    def write_cols(self, sid, dts, cols, invalid_data_behavior='warn'):
+        """
+        Write the OHLCV data for the given sid.
+
+        Parameters:
+        -----------
+        sid : int
+            The asset identifier for the data being written.
+        dts : datetime64 array
+            The dts corresponding to values in cols.
+        cols : dict of str -> np.array
+            dict of market data with the following characteristics.
+            keys are ('open', 'high', 'low', 'close', 'volume')
+            open : float64
+            high : float64
+            low  : float64
+            close : float64
+            volume : float64|int64
+        """
+        if not all(len(dts) == len(cols[name]) for name in self.COL_NAMES):
+            raise BcolzMinuteWriterColumnMismatch(
+                "Length of dts={0} should match cols: {1}".format(
+                    len(dts),
+                    " ".join("{0}={1}".format(name, len(cols[name]))
+                             for name in self.COL_NAMES)))
+        self._write_cols(sid, dts, cols, invalid_data_behavior)
+
+    def _write_cols(self, sid, dts, cols, invalid_data_behavior):
+        if not len(dts):
+            return
+
+        column = _sid_columns(self._sids, [sid])[0]
+        positions = self._minute_index.values.searchsorted(
+            dts.astype('datetime64[ns]'),
+        )
+
+        num_rec_mins = self._lengths[column]
+        if positions[0] < num_rec_mins:
+            raise BcolzMinuteOverlappingData(
+                "Data with last_date={0} already includes input start={1} "
+                "for sid={2}".format(
+                    self.last_date_in_output_for_sid(sid),
+                    pd.Timestamp(dts[0], tz='UTC'),
+                    sid,
+                )
+            )
+
+        converted = convert_cols(cols,
+                                 self.ohlc_ratio_for_sid(sid),
+                                 sid,
+                                 invalid_data_behavior)
+        for field, values in zip(self.COL_NAMES, converted):
+            self._columns[field][positions, column] = values
+
+        self._lengths[column] = positions[-1] + 1
+        self._index_last_traded(column, num_rec_mins, positions[-1] + 1)
+
+    def _index_last_traded(self, column, start, end):
+        """
+        Update the last traded minutes of the sessions from the one holding
+        the minute position ``start - 1`` to the one holding ``end - 1``.
+        """
+        minutes_per_day = self._minutes_per_day
+        first = max(start - 1, 0) // minutes_per_day
+        last = (end - 1) // minutes_per_day
+
+        volumes = self._columns['volume'][
+            first * minutes_per_day:(last + 1) * minutes_per_day, column
+        ]
+        traded = volumes.reshape(-1, minutes_per_day) != 0
+        # One plus the position of the last minute with volume in each
+        # session, or 0.
+        last_in_session = np.where(
+            traded.any(axis=1),
+            (np.arange(first, last + 1) + 1) * minutes_per_day -
+            traded[:, ::-1].argmax(axis=1),
+            0,
+        )
+
+        previous = self._last_traded[first - 1, column] if first else 0
+        self._last_traded[first:last + 1, column] = np.maximum.accumulate(
+            np.append(previous, last_in_session),
+        )[1:]
+
+    def flush(self):
+        """Flush the written data to disk.
+        """
+        for matrix in self._columns.values():
+            matrix.flush()
+        self._lengths.flush()
+        self._last_traded.flush()
+
+    def data_len_for_day(self, day):
+        """
+        Return the number of data points up to and including the
+        provided day.
+        """
+        day_ix = self._session_labels.get_loc(day)
+        # Add one to the 0-indexed day_ix to get the number of days.
+        num_days = day_ix + 1
+        return num_days * self._minutes_per_day
+
+    def truncate(self, date):
+        """Truncate data beyond this date in all the field files."""
+        num_minutes = self.data_len_for_day(date)
+
+        self.flush()
+        lengths = np.minimum(self._lengths, num_minutes)
+        # The maps need to be released before the files can shrink. The
+        # last traded minutes of the sessions which are kept don't change.
+        del self._columns, self._lengths, self._last_traded
+        self._open_files(num_minutes, shrink=True)
+        self._lengths[:] = lengths
+        self.flush()
+
+        # Update end session in metadata.
+        metadata = BcolzMinuteBarMetadata.read(self._rootdir)
+        metadata.end_session = date
+        metadata.write(self._rootdir)
+
+
+class MmapMinuteBarReader(BcolzMinuteBarReader):
+    """
+    Reader for data written by MmapMinuteBarWriter
+
+    Parameters:
+    -----------
+    rootdir : string
+        The root directory containing the metadata and the field files.
+
+    Raises
+    ------
+    ValueError
+        If a file is smaller than the metadata calls for.
+
+    Notes
+    -----
+    The field files are mapped read only, so all the processes reading the
+    same data set share the physical pages.
+
+    ``get_last_traded_dt`` scans at most the session of the given minute,
+    and then looks up the index of the last traded minutes written with the
+    data.
+
+    See Also
+    --------
+    zipline.data.mmap_minute_bars.MmapMinuteBarWriter
+    """
+    def __init__(self, rootdir):
+        super(MmapMinuteBarReader, self).__init__(rootdir)
+
+        self._sids = _read_sids(rootdir)
+        # The files may hold more minutes than the sessions of the metadata,
+        # e.g. while a writer is extending the data set.
+        num_sessions = len(self._market_opens)
+        num_sids = len(self._sids)
+        shape = num_sessions * self._minutes_per_day, num_sids
+        self._columns = {
+            field: _open_memmap(_field_path(rootdir, field), np.uint32, shape)
+            for field in self.FIELDS
+        }
+        self._lengths = _open_memmap(
+            os.path.join(rootdir, LENGTHS_FILENAME),
+            np.int64,
+            (num_sids,),
+        )
+
+        last_traded_path = os.path.join(rootdir, LAST_TRADED_FILENAME)
+        if os.path.exists(last_traded_path):
+            self._last_traded = _open_memmap(
+                last_traded_path,
+                np.int64,
+                (num_sessions, num_sids),
+            )
+        else:
+            # Written before the index existed, scan the volumes instead.
+            self._last_traded = None
+
+        # A sid's column is reused for every field; look it up once.
+        self._sid_column_cache = {}
+
+        try:
+            with open(os.path.join(rootdir, ATTRS_FILENAME)) as fp:
+                self._attrs = json.load(fp)
+        except IOError:
+            self._attrs = {}
+
+    def _sid_column(self, sid):
+        try:
+            return self._sid_column_cache[sid]
+        except KeyError:
+            column = self._sid_column_cache[sid] = _sid_columns(
+                self._sids, [sid],
+            )[0]
+            return column
+
+    def _open_minute_file(self, field, sid):
+        column = self._sid_column(int(sid))
+        # Limit the view to the written minutes, like the bcolz tables.
+        return self._columns[field][:self._lengths[column], column]
+
+    def get_sid_attr(self, sid, name):
+        return self._attrs.get(str(int(sid)), {}).get(name)
+
+    def _find_last_traded_position(self, asset, dt):
+        if self._last_traded is None:
+            return super(MmapMinuteBarReader, self)._find_last_traded_position(
+                asset, dt,
+            )
+
+        dt_minute = dt.value // NANOS_IN_MINUTE
+        if (dt_minute < asset.start_date.value // NANOS_IN_MINUTE or
+                dt_minute < self._market_open_values[0]):
+            return -1
+
+        volumes = self._open_minute_file('volume', asset.sid)
+        if not len(volumes):
+            return -1
+
+        minutes_per_day = self._minutes_per_day
+        pos = min(
+            find_position_of_minute(
+                self._market_open_values,
+                self._market_close_values,
+                dt_minute,
+                minutes_per_day,
+                True,
+            ),
+            len(volumes) - 1,
+        )
+
+        # Only the minutes of the session up to ``pos`` are scanned, the
+        # earlier sessions are looked up in the index.
+        session = pos // minutes_per_day
+        session_start = session * minutes_per_day
+        traded = np.flatnonzero(volumes[session_start:pos + 1])
+        if len(traded):
+            pos = session_start + traded[-1]
+        elif session:
+            pos = self._last_traded[session - 1,
+                                    self._sid_column(asset.sid)] - 1
+        else:
+            pos = -1
+
+        if pos != -1 and self._pos_to_minute(pos) < asset.start_date:
+            return -1
+        return pos
+
+    def get_values(self, sids, dt, fields):
+        sids = list(sids)
+        fields = list(fields)
+        minute_pos = self._get_value_position(dt)
+        columns = _sid_columns(self._sids, sids)
+
+        # Minutes which were never written are zeros in the files, they do
+        # not need to be told apart from minutes without a trade.
+        out = np.empty((len(fields), len(sids)), dtype=np.float64)
+        for i, field in enumerate(fields):
+            out[i] = self._columns[field][minute_pos, columns]
+
+        ohlc = np.array([field != 'volume' for field in fields])
+        if ohlc.any():
+            ohlc_values = out[ohlc]
+            ohlc_values[ohlc_values == 0] = np.nan
+            ohlc_values *= np.array([self._ohlc_ratio_inverse_for_sid(sid)
+                                     for sid in sids])
+            out[ohlc] = ohlc_values
+
+        return out
+
+    def load_raw_arrays(self, fields, start_dt, end_dt, sids):
+        """
+        Parameters
+        ----------
+        fields : list of str
+           'open', 'high', 'low', 'close', or 'volume'
+        start_dt: Timestamp
+           Beginning of the window range.
+        end_dt: Timestamp
+           End of the window range.
+        sids : list of int
+           The asset identifiers in the window.
+
+        Returns
+        -------
+        list of np.ndarray
+            A list with an entry per field of ndarrays with shape
+            (minutes in range, sids) with a dtype of float64, containing the
+            values for the respective field over start and end dt range.
+        """
+        start_idx = self._find_position_of_minute(start_dt)
+        end_idx = self._find_position_of_minute(end_dt)
+
+        positions = np.arange(start_idx, end_idx + 1)
+        indices_to_exclude = self._exclusion_indices_for_range(
+            start_idx, end_idx)
+        if indices_to_exclude is not None:
+            keep = np.ones(len(positions), dtype=bool)
+            for excl_start, excl_stop in indices_to_exclude:
+                keep[excl_start - start_idx:excl_stop - start_idx + 1] = False
+            positions = positions[keep]
+
+        columns = _sid_columns(self._sids, sids)
+        ohlc_inverses = np.array([self._ohlc_ratio_inverse_for_sid(sid)
+                                  for sid in sids])
+
+        index = np.ix_(positions, columns)
+
+        results = []
+        for field in fields:
+            values = self._columns[field][index]
+            if field != 'volume':
+                out = values.astype(np.float64)
+                out[values == 0] = np.nan
+                out *= ohlc_inverses
+            else:
+                out = values.astype(np.uint32)
+            results.append(out)
+        return results
+
+
+def write_from_reader(reader, sids, rootdir, show_progress=False):
+    """
+    Copy the minute bars of ``sids`` from another minute bar reader, e.g. a
+    BcolzMinuteBarReader, into a new memory-mapped data set.
+
+    Parameters
+    ----------
+    reader : BcolzMinuteBarReader
+        The reader to copy the data from.
+    sids : iterable[int]
+        The sids to copy.
+    rootdir : string
+        The root directory of the new data set.
+    show_progress : bool, optional
+        Whether or not to show a progress bar while writing.
+
+    Returns
+    -------
+    writer : MmapMinuteBarWriter
+        The writer of the new data set.
+
+    Notes
+    -----
+    Both formats share the metadata file, so ``rootdir`` may be the root
+    directory of the bcolz data itself. Bundles are loaded with the
+    MmapMinuteBarReader once the memory-mapped files exist.
+    """
+    metadata = reader._get_metadata()
+    writer = MmapMinuteBarWriter(
+        rootdir,
+        metadata.calendar,
+        metadata.start_session,
+        metadata.end_session,
+        metadata.minutes_per_day,
+        sids,
+        metadata.default_ohlc_ratio,
+        metadata.ohlc_ratios_per_sid,
+    )
+
+    sids = writer.sids
+    ctx = maybe_show_progress(
+        sids,
+        show_progress=show_progress,
+        label="Copying minute bars:",
+    )
+    with ctx as it:
+        for sid in it:
+            column = _sid_columns(sids, [sid])[0]
+            for field in COL_NAMES:
+                # The raw values are copied, so they keep their ohlc ratio.
+                values = reader._open_minute_file(field, sid)[:]
+                writer._columns[field][:len(values), column] = values
+            writer._lengths[column] = len(values)
+            if len(values):
+                writer._index_last_traded(column, 0, len(values))
+
+    writer.flush()
+    return writer
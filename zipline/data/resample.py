@@ -16,7 +16,7 @@ from abc import ABCMeta, abstractmethod
 
 import numpy as np
 import pandas as pd
-from six import with_metaclass
+from six import iteritems, with_metaclass
 
 from zipline.data._resample import (
     _minute_to_session_open,
@@ -149,7 +149,6 @@ class DailyHistoryAggregator(object):
 
     def _prelude(self, dt, field):
         session = self._trading_calendar.minute_to_session_label(dt)
-        dt_value = dt.value
         cache = self._caches[field]
         if cache is None or cache[0] != session:
             market_open = self._market_opens.loc[session]
@@ -157,11 +156,117 @@ class DailyHistoryAggregator(object):
 
         _, market_open, entries = cache
         market_open = market_open.tz_localize('UTC')
-        if dt != market_open:
-            prev_dt = dt_value - self._one_min
+        return session, market_open, dt.value, entries
+
+    def _aggregate(self, field, assets, dt):
+        """
+        Aggregate ``field`` from the market open up to and including ``dt``
+        for all of ``assets``.
+
+        The cached aggregate of each asset is extended with the minutes after
+        the last dt it was computed for. Assets which were last visited at the
+        same dt are read together, with a single call to the minute reader,
+        and the block of minutes is reduced with the session resampling
+        kernels.
+        """
+        session, market_open, dt_value, entries = self._prelude(dt, field)
+
+        if field == 'volume':
+            out = np.zeros(len(assets), dtype=np.int64)
         else:
-            prev_dt = None
-        return market_open, prev_dt, dt_value, entries
+            out = np.full(len(assets), np.nan)
+
+        # Maps the first minute to read -> list of (index, asset, aggregate
+        # up to that minute).
+        windows = {}
+        for i, asset in enumerate(assets):
+            if not asset.is_alive_for_session(session):
+                continue
+
+            try:
+                last_visited_dt, last_value = entries[asset]
+            except KeyError:
+                last_visited_dt = None
+
+            if last_visited_dt is None or last_visited_dt > dt_value:
+                start = market_open.value
+                last_value = 0 if field == 'volume' else np.nan
+            elif last_visited_dt == dt_value:
+                out[i] = last_value
+                continue
+            elif field == 'open' and not np.isnan(last_value):
+                # The open does not change once it has been seen.
+                out[i] = last_value
+                entries[asset] = (dt_value, last_value)
+                continue
+            else:
+                start = last_visited_dt + self._one_min
+
+            windows.setdefault(start, []).append((i, asset, last_value))
+
+        for start, window_entries in iteritems(windows):
+            indices, window_assets, last_values = zip(*window_entries)
+            values = self._combine(
+                field,
+                np.array(last_values),
+                self._reduce_window(
+                    field,
+                    self._minute_reader.load_raw_arrays(
+                        [field],
+                        pd.Timestamp(start, tz='UTC'),
+                        dt,
+                        list(window_assets),
+                    )[0],
+                ),
+            )
+            out[list(indices)] = values
+            for asset, value in zip(window_assets, values):
+                entries[asset] = (dt_value, value)
+
+        return out
+
+    @staticmethod
+    def _reduce_window(field, window):
+        """
+        Reduce a (minutes, assets) block of minute data to one value per
+        asset.
+
+        The columns are laid out one after the other, so that each asset is
+        resampled like a session by the kernels behind ``minute_to_session``.
+        """
+        num_minutes, num_assets = window.shape
+        if field == 'volume':
+            data = window.T.astype(np.uint32).ravel()
+            out = np.zeros(num_assets, dtype=np.uint32)
+        else:
+            data = np.ascontiguousarray(window.T, dtype=np.float64).ravel()
+            out = np.full(num_assets, np.nan)
+
+        if num_minutes:
+            close_locs = np.arange(
+                num_minutes - 1,
+                num_minutes * num_assets,
+                num_minutes,
+                dtype=np.intp,
+            )
+            minute_to_session(field, close_locs, data, out)
+        return out
+
+    @staticmethod
+    def _combine(field, last_values, values):
+        """
+        Combine the aggregates up to the last visited dt with the aggregates
+        of the minutes since then.
+        """
+        if field == 'open':
+            return np.where(np.isnan(last_values), values, last_values)
+        elif field == 'high':
+            return np.fmax(last_values, values)
+        elif field == 'low':
+            return np.fmin(last_values, values)
+        elif field == 'close':
+            return np.where(np.isnan(values), last_values, values)
+        return last_values.astype(np.int64) + values
 
     def opens(self, assets, dt):
         """
@@ -176,64 +281,7 @@ class DailyHistoryAggregator(object):
         -------
         np.array with dtype=float64, in order of assets parameter.
         """
-        market_open, prev_dt, dt_value, entries = self._prelude(dt, 'open')
-
-        opens = []
-        session_label = self._trading_calendar.minute_to_session_label(dt)
-
-        for asset in assets:
-            if not asset.is_alive_for_session(session_label):
-                opens.append(np.NaN)
-                continue
-
-            if prev_dt is None:
-                val = self._minute_reader.get_value(asset, dt, 'open')
-                entries[asset] = (dt_value, val)
-                opens.append(val)
-                continue
-            else:
-                try:
-                    last_visited_dt, first_open = entries[asset]
-                    if last_visited_dt == dt_value:
-                        opens.append(first_open)
-                        continue
-                    elif not pd.isnull(first_open):
-                        opens.append(first_open)
-                        entries[asset] = (dt_value, first_open)
-                        continue
-                    else:
-                        after_last = pd.Timestamp(
-                            last_visited_dt + self._one_min, tz='UTC')
-                        window = self._minute_reader.load_raw_arrays(
-                            ['open'],
-                            after_last,
-                            dt,
-                            [asset],
-                        )[0]
-                        nonnan = window[~pd.isnull(window)]
-                        if len(nonnan):
-                            val = nonnan[0]
-                        else:
-                            val = np.nan
-                        entries[asset] = (dt_value, val)
-                        opens.append(val)
-                        continue
-                except KeyError:
-                    window = self._minute_reader.load_raw_arrays(
-                        ['open'],
-                        market_open,
-                        dt,
-                        [asset],
-                    )[0]
-                    nonnan = window[~pd.isnull(window)]
-                    if len(nonnan):
-                        val = nonnan[0]
-                    else:
-                        val = np.nan
-                    entries[asset] = (dt_value, val)
-                    opens.append(val)
-                    continue
-        return np.array(opens)
+        return self._aggregate('open', assets, dt)
 
     def highs(self, assets, dt):
         """
@@ -245,64 +293,7 @@ class DailyHistoryAggregator(object):
         -------
         np.array with dtype=float64, in order of assets parameter.
         """
-        market_open, prev_dt, dt_value, entries = self._prelude(dt, 'high')
-
-        highs = []
-        session_label = self._trading_calendar.minute_to_session_label(dt)
-
-        for asset in assets:
-            if not asset.is_alive_for_session(session_label):
-                highs.append(np.NaN)
-                continue
-
-            if prev_dt is None:
-                val = self._minute_reader.get_value(asset, dt, 'high')
-                entries[asset] = (dt_value, val)
-                highs.append(val)
-                continue
-            else:
-                try:
-                    last_visited_dt, last_max = entries[asset]
-                    if last_visited_dt == dt_value:
-                        highs.append(last_max)
-                        continue
-                    elif last_visited_dt == prev_dt:
-                        curr_val = self._minute_reader.get_value(
-                            asset, dt, 'high')
-                        if pd.isnull(curr_val):
-                            val = last_max
-                        elif pd.isnull(last_max):
-                            val = curr_val
-                        else:
-                            val = max(last_max, curr_val)
-                        entries[asset] = (dt_value, val)
-                        highs.append(val)
-                        continue
-                    else:
-                        after_last = pd.Timestamp(
-                            last_visited_dt + self._one_min, tz='UTC')
-                        window = self._minute_reader.load_raw_arrays(
-                            ['high'],
-                            after_last,
-                            dt,
-                            [asset],
-                        )[0].T
-                        val = np.nanmax(np.append(window, last_max))
-                        entries[asset] = (dt_value, val)
-                        highs.append(val)
-                        continue
-                except KeyError:
-                    window = self._minute_reader.load_raw_arrays(
-                        ['high'],
-                        market_open,
-                        dt,
-                        [asset],
-                    )[0].T
-                    val = np.nanmax(window)
-                    entries[asset] = (dt_value, val)
-                    highs.append(val)
-                    continue
-        return np.array(highs)
+        return self._aggregate('high', assets, dt)
 
     def lows(self, assets, dt):
         """
@@ -314,59 +305,7 @@ class DailyHistoryAggregator(object):
         -------
         np.array with dtype=float64, in order of assets parameter.
         """
-        market_open, prev_dt, dt_value, entries = self._prelude(dt, 'low')
-
-        lows = []
-        session_label = self._trading_calendar.minute_to_session_label(dt)
-
-        for asset in assets:
-            if not asset.is_alive_for_session(session_label):
-                lows.append(np.NaN)
-                continue
-
-            if prev_dt is None:
-                val = self._minute_reader.get_value(asset, dt, 'low')
-                entries[asset] = (dt_value, val)
-                lows.append(val)
-                continue
-            else:
-                try:
-                    last_visited_dt, last_min = entries[asset]
-                    if last_visited_dt == dt_value:
-                        lows.append(last_min)
-                        continue
-                    elif last_visited_dt == prev_dt:
-                        curr_val = self._minute_reader.get_value(
-                            asset, dt, 'low')
-                        val = np.nanmin([last_min, curr_val])
-                        entries[asset] = (dt_value, val)
-                        lows.append(val)
-                        continue
-                    else:
-                        after_last = pd.Timestamp(
-                            last_visited_dt + self._one_min, tz='UTC')
-                        window = self._minute_reader.load_raw_arrays(
-                            ['low'],
-                            after_last,
-                            dt,
-                            [asset],
-                        )[0].T
-                        val = np.nanmin(np.append(window, last_min))
-                        entries[asset] = (dt_value, val)
-                        lows.append(val)
-                        continue
-                except KeyError:
-                    window = self._minute_reader.load_raw_arrays(
-                        ['low'],
-                        market_open,
-                        dt,
-                        [asset],
-                    )[0].T
-                    val = np.nanmin(window)
-                    entries[asset] = (dt_value, val)
-                    lows.append(val)
-                    continue
-        return np.array(lows)
+        return self._aggregate('low', assets, dt)
 
     def closes(self, assets, dt):
         """
@@ -380,69 +319,7 @@ class DailyHistoryAggregator(object):
         -------
         np.array with dtype=float64, in order of assets parameter.
         """
-        market_open, prev_dt, dt_value, entries = self._prelude(dt, 'close')
-
-        closes = []
-        session_label = self._trading_calendar.minute_to_session_label(dt)
-
-        def _get_filled_close(asset):
-            """
-            Returns the most recent non-nan close for the asset in this
-            session. If there has been no data in this session on or before the
-            `dt`, returns `nan`
-            """
-            window = self._minute_reader.load_raw_arrays(
-                ['close'],
-                market_open,
-                dt,
-                [asset],
-            )[0]
-            try:
-                return window[~np.isnan(window)][-1]
-            except IndexError:
-                return np.NaN
-
-        for asset in assets:
-            if not asset.is_alive_for_session(session_label):
-                closes.append(np.NaN)
-                continue
-
-            if prev_dt is None:
-                val = self._minute_reader.get_value(asset, dt, 'close')
-                entries[asset] = (dt_value, val)
-                closes.append(val)
-                continue
-            else:
-                try:
-                    last_visited_dt, last_close = entries[asset]
-                    if last_visited_dt == dt_value:
-                        closes.append(last_close)
-                        continue
-                    elif last_visited_dt == prev_dt:
-                        val = self._minute_reader.get_value(
-                            asset, dt, 'close')
-                        if pd.isnull(val):
-                            val = last_close
-                        entries[asset] = (dt_value, val)
-                        closes.append(val)
-                        continue
-                    else:
-                        val = self._minute_reader.get_value(
-                            asset, dt, 'close')
-                        if pd.isnull(val):
-                            val = _get_filled_close(asset)
-                        entries[asset] = (dt_value, val)
-                        closes.append(val)
-                        continue
-                except KeyError:
-                    val = self._minute_reader.get_value(
-                        asset, dt, 'close')
-                    if pd.isnull(val):
-                        val = _get_filled_close(asset)
-                    entries[asset] = (dt_value, val)
-                    closes.append(val)
-                    continue
-        return np.array(closes)
+        return self._aggregate('close', assets, dt)
 
     def volumes(self, assets, dt):
         """
@@ -454,59 +331,7 @@ class DailyHistoryAggregator(object):
         -------
         np.array with dtype=int64, in order of assets parameter.
         """
-        market_open, prev_dt, dt_value, entries = self._prelude(dt, 'volume')
-
-        volumes = []
-        session_label = self._trading_calendar.minute_to_session_label(dt)
-
-        for asset in assets:
-            if not asset.is_alive_for_session(session_label):
-                volumes.append(0)
-                continue
-
-            if prev_dt is None:
-                val = self._minute_reader.get_value(asset, dt, 'volume')
-                entries[asset] = (dt_value, val)
-                volumes.append(val)
-                continue
-            else:
-                try:
-                    last_visited_dt, last_total = entries[asset]
-                    if last_visited_dt == dt_value:
-                        volumes.append(last_total)
-                        continue
-                    elif last_visited_dt == prev_dt:
-                        val = self._minute_reader.get_value(
-                            asset, dt, 'volume')
-                        val += last_total
-                        entries[asset] = (dt_value, val)
-                        volumes.append(val)
-                        continue
-                    else:
-                        after_last = pd.Timestamp(
-                            last_visited_dt + self._one_min, tz='UTC')
-                        window = self._minute_reader.load_raw_arrays(
-                            ['volume'],
-                            after_last,
-                            dt,
-                            [asset],
-                        )[0]
-                        val = np.nansum(window) + last_total
-                        entries[asset] = (dt_value, val)
-                        volumes.append(val)
-                        continue
-                except KeyError:
-                    window = self._minute_reader.load_raw_arrays(
-                        ['volume'],
-                        market_open,
-                        dt,
-                        [asset],
-                    )[0]
-                    val = np.nansum(window)
-                    entries[asset] = (dt_value, val)
-                    volumes.append(val)
-                    continue
-        return np.array(volumes)
+        return self._aggregate('volume', assets, dt)
 
 
 class MinuteResampleSessionBarReader(SessionBarReader):
@@ -658,6 +483,18 @@ class ReindexBarReader(with_metaclass(ABCMeta)):
             else:
                 return np.nan
 
+    def get_values(self, sids, dt, fields):
+        sids = list(sids)
+        fields = list(fields)
+        # Give an empty result if no data is present.
+        try:
+            return self._reader.get_values(sids, dt, fields)
+        except NoDataOnDate:
+            out = np.full((len(fields), len(sids)), np.nan)
+            out[[i for i, field in enumerate(fields)
+                 if field == 'volume']] = 0
+            return out
+
     @abstractmethod
     def _outer_dts(self, start_dt, end_dt):
         raise NotImplementedError
@@ -0,0 +1,115 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from errno import ENOENT
+from hashlib import sha1
+import os
+from shutil import rmtree
+from tempfile import gettempdir, mkstemp
+
+import numpy as np
+
+from zipline.utils.paths import ensure_directory
+
+# tmpfs mount backing the POSIX shared memory segments on Linux.
+_SHM_ROOT = '/dev/shm'
+
+
+def default_shared_cache_path():
+    """The directory of the shared cache when none is given: in the shared
+    memory filesystem if the host has one, otherwise in the temporary
+    directory.
+    """
+    root = _SHM_ROOT if os.path.isdir(_SHM_ROOT) else gettempdir()
+    return os.path.join(root, 'zipline-shared-cache')
+
+
+class SharedArrayCache(object):
+    """A host wide cache of read-only arrays, shared between processes.
+
+    Each array is written once as a ``.npy`` file and memory mapped read-only
+    by every process which asks for it, so all of the processes reading the
+    same pricing data share the same pages of memory. By default the files
+    are kept in ``/dev/shm``, which makes them POSIX shared memory segments.
+
+    The cached arrays are keyed by the data they were loaded from. The
+    readers include the path of the bundle ingestion, the sid or column and
+    the length of the data in their keys, so a new ingestion or appended data
+    is loaded again instead of read from a stale array.
+
+    Parameters
+    ----------
+    path : str, optional
+        The directory holding the arrays. Defaults to
+        :func:`default_shared_cache_path`.
+
+    Notes
+    -----
+    The arrays outlive the processes which loaded them. Call :meth:`clear`
+    once the backtests using the cache are done to release the memory.
+    """
+    def __init__(self, path=None):
+        if path is None:
+            path = default_shared_cache_path()
+        self.path = path
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.path)
+
+    def _filename(self, key):
+        digest = sha1('\0'.join(map(str, key)).encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + '.npy')
+
+    def get(self, key, load):
+        """Get the array for ``key``, calling ``load`` to create it if it is
+        not cached yet.
+
+        Parameters
+        ----------
+        key : tuple
+            The parts of the key. Their ``str`` must identify the data.
+        load : callable[() -> np.ndarray]
+            The function loading the array.
+
+        Returns
+        -------
+        array : np.memmap
+            The read-only array.
+        """
+        filename = self._filename(key)
+        try:
+            return np.load(filename, mmap_mode='r')
+        except IOError as e:
+            if e.errno != ENOENT:
+                raise
+
+        ensure_directory(self.path)
+        fd, tmp = mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.ascontiguousarray(load()))
+            # Processes loading the same array concurrently write the same
+            # data, whichever rename comes last wins.
+            os.rename(tmp, filename)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return np.load(filename, mmap_mode='r')
+
+    def clear(self):
+        """Remove all of the cached arrays.
+        """
+        try:
+            rmtree(self.path)
+        except OSError as e:
+            if e.errno != ENOENT:
+                raise
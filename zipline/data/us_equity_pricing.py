@@ -13,7 +13,9 @@
 # limitations under the License.
 from errno import ENOENT
 from functools import partial
-from os import remove
+from os import remove, rename
+from os.path import realpath
+from shutil import rmtree
 import sqlite3
 import warnings
 
@@ -26,6 +28,7 @@ import logbook
 import numpy as np
 from numpy import (
     array,
+    empty,
     int64,
     float64,
     full,
@@ -34,6 +37,7 @@ from numpy import (
     issubdtype,
     nan,
     uint32,
+    zeros,
 )
 from pandas import (
     DataFrame,
@@ -59,6 +63,7 @@ from zipline.data.bar_reader import (
     NoDataBeforeDate,
     NoDataOnDate,
 )
+from zipline.utils.cache import ArrayCache
 from zipline.utils.calendars import get_calendar
 from zipline.utils.functional import apply
 from zipline.utils.preprocess import call
@@ -67,7 +72,10 @@ from zipline.utils.input_validation import (
     preprocess,
     verify_indices_all_unique,
 )
-from zipline.utils.sqlite_utils import group_into_chunks, coerce_string_to_conn
+from zipline.utils.sqlite_utils import (
+    group_into_chunks,
+    coerce_string_to_shared_conn,
+)
 from zipline.utils.memoize import lazyval
 from zipline.utils.cli import maybe_show_progress
 from ._equities import _compute_row_slices, _read_bcolz_data
@@ -286,11 +294,219 @@ class BcolzDailyBarWriter(object):
             invalid_data_behavior=invalid_data_behavior,
         )
 
-    def _write_internal(self, iterator, assets):
+    def append(self,
+               data,
+               show_progress=False,
+               invalid_data_behavior='warn'):
+        """Extend the table previously written to our filename with new
+        sessions.
+
+        The rows of the assets which are already in the table are kept as
+        they are and the new rows are added after them, new assets are added
+        after the existing ones. The first_row, last_row and calendar_offset
+        attrs are updated accordingly and the end session of the table is set
+        to our end session.
+
+        Parameters
+        ----------
+        data : iterable[tuple[int, pandas.DataFrame or bcolz.ctable]]
+            The data chunks to append. Each chunk should be a tuple of sid and
+            the data for that asset in the sessions following the last session
+            already written for it, without gaps.
+        show_progress : bool, optional
+            Whether or not to show a progress bar while writing.
+        invalid_data_behavior : {'warn', 'raise', 'ignore'}, optional
+            What to do when data is encountered that is outside the range of
+            a uint32.
+
+        Returns
+        -------
+        table : bcolz.ctable
+            The extended table.
+
+        Raises
+        ------
+        ValueError
+            If the data of an asset overlaps the sessions already written for
+            it or skips sessions. The table is left untouched.
+
+        Notes
+        -----
+        The rows of an asset must be contiguous in the table. When the data
+        only adds new assets or extends the asset whose rows end the table,
+        the columns are extended in place, which costs O(new rows). When
+        other existing assets get new sessions, which is the usual case for a
+        daily update, their rows can't be extended in place: the whole table
+        is then copied to a new one which replaces the old one, so the call
+        costs O(total rows). Readers opened on the old table must be reopened
+        in both cases.
+        """
+        existing = ctable(rootdir=self._filename, mode='a')
+        attrs = existing.attrs
+        if attrs['start_session_ns'] != self._start_session.value:
+            raise ValueError(
+                "Cannot append to daily bars starting on %s with a writer "
+                "starting on %s." % (
+                    Timestamp(attrs['start_session_ns'], tz='UTC'),
+                    self._start_session,
+                )
+            )
+        if attrs['end_session_ns'] > self._end_session.value:
+            raise ValueError(
+                "Cannot append to daily bars ending on %s with a writer "
+                "ending on %s." % (
+                    Timestamp(attrs['end_session_ns'], tz='UTC'),
+                    self._end_session,
+                )
+            )
+
+        ctx = maybe_show_progress(
+            (
+                (sid, self.to_ctable(df, invalid_data_behavior))
+                for sid, df in data
+                if len(df)
+            ),
+            show_progress=show_progress,
+            item_show_func=self.progress_bar_item_show_func,
+            label=self.progress_bar_message,
+        )
+        with ctx as it:
+            new_tables = dict(it)
+
+        first_row = attrs['first_row']
+        last_row = attrs['last_row']
+        sessions = self._calendar.sessions_in_range(
+            self._start_session, self._end_session
+        )
+        for asset_id, new in iteritems(new_tables):
+            asset_key = str(asset_id)
+            new_days = to_datetime(np.array(new['day']), unit='s', utc=True)
+            if asset_key in last_row:
+                last_day = existing['day'][last_row[asset_key]]
+                if new['day'][0] <= last_day:
+                    raise ValueError(
+                        "Data for sid %d on %s was already written." % (
+                            asset_id,
+                            Timestamp(new['day'][0], unit='s', tz='UTC'),
+                        )
+                    )
+                # The new data must start on the session after the last one
+                # written for the asset.
+                first_loc = sessions.searchsorted(
+                    Timestamp(last_day, unit='s', tz='UTC'),
+                    side='right',
+                )
+            else:
+                first_loc = sessions.searchsorted(new_days[0])
+            expected_sessions = sessions[
+                first_loc:sessions.searchsorted(new_days[-1], side='right')
+            ]
+
+            missing_sessions = expected_sessions.difference(new_days)
+            extra_sessions = new_days.difference(expected_sessions)
+            if len(missing_sessions) or len(extra_sessions):
+                raise ValueError(
+                    "Cannot append the data of sid %d.\n"
+                    "Missing sessions: %s\n"
+                    "Extra sessions: %s" % (
+                        asset_id,
+                        missing_sessions.tolist(),
+                        extra_sessions.tolist(),
+                    )
+                )
+
+        # The asset whose rows end the table can be extended in place.
+        last_asset_key = (max(last_row, key=last_row.__getitem__)
+                          if last_row else None)
+        if all(str(asset_id) not in last_row or
+               str(asset_id) == last_asset_key
+               for asset_id in new_tables):
+            return self._append_in_place(existing, new_tables, sessions)
+
+        def iterator():
+            for asset_key in sorted(first_row, key=first_row.__getitem__):
+                asset_id = int(asset_key)
+                old = existing[first_row[asset_key]:last_row[asset_key] + 1]
+                new = new_tables.pop(asset_id, None)
+                if new is None:
+                    yield asset_id, old
+                    continue
+
+                table = empty(len(old) + len(new), dtype=old.dtype)
+                table[:len(old)] = old
+                for column_name in new.names:
+                    if column_name in table.dtype.names:
+                        table[column_name][len(old):] = new[column_name][:]
+                yield asset_id, table
+
+            for asset_id in sorted(new_tables):
+                yield asset_id, new_tables[asset_id]
+
+        tmp_filename = self._filename + '.append'
+        self._write_internal(iterator(), None, tmp_filename)
+
+        old_filename = self._filename + '.old'
+        rename(self._filename, old_filename)
+        rename(tmp_filename, self._filename)
+        rmtree(old_filename)
+        return ctable(rootdir=self._filename, mode='r')
+
+    def _append_in_place(self, table, new_tables, sessions):
+        """Extend the columns of ``table`` with ``new_tables``, which may only
+        extend the asset whose rows end the table and add new assets.
+        """
+        attrs = table.attrs
+        first_row = attrs['first_row']
+        last_row = attrs['last_row']
+        calendar_offset = attrs['calendar_offset']
+        first_trading_day = attrs['first_trading_day']
+
+        total_rows = len(table)
+
+        def new_assets_last(asset_id):
+            return str(asset_id) not in last_row, asset_id
+
+        # Extend the last asset first, so its rows stay contiguous.
+        for asset_id in sorted(new_tables, key=new_assets_last):
+            new = new_tables[asset_id]
+            nrows = len(new)
+            table.append([
+                full((nrows,), asset_id, dtype='uint32')
+                if column_name == 'id' else
+                np.asarray(new[column_name][:], dtype='uint32')
+                for column_name in US_EQUITY_PRICING_BCOLZ_COLUMNS
+            ])
+
+            asset_key = str(asset_id)
+            if asset_key not in first_row:
+                first_row[asset_key] = total_rows
+                calendar_offset[asset_key] = sessions.get_loc(
+                    Timestamp(new['day'][0], unit='s', tz='UTC')
+                )
+            last_row[asset_key] = total_rows + nrows - 1
+            total_rows += nrows
+
+            if first_trading_day == iNaT:
+                first_trading_day = new['day'][0]
+            else:
+                first_trading_day = min(first_trading_day, new['day'][0])
+
+        table.flush()
+
+        # bcolz only writes the attrs to disk when they are set.
+        attrs['first_trading_day'] = first_trading_day
+        attrs['first_row'] = first_row
+        attrs['last_row'] = last_row
+        attrs['calendar_offset'] = calendar_offset
+        attrs['end_session_ns'] = self._end_session.value
+        return ctable(rootdir=self._filename, mode='r')
+
+    def _write_internal(self, iterator, assets, filename=None):
         """
         Internal implementation of write.
 
         `iterator` should be an iterator yielding pairs of (asset, ctable).
+        The table is written to ``filename``, which defaults to our filename.
         """
         total_rows = 0
         first_row = {}
@@ -391,7 +607,7 @@ class BcolzDailyBarWriter(object):
                 for colname in US_EQUITY_PRICING_BCOLZ_COLUMNS
             ],
             names=US_EQUITY_PRICING_BCOLZ_COLUMNS,
-            rootdir=self._filename,
+            rootdir=self._filename if filename is None else filename,
             mode='w',
         )
 
@@ -423,6 +639,53 @@ class BcolzDailyBarWriter(object):
         return ctable.fromdataframe(processed)
 
 
+def _read_columns(get_column,
+                  shape,
+                  columns,
+                  first_rows,
+                  last_rows,
+                  offsets):
+    """
+    Load raw data for the given columns and indices from decompressed
+    columns, with the same output as ``_read_bcolz_data``.
+
+    Parameters
+    ----------
+    get_column : callable[str -> np.ndarray[uint32]]
+        Function returning the whole data of a column.
+    shape : tuple (length 2)
+        The shape of the expected output arrays.
+    columns : list[str]
+        List of column names to read.
+    first_rows : ndarray[intp]
+    last_rows : ndarray[intp]
+    offsets : ndarray[intp]
+        Arrays in the format returned by _compute_row_slices.
+
+    Returns
+    -------
+    results : list of ndarray
+        A 2D array of shape `shape` for each column in `columns`.
+    """
+    results = []
+    for column_name in columns:
+        raw_data = get_column(column_name)
+        outbuf = zeros(shape, dtype=uint32)
+        for asset, (first_row, last_row, offset) in enumerate(
+                zip(first_rows, last_rows, offsets)):
+            if first_row <= last_row:
+                outbuf[offset:offset + (last_row + 1 - first_row), asset] = \
+                    raw_data[first_row:last_row + 1]
+
+        if column_name in {'open', 'high', 'low', 'close'}:
+            outbuf_as_float = outbuf.astype(float64) * .001
+            outbuf_as_float[outbuf == 0] = nan
+            results.append(outbuf_as_float)
+        else:
+            results.append(outbuf)
+    return results
+
+
 class BcolzDailyBarReader(SessionBarReader):
     """
     Reader for raw pricing data written by BcolzDailyOHLCVWriter.
@@ -438,6 +701,15 @@ class BcolzDailyBarReader(SessionBarReader):
         all of the data for all assets into memory and then indexing into that
         array for each day and asset pair.  Used to tune performance of reads
         when using a small or large number of equities.
+    shared_cache : SharedArrayCache, optional
+        Cache of the decompressed columns shared by all of the processes
+        reading the table on this host.
+    column_cache_nbytes : int, optional
+        The memory budget, in bytes, of a cache of the decompressed columns
+        in this process. When given, ``load_raw_arrays`` slices the cached
+        columns instead of decompressing the data on each call, and the least
+        recently used columns are evicted to stay within the budget. Ignored
+        if ``shared_cache`` is given.
 
     Attributes
     ----------
@@ -494,7 +766,11 @@ class BcolzDailyBarReader(SessionBarReader):
     --------
     zipline.data.us_equity_pricing.BcolzDailyBarWriter
     """
-    def __init__(self, table, read_all_threshold=3000):
+    def __init__(self,
+                 table,
+                 read_all_threshold=3000,
+                 shared_cache=None,
+                 column_cache_nbytes=None):
         self._maybe_table_rootdir = table
         # Cache of fully read np.array for the carrays in the daily bar table.
         # raw_array does not use the same cache, but it could.
@@ -503,6 +779,30 @@ class BcolzDailyBarReader(SessionBarReader):
         self._spot_cols = {}
         self.PRICE_ADJUSTMENT_FACTOR = 0.001
         self._read_all_threshold = read_all_threshold
+        if column_cache_nbytes is not None:
+            self._column_cache = ArrayCache(column_cache_nbytes)
+        else:
+            self._column_cache = None
+        self._shared_cache = None
+        if shared_cache is not None:
+            self.attach_shared_cache(shared_cache)
+
+    def attach_shared_cache(self, shared_cache):
+        """Read the decompressed columns from ``shared_cache``.
+
+        Tables which are not stored on disk can not be shared and keep being
+        read directly.
+
+        Parameters
+        ----------
+        shared_cache : SharedArrayCache
+            The host wide cache of the columns.
+        """
+        if self._table.rootdir is not None:
+            self._shared_cache = shared_cache
+            self._spot_cols.clear()
+            # The shared columns are already in memory.
+            self._column_cache = None
 
     @lazyval
     def _table(self):
@@ -628,15 +928,49 @@ class BcolzDailyBarReader(SessionBarReader):
             end_idx,
             assets,
         )
-        read_all = len(assets) > self._read_all_threshold
-        return _read_bcolz_data(
-            self._table,
-            (end_idx - start_idx + 1, len(assets)),
-            list(columns),
-            first_rows,
-            last_rows,
-            offsets,
-            read_all,
+        shape = (end_idx - start_idx + 1, len(assets))
+        columns = list(columns)
+
+        # Slicing a compressed column once per asset decompresses the same
+        # chunks again for every asset, so only the decompressed columns are
+        # read that way.
+        in_memory = [c for c in columns if self._is_decompressed(c)]
+        compressed = [c for c in columns if c not in in_memory]
+
+        results = {}
+        if in_memory:
+            results.update(zip(in_memory, _read_columns(
+                self._spot_col,
+                shape,
+                in_memory,
+                first_rows,
+                last_rows,
+                offsets,
+            )))
+        if compressed:
+            read_all = len(assets) > self._read_all_threshold
+            results.update(zip(compressed, _read_bcolz_data(
+                self._table,
+                shape,
+                compressed,
+                first_rows,
+                last_rows,
+                offsets,
+                read_all,
+            )))
+        return [results[column] for column in columns]
+
+    def _is_decompressed(self, colname):
+        """
+        Whether ``_spot_col`` returns the decompressed data of a column,
+        rather than its carray.
+        """
+        if self._shared_cache is not None:
+            return True
+        column_cache = self._column_cache
+        return (
+            column_cache is not None and
+            self._table[colname].nbytes <= column_cache.max_nbytes
         )
 
     def _spot_col(self, colname):
@@ -655,10 +989,33 @@ class BcolzDailyBarReader(SessionBarReader):
             Full read array of the carray in the daily_bar_table with the
             given colname.
         """
+        column_cache = self._column_cache
+        if column_cache is not None:
+            try:
+                return column_cache.get(colname)
+            except KeyError:
+                pass
+            carray = self._table[colname]
+            # A column larger than the budget would be decompressed on every
+            # call, so it is read from the carray instead.
+            if carray.nbytes <= column_cache.max_nbytes:
+                col = carray[:]
+                column_cache.set(colname, col)
+                return col
+
         try:
             col = self._spot_cols[colname]
         except KeyError:
-            col = self._spot_cols[colname] = self._table[colname]
+            carray = self._table[colname]
+            if self._shared_cache is None:
+                col = carray
+            else:
+                col = self._shared_cache.get(
+                    ('daily', realpath(self._table.rootdir), len(carray),
+                     colname),
+                    lambda: carray[:],
+                )
+            self._spot_cols[colname] = col
         return col
 
     def get_last_traded_dt(self, asset, day):
@@ -1280,7 +1637,9 @@ class SQLiteAdjustmentReader(object):
     :class:`zipline.data.us_equity_pricing.SQLiteAdjustmentWriter`
     """
 
-    @preprocess(conn=coerce_string_to_conn)
+    # The connection may be shared with the threads computing pipelines in
+    # the background.
+    @preprocess(conn=coerce_string_to_shared_conn)
     def __init__(self, conn):
         self.conn = conn
 
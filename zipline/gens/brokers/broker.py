@@ -21,6 +21,16 @@ class Broker(object):
     def subscribe_to_market_data(self, symbol):
         pass
 
+    @abstractmethod
+    def subscribe_to_universe(self, assets, timeout=0):
+        """Subscribe to the market data of every asset in ``assets``.
+
+        Returns the assets whose market data is already flowing after
+        waiting at most ``timeout`` seconds. If ``timeout`` is None, wait
+        until every subscription either delivered data or failed.
+        """
+        pass
+
     @abstractproperty
     def positions(self):
         pass
@@ -37,6 +47,14 @@ class Broker(object):
     def time_skew(self):
         pass
 
+    @property
+    def minute_ready(self):
+        """An object whose ``wait(dt, timeout)`` method returns True once the
+        broker has all the bars of the minute labelled ``dt``, or None if the
+        broker can not tell.
+        """
+        return None
+
     @abstractmethod
     def order(self, asset, amount, limit_price, stop_price, style):
         pass
@@ -56,3 +74,15 @@ class Broker(object):
     @abstractmethod
     def get_spot_value(self, assets, field, dt, data_frequency):
         pass
+
+    @abstractmethod
+    def get_spot_values(self, assets, fields, dt, data_frequency):
+        pass
+
+    @abstractmethod
+    def get_minute_bars(self, assets, field, start_dt, end_dt):
+        pass
+
+    @abstractmethod
+    def get_realtime_ticks(self, asset, start_dt=None):
+        pass
@@ -12,15 +12,22 @@
 # limitations under the License.
 
 import sys
-from collections import namedtuple, defaultdict
-from time import sleep
+from collections import namedtuple, defaultdict, OrderedDict, deque
+from copy import copy
+from threading import Condition, Lock, Thread
+from time import sleep, time
 from math import fabs
 
-from six import itervalues
+from six import iteritems, itervalues
 import pandas as pd
 import numpy as np
 
 from zipline.gens.brokers.broker import Broker
+from zipline.gens.brokers.tick_store import (
+    TickStore,
+    DEFAULT_TICK_CAPACITY,
+    DEFAULT_MINUTE_BAR_CAPACITY,
+)
 from zipline.finance.order import (Order as ZPOrder,
                                    ORDER_STATUS as ZP_ORDER_STATUS)
 from zipline.finance.execution import (MarketOrder,
@@ -44,6 +51,21 @@ if sys.version_info > (3,):
 
 log = Logger('IB Broker')
 
+# TWS accepts at most 50 messages per second from a client. Market data
+# requests are paced below that to leave room for orders and other requests.
+DEFAULT_MARKET_DATA_REQUEST_RATE = 40
+
+# Errors which cancel a market data request:
+# 101: Max number of tickers has been reached
+# 200: No security definition has been found for the request
+# 354: Requested market data is not subscribed
+MARKET_DATA_REQUEST_ERRORS = frozenset([101, 200, 354])
+
+# The fields served by IBBroker.get_minute_bars.
+MINUTE_BAR_HISTORY_FIELDS = frozenset(
+    ['price', 'open', 'high', 'low', 'close', 'volume']
+)
+
 Position = namedtuple('Position', ['contract', 'position', 'market_price',
                                    'market_value', 'average_cost',
                                    'unrealized_pnl', 'realized_pnl',
@@ -63,7 +85,10 @@ def log_message(message, mapping):
 
 
 class TWSConnection(EClientSocket, EWrapper):
-    def __init__(self, tws_uri, order_update_callback):
+    def __init__(self, tws_uri, order_update_callback,
+                 tick_capacity=DEFAULT_TICK_CAPACITY, tick_retention=None,
+                 minute_bar_capacity=DEFAULT_MINUTE_BAR_CAPACITY,
+                 market_data_request_rate=DEFAULT_MARKET_DATA_REQUEST_RATE):
         EWrapper.__init__(self)
         EClientSocket.__init__(self, anyWrapper=self)
 
@@ -76,13 +101,28 @@ class TWSConnection(EClientSocket, EWrapper):
         self.managed_accounts = None
         self.symbol_to_ticker_id = {}
         self.ticker_id_to_symbol = {}
+        # Market data requests waiting to be sent: (ticker_id, contract)
+        self._market_data_requests = deque()
+        self._market_data_requested = Condition()
+        self._market_data_request_interval = 1.0 / market_data_request_rate
+        # Symbols which received their first trade and symbols whose market
+        # data request was rejected by TWS.
+        self._ready_symbols = set()
+        self._failed_symbols = set()
+        self._market_data_ready = Condition()
         self.last_tick = defaultdict(dict)
-        self.bars = {}
+        self.bars = TickStore(tick_capacity, tick_retention,
+                              minute_bar_capacity)
         # accounts structure: accounts[account_id][currency][value]
         self.accounts = defaultdict(
             lambda: defaultdict(lambda: defaultdict(lambda: np.NaN)))
         self.accounts_download_complete = False
+        # Incremented on every account value update.
+        self.accounts_version = 0
         self.positions = {}
+        # Symbols whose position changed since the last pop_dirty_positions
+        self._dirty_positions = set()
+        self._positions_lock = Lock()
         self.portfolio = {}
         self.orders = {}
         self.time_skew = None
@@ -104,6 +144,13 @@ class TWSConnection(EClientSocket, EWrapper):
 
         log.info("Local-Broker Time Skew: {}".format(self.time_skew))
 
+        self._market_data_thread = Thread(
+            target=self._send_market_data_requests,
+            name='IBMarketDataRequests',
+        )
+        self._market_data_thread.daemon = True
+        self._market_data_thread.start()
+
     def _download_account_details(self):
         self.reqManagedAccts()
         while self.managed_accounts is None:
@@ -146,8 +193,65 @@ class TWSConnection(EClientSocket, EWrapper):
         self.symbol_to_ticker_id[symbol] = ticker_id
         self.ticker_id_to_symbol[ticker_id] = symbol
 
+        # The request is sent by the pacing thread, subscribing to a whole
+        # universe at once would otherwise violate the TWS pacing limits.
+        with self._market_data_requested:
+            self._market_data_requests.append((ticker_id, contract))
+            self._market_data_requested.notify()
+
+    def _send_market_data_requests(self):
         tick_list = "233"  # RTVolume, return tick_type == 48
-        self.reqMktData(ticker_id, contract, tick_list, False)
+        last_request_time = 0
+        while True:
+            with self._market_data_requested:
+                while not self._market_data_requests:
+                    self._market_data_requested.wait()
+                ticker_id, contract = self._market_data_requests.popleft()
+
+            delay = (last_request_time + self._market_data_request_interval -
+                     time())
+            if delay > 0:
+                sleep(delay)
+
+            self.reqMktData(ticker_id, contract, tick_list, False)
+            last_request_time = time()
+
+    def wait_for_market_data(self, symbols, timeout=None):
+        """Wait until the market data of ``symbols`` starts to flow.
+
+        Parameters
+        ----------
+        symbols : iterable[str]
+            The symbols, which must have been subscribed to.
+        timeout : float, optional
+            The maximum number of seconds to wait. If None, wait until every
+            symbol received its first trade or was rejected by TWS.
+
+        Returns
+        -------
+        ready : set[str]
+            The symbols which received at least one RTVolume tick with a
+            last trade price.
+        """
+        symbols = set(symbols)
+        deadline = None if timeout is None else time() + timeout
+        with self._market_data_ready:
+            while symbols - self._ready_symbols - self._failed_symbols:
+                if deadline is None:
+                    self._market_data_ready.wait()
+                    continue
+
+                remaining = deadline - time()
+                if remaining <= 0:
+                    break
+                self._market_data_ready.wait(remaining)
+
+            return symbols & self._ready_symbols
+
+    def _market_data_arrived(self, symbol):
+        with self._market_data_ready:
+            self._ready_symbols.add(symbol)
+            self._market_data_ready.notify_all()
 
     def _process_tick(self, ticker_id, tick_type, value):
         try:
@@ -156,6 +260,7 @@ class TWSConnection(EClientSocket, EWrapper):
             log.error("Tick {} for id={} is not registered".format(tick_type,
                                                                    ticker_id))
             return
+
         if tick_type == 48:
             # RT Volume Bar. Format:
             # Last trade price; Last trade size;Last trade time;Total volume;\
@@ -170,27 +275,21 @@ class TWSConnection(EClientSocket, EWrapper):
             if len(last_trade_price) == 0:
                 return
 
-            last_trade_dt = pd.to_datetime(float(last_trade_time), unit='ms',
-                                           utc=True)
-
             self._add_bar(symbol, float(last_trade_price),
-                          int(last_trade_size), last_trade_dt,
-                          int(total_volume), float(vwap),
-                          single_trade_flag)
+                          int(last_trade_size), long(last_trade_time),
+                          int(total_volume), float(vwap))
+
+            # Other tick types don't provide a last trade price, so they
+            # don't make the symbol's spot values available.
+            if symbol not in self._ready_symbols:
+                self._market_data_arrived(symbol)
 
     def _add_bar(self, symbol, last_trade_price, last_trade_size,
-                 last_trade_time, total_volume, vwap, single_trade_flag):
-        bar = pd.DataFrame(index=pd.DatetimeIndex([last_trade_time]),
-                           data={'last_trade_price': last_trade_price,
-                                 'last_trade_size': last_trade_size,
-                                 'total_volume': total_volume,
-                                 'vwap': vwap,
-                                 'single_trade_flag': single_trade_flag})
-
-        if symbol not in self.bars:
-            self.bars[symbol] = bar
-        else:
-            self.bars[symbol] = self.bars[symbol].append(bar)
+                 last_trade_time, total_volume, vwap):
+        # last_trade_time is kept as epoch milliseconds, converting every
+        # tick to a Timestamp is too expensive on the TWS reader thread.
+        self.bars.add_tick(symbol, last_trade_price, last_trade_size,
+                           last_trade_time, total_volume, vwap)
 
     def tickPrice(self, ticker_id, field, price, can_auto_execute):
         self._process_tick(ticker_id, tick_type=field, value=price)
@@ -226,8 +325,16 @@ class TWSConnection(EClientSocket, EWrapper):
     def openOrderEnd(self):
         log_message('openOrderEnd', vars())
 
+    def pop_dirty_positions(self):
+        """Return the symbols whose position changed since the previous call.
+        """
+        with self._positions_lock:
+            dirty, self._dirty_positions = self._dirty_positions, set()
+        return dirty
+
     def updateAccountValue(self, key, value, currency, account_name):
         self.accounts[account_name][currency][key] = value
+        self.accounts_version += 1
 
     def updatePortfolio(self,
                         contract,
@@ -249,7 +356,9 @@ class TWSConnection(EClientSocket, EWrapper):
                             realized_pnl=realized_pnl,
                             account_name=account_name)
 
-        self.positions[symbol] = position
+        with self._positions_lock:
+            self.positions[symbol] = position
+            self._dirty_positions.add(symbol)
 
     def updateAccountTime(self, time_stamp):
         pass
@@ -279,6 +388,14 @@ class TWSConnection(EClientSocket, EWrapper):
         log_message('connectionClosed', {})
 
     def error(self, id_=None, error_code=None, error_msg=None):
+        if (error_code in MARKET_DATA_REQUEST_ERRORS and
+                id_ in self.ticker_id_to_symbol):
+            symbol = self.ticker_id_to_symbol[id_]
+            if symbol not in self._ready_symbols:
+                with self._market_data_ready:
+                    self._failed_symbols.add(symbol)
+                    self._market_data_ready.notify_all()
+
         if isinstance(error_code, int):
             if error_code < 1000:
                 log.error("[{}] {} ({})".format(error_code, error_msg, id_))
@@ -359,11 +476,37 @@ class TWSConnection(EClientSocket, EWrapper):
 
 
 class IBBroker(Broker):
-    def __init__(self, tws_uri, account_id=None):
+    def __init__(self, tws_uri, account_id=None,
+                 tick_capacity=DEFAULT_TICK_CAPACITY, tick_retention=None,
+                 minute_bar_capacity=DEFAULT_MINUTE_BAR_CAPACITY,
+                 market_data_request_rate=DEFAULT_MARKET_DATA_REQUEST_RATE):
         self._tws_uri = tws_uri
         self.orders = {}
-
-        self._tws = TWSConnection(tws_uri, self._order_update)
+        # ib order id -> zipline order id. The reverse mapping is the
+        # broker_order_id of the zipline order.
+        self._zp_order_ids = {}
+        # asset -> OrderedDict(zipline order id -> open zipline order)
+        self._open_orders = defaultdict(OrderedDict)
+        # Guards _open_orders, which is updated from the TWS callback thread.
+        self._orders_lock = Lock()
+
+        # Portfolio and account objects patched from the TWS updates when
+        # they are read. The symbols can only be resolved to assets on the
+        # algorithm's thread.
+        self._assets = {}
+        self._positions = zp.Positions()
+        self._portfolio = zp.Portfolio()
+        self._portfolio.positions = self._positions
+        self._portfolio_version = None
+        self._account = zp.Account()
+        self._account_version = None
+
+        self._tws = TWSConnection(tws_uri, self._order_update,
+                                  tick_capacity=tick_capacity,
+                                  tick_retention=tick_retention,
+                                  minute_bar_capacity=minute_bar_capacity,
+                                  market_data_request_rate=(
+                                      market_data_request_rate))
         self.account_id = (self._tws.managed_accounts[0] if account_id is None
                            else self._tws.managed_accounts[0])
         self.currency = 'USD'
@@ -373,30 +516,77 @@ class IBBroker(Broker):
     def subscribe_to_market_data(self, symbol):
         self._tws.subscribe_to_market_data(symbol)
 
-    @property
-    def positions(self):
-        z_positions = zp.Positions()
-        for symbol in self._tws.positions:
-            ib_position = self._tws.positions[symbol]
-            try:
-                z_position = zp.Position(symbol_lookup(symbol))
-            except SymbolNotFound:
-                # The symbol might not have been ingested to the db therefore
-                # it needs to be skipped.
+    def subscribe_to_universe(self, assets, timeout=0):
+        assets = list(assets)
+        symbols = [str(asset.symbol) for asset in assets]
+        for symbol in symbols:
+            self._tws.subscribe_to_market_data(symbol)
+
+        ready = self._tws.wait_for_market_data(symbols, timeout)
+        return [asset for asset, symbol in zip(assets, symbols)
+                if symbol in ready]
+
+    def _asset_for_symbol(self, symbol):
+        try:
+            return self._assets[symbol]
+        except KeyError:
+            pass
+
+        try:
+            asset = symbol_lookup(symbol)
+        except SymbolNotFound:
+            # The symbol might not have been ingested to the db therefore
+            # it needs to be skipped.
+            asset = None
+        self._assets[symbol] = asset
+        return asset
+
+    def _update_positions(self):
+        for symbol in self._tws.pop_dirty_positions():
+            asset = self._asset_for_symbol(symbol)
+            if asset is None:
                 continue
+
+            ib_position = self._tws.positions[symbol]
+            if asset in self._positions:
+                z_position = self._positions[asset]
+            else:
+                z_position = self._positions[asset] = zp.Position(asset)
             z_position.amount = int(ib_position.position)
             z_position.cost_basis = float(ib_position.market_price)
             z_position.last_sale_price = None  # TODO(tibor): Fill from state
             z_position.last_sale_date = None  # TODO(tibor): Fill from state
-            z_positions[symbol_lookup(symbol)] = z_position
 
-        return z_positions
+    def _copy_positions(self):
+        return zp.Positions(
+            (asset, copy(position))
+            for asset, position in iteritems(self._positions)
+        )
+
+    @property
+    def positions(self):
+        self._update_positions()
+        return self._copy_positions()
 
     @property
     def portfolio(self):
+        self._update_positions()
+
+        version = self._tws.accounts_version
+        if version != self._portfolio_version:
+            self._update_portfolio()
+            self._portfolio_version = version
+
+        # The cached objects are only patched by the broker: callers get
+        # copies which they may change freely.
+        z_portfolio = copy(self._portfolio)
+        z_portfolio.positions = self._copy_positions()
+        return z_portfolio
+
+    def _update_portfolio(self):
         ib_account = self._tws.accounts[self.account_id][self.currency]
 
-        z_portfolio = zp.Portfolio()
+        z_portfolio = self._portfolio
         z_portfolio.capital_used = None  # TODO(tibor)
         z_portfolio.starting_cash = None  # TODO(tibor): Fill from state
         z_portfolio.portfolio_value = float(ib_account['EquityWithLoanValue'])
@@ -405,17 +595,22 @@ class IBBroker(Broker):
         z_portfolio.returns = None  # TODO(tibor): pnl / total_at_start
         z_portfolio.cash = float(ib_account['TotalCashValue'])
         z_portfolio.start_date = None  # TODO(tibor)
-        z_portfolio.positions = self.positions
         z_portfolio.positions_value = None  # TODO(tibor)
         z_portfolio.positions_exposure = None  # TODO(tibor)
 
-        return z_portfolio
-
     @property
     def account(self):
+        version = self._tws.accounts_version
+        if version != self._account_version:
+            self._update_account()
+            self._account_version = version
+
+        return copy(self._account)
+
+    def _update_account(self):
         ib_account = self._tws.accounts[self.account_id][self.currency]
 
-        z_account = zp.Account()
+        z_account = self._account
 
         z_account.settled_cash = None  # TODO(tibor)
         z_account.accrued_interest = None  # TODO(tibor)
@@ -440,12 +635,14 @@ class IBBroker(Broker):
         z_account.net_leverage = None  # TODO(tibor)
         z_account.net_liquidation = float(ib_account['NetLiquidation'])
 
-        return z_account
-
     @property
     def time_skew(self):
         return self._tws.time_skew
 
+    @property
+    def minute_ready(self):
+        return self._tws.bars.minute_sealed
+
     def order(self, asset, amount, limit_price, stop_price, style):
         is_buy = (amount > 0)
         zp_order = ZPOrder(
@@ -485,23 +682,28 @@ class IBBroker(Broker):
 
         ib_order_id = self._tws.next_order_id
         zp_order.broker_order_id = ib_order_id
-        self.orders[zp_order.id] = zp_order
+        with self._orders_lock:
+            self.orders[zp_order.id] = zp_order
+            self._zp_order_ids[ib_order_id] = zp_order.id
+            self._open_orders[asset][zp_order.id] = zp_order
 
         self._tws.placeOrder(ib_order_id, contract, order)
 
         return zp_order.id
 
     def get_open_orders(self, asset):
-        if asset is None:
-            assets = set([order.asset for order in itervalues(self.orders)
-                          if order.open])
-            return {
-                asset: [order.to_api_obj() for order in itervalues(self.orders)
-                        if order.asset == asset]
-                for asset in assets
-            }
-        return [order.to_api_obj() for order in itervalues(self.orders)
-                if order.asset == asset and order.open]
+        with self._orders_lock:
+            if asset is None:
+                return {
+                    asset: [order.to_api_obj()
+                            for order in itervalues(orders)]
+                    for asset, orders in self._open_orders.items()
+                    if orders
+                }
+            if asset not in self._open_orders:
+                return []
+            return [order.to_api_obj()
+                    for order in itervalues(self._open_orders[asset])]
 
     def get_order(self, zp_order_id):
         return self.orders[zp_order_id].to_api_obj()
@@ -512,15 +714,7 @@ class IBBroker(Broker):
         self._tws.cancelOrder(ib_order_id)
 
     def _get_zp_order_id(self, ib_order_id):
-        ib_order_ids = [e for e in self.orders
-                        if self.orders[e].broker_order_id == ib_order_id]
-        if len(ib_order_ids) == 0:
-            return None
-        elif len(ib_order_ids) == 1:
-            return ib_order_ids[0]
-        else:
-            raise RuntimeError("More than one order found for id: %s" %
-                               ib_order_id)
+        return self._zp_order_ids.get(ib_order_id)
 
     def _order_update(self, ib_order_id, status, filled):
         # TWS can report orders which has not been registered in the current
@@ -531,17 +725,88 @@ class IBBroker(Broker):
         if zp_order_id is None:
             return
 
+        zp_order = self.orders[zp_order_id]
+
         if status.lower() == 'submitted':
-            self.orders[zp_order_id].status = ZP_ORDER_STATUS.OPEN
+            zp_order.status = ZP_ORDER_STATUS.OPEN
         elif status.lower() == 'cancelled':
-            self.orders[zp_order_id].status = ZP_ORDER_STATUS.CANCELLED
+            zp_order.status = ZP_ORDER_STATUS.CANCELLED
         elif status.lower() == 'filled':
-            self.orders[zp_order_id].status = ZP_ORDER_STATUS.FILLED
+            zp_order.status = ZP_ORDER_STATUS.FILLED
+
+        zp_order.filled = filled
 
-        self.orders[zp_order_id].filled = filled
+        with self._orders_lock:
+            open_orders = self._open_orders[zp_order.asset]
+            if zp_order.open:
+                open_orders[zp_order_id] = zp_order
+            else:
+                open_orders.pop(zp_order_id, None)
+                if not open_orders:
+                    del self._open_orders[zp_order.asset]
 
         # TODO: Add commission if the order is executed
 
+    def get_realtime_ticks(self, asset, start_dt=None):
+        symbol = str(asset.symbol)
+
+        if symbol not in self._tws.bars:
+            self._tws.subscribe_to_market_data(symbol)
+            return None
+
+        start_ms = (None if start_dt is None
+                    else long(start_dt.value // 1000000))
+        return self._tws.bars[symbol].windows(start_ms)
+
+    def get_minute_bars(self, assets, field, start_dt, end_dt):
+        """Return the minute bars built from the ticks of ``assets``.
+
+        Minutes without trades, including the minutes before the first trade
+        of an asset, are NaN (or 0 for volume): no value is filled here, so
+        callers decide how to fill them.
+        """
+        if field not in MINUTE_BAR_HISTORY_FIELDS:
+            raise ValueError(
+                "Invalid minute bar field: {field!r}, expected one of "
+                "{fields}".format(field=field,
+                                  fields=sorted(MINUTE_BAR_HISTORY_FIELDS)))
+        bar_field = 'close' if field == 'price' else field
+
+        data = {}
+        for asset in assets:
+            symbol = str(asset.symbol)
+            if symbol not in self._tws.bars:
+                self._tws.subscribe_to_market_data(symbol)
+                continue
+
+            bars = self._tws.bars.minute_bars(symbol).windows(start_dt,
+                                                              end_dt)
+            data[asset] = pd.Series(
+                bars[bar_field],
+                index=pd.to_datetime(bars['minute'], unit='m', utc=True),
+            )
+
+        return pd.DataFrame(data, columns=list(assets))
+
+    def get_spot_values(self, assets, fields, dt, data_frequency):
+        assets = list(assets)
+        fields = list(fields)
+        symbols = [str(asset.symbol) for asset in assets]
+
+        for symbol in symbols:
+            if symbol not in self._tws.bars:
+                self._tws.subscribe_to_market_data(symbol)
+
+        values = self._tws.bars.get_values(symbols, fields, dt)
+
+        data = {}
+        for field, row in zip(fields, values):
+            if field == 'last_traded':
+                row = pd.to_datetime(row, unit='ms', utc=True)
+            data[field] = pd.Series(row, index=assets, name=field)
+
+        return pd.DataFrame(data, index=assets)
+
     def get_spot_value(self, assets, field, dt, data_frequency):
         symbol = str(assets.symbol)
 
@@ -549,34 +814,18 @@ class IBBroker(Broker):
             self._tws.subscribe_to_market_data(symbol)
             return pd.NaT if field == 'last_traded' else np.NaN
 
-        bars = self._tws.bars[symbol]
+        ticks = self._tws.bars[symbol]
 
-        last_event_time = bars.index[-1]
+        if not len(ticks):
+            return pd.NaT if field == 'last_traded' else np.NaN
 
-        minute_start = (last_event_time - pd.Timedelta('1 min')) \
-            .time()
-        minute_end = last_event_time.time()
+        if field == 'price':
+            return ticks.last('last_trade_price')
+        elif field == 'last_traded':
+            return ticks.last_trade_dt
+        elif field not in ('open', 'high', 'low', 'close', 'volume'):
+            return np.NaN
 
-        if bars.empty:
-            return pd.NaT if field == 'last_traded' else np.NaN
-        else:
-            if field == 'price':
-                return bars.last_trade_price.iloc[-1]
-            elif field == 'last_traded':
-                return last_event_time or pd.NaT
-
-            minute_df = bars.between_time(minute_start, minute_end,
-                                          include_start=True, include_end=True)
-            if minute_df.empty:
-                return np.NaN
-            else:
-                if field == 'open':
-                    return minute_df.last_trade_price.iloc[0]
-                elif field == 'close':
-                    return minute_df.last_trade_price.iloc[-1]
-                elif field == 'high':
-                    return minute_df.last_trade_price.max()
-                elif field == 'low':
-                    return minute_df.last_trade_price.min()
-                elif field == 'volume':
-                    return minute_df.last_trade_size.sum()
+        # OHLCV fields are served from the incrementally built minute bars.
+        # If dt is not given the minute currently being built is used.
+        return self._tws.bars.minute_bars(symbol).get_value(field, dt)
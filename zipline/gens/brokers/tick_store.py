@@ -0,0 +1,593 @@
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from threading import Condition
+from time import time
+
+import numpy as np
+import pandas as pd
+
+# Number of ticks retained per symbol. A liquid name prints well below
+# 200k RTVolume ticks in a regular trading session.
+DEFAULT_TICK_CAPACITY = 2 ** 18
+
+# Number of minute bars retained per symbol.
+DEFAULT_MINUTE_BAR_CAPACITY = 3 * 24 * 60
+
+TICK_FIELDS = (
+    'last_trade_price',
+    'last_trade_size',
+    'last_trade_time',
+    'total_volume',
+    'vwap',
+)
+
+MINUTE_BAR_FIELDS = (
+    'minute',
+    'open',
+    'high',
+    'low',
+    'close',
+    'volume',
+)
+
+# The fields served from the minute bars by :meth:`TickStore.get_values`.
+_BAR_VALUE_FIELDS = frozenset(['open', 'high', 'low', 'close', 'volume'])
+
+_MS_PER_MINUTE = 60 * 1000
+_NS_PER_MINUTE = 60 * 1000 * 1000 * 1000
+
+
+class _MirroredRingBuffer(object):
+    """Base class for fixed-capacity, column oriented ring buffers.
+
+    Every field is kept in a numpy array of twice the capacity and each row
+    is written to both halves (position ``i`` and ``i + capacity``). This
+    keeps inserts O(1) while any window of the most recent ``capacity`` rows
+    is available as a contiguous array view, without copying.
+
+    Subclasses define ``fields``, ``dtypes`` and ``fill_values``.
+    """
+    fields = ()
+    dtypes = {}
+    fill_values = {}
+
+    def __init__(self, capacity):
+        if capacity <= 0:
+            raise ValueError(
+                "capacity must be positive, got {}".format(capacity)
+            )
+
+        self.capacity = capacity
+        self._arrays = {
+            field: np.full(2 * capacity,
+                           self.fill_values[field],
+                           dtype=self.dtypes[field])
+            for field in self.fields
+        }
+        # (next write position, number of valid rows). Both values are
+        # published with a single assignment so that readers never observe
+        # a half-updated cursor.
+        self._cursor = (0, 0)
+
+    def __len__(self):
+        return self._cursor[1]
+
+    def _push(self, values):
+        head, count = self._cursor
+        mirror = head + self.capacity
+        arrays = self._arrays
+
+        for field, value in zip(self.fields, values):
+            array = arrays[field]
+            array[head] = value
+            array[mirror] = value
+
+        self._cursor = ((head + 1) % self.capacity,
+                        min(count + 1, self.capacity))
+
+    def _position(self, age):
+        """Physical position in the first half of the arrays of the row
+        ``age`` rows before the most recent one.
+        """
+        return (self._cursor[0] - 1 - age) % self.capacity
+
+    def _get(self, field, age):
+        return self._arrays[field][self._position(age)]
+
+    def _set(self, field, age, value):
+        position = self._position(age)
+        array = self._arrays[field]
+        array[position] = value
+        array[position + self.capacity] = value
+
+    def _extent(self):
+        head, count = self._cursor
+        end = head + self.capacity
+        return end - count, end
+
+    def _view(self, field, start, end):
+        view = self._arrays[field][start:end]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self._cursor = (0, 0)
+
+
+class TickRingBuffer(_MirroredRingBuffer):
+    """Fixed-capacity store of RTVolume ticks for a single symbol.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The maximum number of ticks retained. Older ticks are overwritten.
+    retention : pd.Timedelta, optional
+        If given, ticks older than ``retention`` relative to the most recent
+        tick are excluded from :meth:`window`.
+
+    Notes
+    -----
+    The buffer supports a single writer (the TWS reader thread) and any
+    number of readers. Views returned by :meth:`window` share memory with the
+    buffer and are only valid until ``capacity`` further ticks are appended.
+    """
+    fields = TICK_FIELDS
+    dtypes = {
+        'last_trade_price': np.float64,
+        'last_trade_size': np.int64,
+        'last_trade_time': np.int64,  # epoch milliseconds
+        'total_volume': np.int64,
+        'vwap': np.float64,
+    }
+    fill_values = {
+        'last_trade_price': np.nan,
+        'last_trade_size': 0,
+        'last_trade_time': 0,
+        'total_volume': 0,
+        'vwap': np.nan,
+    }
+
+    def __init__(self, capacity=DEFAULT_TICK_CAPACITY, retention=None):
+        super(TickRingBuffer, self).__init__(capacity)
+        self.retention = retention
+        self._retention_ms = (None if retention is None
+                              else int(retention.total_seconds() * 1000))
+
+    def append(self, last_trade_price, last_trade_size, last_trade_time,
+               total_volume, vwap):
+        """Insert a single tick.
+
+        Parameters
+        ----------
+        last_trade_price : float
+        last_trade_size : int
+        last_trade_time : int
+            The trade time in milliseconds since the epoch.
+        total_volume : int
+        vwap : float
+        """
+        self._push((last_trade_price, last_trade_size, last_trade_time,
+                    total_volume, vwap))
+
+    def _bounds(self, start_ms=None):
+        start, end = self._extent()
+
+        if start < end and (start_ms is not None or
+                            self._retention_ms is not None):
+            times = self._arrays['last_trade_time'][start:end]
+            if self._retention_ms is not None:
+                horizon = times[-1] - self._retention_ms
+                start_ms = (horizon if start_ms is None
+                            else max(start_ms, horizon))
+            start += times.searchsorted(start_ms, side='left')
+
+        return start, end
+
+    def window(self, field, start_ms=None):
+        """Return a view of ``field`` over the retained ticks.
+
+        Parameters
+        ----------
+        field : str
+            One of :data:`TICK_FIELDS`.
+        start_ms : int, optional
+            If given, only ticks at or after this epoch-millisecond timestamp
+            are included.
+
+        Returns
+        -------
+        values : np.ndarray
+            A read-only view of the requested field, oldest tick first.
+        """
+        start, end = self._bounds(start_ms)
+        return self._view(field, start, end)
+
+    def windows(self, start_ms=None):
+        """Return views of every field over the same range of ticks.
+
+        Returns
+        -------
+        windows : dict[str -> np.ndarray]
+        """
+        start, end = self._bounds(start_ms)
+        return {field: self._view(field, start, end) for field in self.fields}
+
+    def last(self, field):
+        """Return the most recent value of ``field``.
+
+        Raises
+        ------
+        IndexError
+            If no tick has been stored yet.
+        """
+        if not len(self):
+            raise IndexError("No ticks have been recorded")
+        return self._get(field, 0)
+
+    @property
+    def last_trade_dt(self):
+        """The time of the most recent tick as a UTC Timestamp, or NaT.
+        """
+        if not len(self):
+            return pd.NaT
+        return pd.Timestamp(int(self.last('last_trade_time')),
+                            unit='ms',
+                            tz='UTC')
+
+
+class MinuteBarHistory(_MirroredRingBuffer):
+    """Incrementally built minute bars for a single symbol.
+
+    Ticks are folded into the bar of the minute they belong to as they
+    arrive. The most recent row is the minute currently being built; every
+    older row is a sealed minute. Rows are dense: minutes without trades are
+    stored with NaN prices and zero volume, so the row of any minute is found
+    with index arithmetic.
+
+    Bars are labelled by the end of the minute they cover, matching the
+    minute bar convention used by the bundle readers: trades in
+    [09:30:00, 09:31:00) make up the 09:31 bar.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The maximum number of minutes retained.
+    """
+    fields = MINUTE_BAR_FIELDS
+    dtypes = {
+        'minute': np.int64,  # label, in minutes since the epoch
+        'open': np.float64,
+        'high': np.float64,
+        'low': np.float64,
+        'close': np.float64,
+        'volume': np.int64,
+    }
+    fill_values = {
+        'minute': 0,
+        'open': np.nan,
+        'high': np.nan,
+        'low': np.nan,
+        'close': np.nan,
+        'volume': 0,
+    }
+
+    def __init__(self, capacity=DEFAULT_MINUTE_BAR_CAPACITY):
+        super(MinuteBarHistory, self).__init__(capacity)
+
+    @property
+    def last_minute(self):
+        """The label of the minute currently being built, in minutes since
+        the epoch, or None if no tick has been recorded.
+        """
+        if not len(self):
+            return None
+        return int(self._get('minute', 0))
+
+    def add_tick(self, price, size, time_ms):
+        """Fold a tick into the bar of the minute it belongs to.
+
+        Parameters
+        ----------
+        price : float
+        size : int
+        time_ms : int
+            The trade time in milliseconds since the epoch.
+        """
+        minute = time_ms // _MS_PER_MINUTE + 1
+        last_minute = self.last_minute
+
+        if last_minute is None or minute - last_minute >= self.capacity:
+            self.clear()
+            self._push((minute, price, price, price, price, size))
+        elif minute > last_minute:
+            # Seal the empty minutes between the last bar and this tick.
+            for empty in range(last_minute + 1, minute):
+                self._push((empty, np.nan, np.nan, np.nan, np.nan, 0))
+            self._push((minute, price, price, price, price, size))
+        else:
+            # Either the current minute or a late tick for a sealed one.
+            age = last_minute - minute
+            if age >= len(self):
+                return
+            self._fold(age, price, size)
+
+    def _fold(self, age, price, size):
+        if np.isnan(self._get('open', age)):
+            self._set('open', age, price)
+            self._set('high', age, price)
+            self._set('low', age, price)
+        else:
+            if price > self._get('high', age):
+                self._set('high', age, price)
+            if price < self._get('low', age):
+                self._set('low', age, price)
+        self._set('close', age, price)
+        self._set('volume', age, self._get('volume', age) + size)
+
+    def _age(self, dt):
+        last_minute = self.last_minute
+        if last_minute is None:
+            return None
+        if dt is None:
+            return 0
+        age = last_minute - dt.value // _NS_PER_MINUTE
+        if 0 <= age < len(self):
+            return age
+        return None
+
+    def get_value(self, field, dt=None):
+        """Return ``field`` of the bar labelled ``dt``.
+
+        Parameters
+        ----------
+        field : {'open', 'high', 'low', 'close', 'volume'}
+        dt : pd.Timestamp, optional
+            The label of the bar. If not given the minute currently being
+            built is used.
+
+        Returns
+        -------
+        value : float or int
+            NaN (or 0 for volume) if there is no bar for ``dt``.
+        """
+        age = self._age(dt)
+        if age is None:
+            return self.fill_values[field]
+        return self._get(field, age)
+
+    def get_values(self, fields, dt=None):
+        """Return several fields of the bar labelled ``dt``.
+
+        Parameters
+        ----------
+        fields : list[str]
+        dt : pd.Timestamp, optional
+
+        Returns
+        -------
+        values : list
+            The values of ``fields``, see :meth:`get_value`.
+        """
+        age = self._age(dt)
+        if age is None:
+            return [self.fill_values[field] for field in fields]
+        return [self._get(field, age) for field in fields]
+
+    def window(self, field, start_dt=None, end_dt=None):
+        """Return a view of ``field`` over the bars labelled in
+        [start_dt, end_dt].
+
+        Returns
+        -------
+        values : np.ndarray
+            A read-only view, oldest minute first.
+        """
+        start, end = self._minute_bounds(start_dt, end_dt)
+        return self._view(field, start, end)
+
+    def windows(self, start_dt=None, end_dt=None):
+        """Return views of every bar field over the same minutes.
+
+        Returns
+        -------
+        windows : dict[str -> np.ndarray]
+        """
+        start, end = self._minute_bounds(start_dt, end_dt)
+        return {field: self._view(field, start, end) for field in self.fields}
+
+    def _minute_bounds(self, start_dt, end_dt):
+        start, end = self._extent()
+        if start == end:
+            return start, end
+
+        last_minute = self.last_minute
+        first_minute = last_minute - (end - start) + 1
+        if start_dt is not None:
+            offset = start_dt.value // _NS_PER_MINUTE - first_minute
+            start += min(max(offset, 0), end - start)
+        if end_dt is not None:
+            offset = last_minute - end_dt.value // _NS_PER_MINUTE
+            end -= min(max(offset, 0), end - start)
+        return start, end
+
+
+class MinuteSealedSignal(object):
+    """Signal raised when a minute bar is complete.
+
+    A minute bar is complete once a tick of a later minute has been received
+    for any symbol.
+    """
+
+    def __init__(self):
+        self._condition = Condition()
+        # The label of the last complete minute, in minutes since the epoch.
+        self.last_sealed = 0
+
+    def seal(self, minute):
+        """Mark every bar labelled at or before ``minute`` as complete.
+        """
+        with self._condition:
+            if minute > self.last_sealed:
+                self.last_sealed = minute
+                self._condition.notify_all()
+
+    def wait(self, dt, timeout):
+        """Wait until the bar labelled ``dt`` is complete.
+
+        Parameters
+        ----------
+        dt : pd.Timestamp
+            The label of the minute bar.
+        timeout : float
+            The maximum number of seconds to wait.
+
+        Returns
+        -------
+        sealed : bool
+            True if the bar is complete, False if the timeout expired.
+        """
+        minute = dt.value // _NS_PER_MINUTE
+        deadline = time() + timeout
+        with self._condition:
+            while self.last_sealed < minute:
+                remaining = deadline - time()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+
+class TickStore(object):
+    """Per-symbol collection of :class:`TickRingBuffer` and
+    :class:`MinuteBarHistory` objects.
+
+    Parameters
+    ----------
+    capacity : int, optional
+        The capacity of each symbol's tick buffer.
+    retention : pd.Timedelta, optional
+        The retention horizon of each symbol's tick buffer.
+    minute_bar_capacity : int, optional
+        The number of minute bars retained for each symbol.
+    """
+
+    def __init__(self,
+                 capacity=DEFAULT_TICK_CAPACITY,
+                 retention=None,
+                 minute_bar_capacity=DEFAULT_MINUTE_BAR_CAPACITY):
+        self.capacity = capacity
+        self.retention = retention
+        self.minute_bar_capacity = minute_bar_capacity
+        self._buffers = {}
+        self._minute_bars = {}
+        self.minute_sealed = MinuteSealedSignal()
+
+    def __contains__(self, symbol):
+        return symbol in self._buffers
+
+    def __getitem__(self, symbol):
+        return self._buffers[symbol]
+
+    def __iter__(self):
+        return iter(self._buffers)
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def minute_bars(self, symbol):
+        """Return the :class:`MinuteBarHistory` of ``symbol``.
+
+        Raises
+        ------
+        KeyError
+            If no tick has been recorded for ``symbol``.
+        """
+        return self._minute_bars[symbol]
+
+    def add_tick(self, symbol, last_trade_price, last_trade_size,
+                 last_trade_time, total_volume, vwap):
+        """Append a tick to ``symbol``'s buffer and fold it into the current
+        minute bar, creating both if necessary.
+        """
+        try:
+            buffer_ = self._buffers[symbol]
+            minute_bars = self._minute_bars[symbol]
+        except KeyError:
+            minute_bars = self._minute_bars[symbol] = MinuteBarHistory(
+                self.minute_bar_capacity,
+            )
+            buffer_ = self._buffers[symbol] = TickRingBuffer(
+                self.capacity,
+                self.retention,
+            )
+        buffer_.append(last_trade_price, last_trade_size, last_trade_time,
+                       total_volume, vwap)
+        minute_bars.add_tick(last_trade_price, last_trade_size,
+                             last_trade_time)
+
+        # A tick in [m - 1, m) completes the bar labelled m - 1.
+        sealed = last_trade_time // _MS_PER_MINUTE
+        if sealed > self.minute_sealed.last_sealed:
+            self.minute_sealed.seal(sealed)
+
+    def get_values(self, symbols, fields, dt=None):
+        """Look up the current value of many fields for many symbols.
+
+        Parameters
+        ----------
+        symbols : list[str]
+        fields : list[str]
+            Any of 'price', 'last_traded', 'open', 'high', 'low', 'close' and
+            'volume'.
+        dt : pd.Timestamp, optional
+            The label of the minute bar used for the OHLCV fields. If not
+            given the minute currently being built is used.
+
+        Returns
+        -------
+        values : np.ndarray[float64]
+            A (len(fields), len(symbols)) array. 'last_traded' is reported in
+            milliseconds since the epoch. Symbols without any tick are NaN in
+            every field.
+        """
+        out = np.full((len(fields), len(symbols)), np.nan)
+
+        bar_rows = [i for i, field in enumerate(fields)
+                    if field in _BAR_VALUE_FIELDS]
+        bar_fields = [fields[i] for i in bar_rows]
+        price_rows = [i for i, field in enumerate(fields) if field == 'price']
+        time_rows = [i for i, field in enumerate(fields)
+                     if field == 'last_traded']
+
+        buffers = self._buffers
+        minute_bars = self._minute_bars
+        for column, symbol in enumerate(symbols):
+            try:
+                buffer_ = buffers[symbol]
+            except KeyError:
+                continue
+            if not len(buffer_):
+                continue
+
+            if price_rows:
+                out[price_rows, column] = buffer_.last('last_trade_price')
+            if time_rows:
+                out[time_rows, column] = buffer_.last('last_trade_time')
+            if bar_rows:
+                out[bar_rows, column] = minute_bars[symbol].get_values(
+                    bar_fields,
+                    dt,
+                )
+
+        return out
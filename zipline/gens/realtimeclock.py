@@ -39,6 +39,17 @@ class RealtimeClock(object):
 
     The :param:`time_skew` parameter represents the time difference between
     the Broker and the live trading machine's clock.
+
+    The clock runs through every session in :param:`sessions`. Between the
+    close of a session and the start of the next one it sleeps, so a single
+    process can trade for several days.
+
+    Instead of polling the wall clock, the RealtimeClock computes the time of
+    the next event and sleeps until then. If :param:`minute_ready` is given,
+    the wait for a BAR also ends as soon as the broker reports that the
+    minute's bars are complete. :param:`minute_ready` must provide a
+    ``wait(dt, timeout)`` method which returns True once the bar labelled
+    ``dt`` is complete and False if ``timeout`` seconds passed.
     """
 
     def __init__(self,
@@ -47,52 +58,123 @@ class RealtimeClock(object):
                  execution_closes,
                  before_trading_start_minutes,
                  minute_emission,
-                 time_skew=pd.Timedelta("0s")):
+                 time_skew=pd.Timedelta("0s"),
+                 minute_ready=None):
         self.sessions = sessions
         self.execution_opens = execution_opens
         self.execution_closes = execution_closes
         self.before_trading_start_minutes = before_trading_start_minutes
         self.minute_emission = minute_emission
         self.time_skew = time_skew
+        self.minute_ready = minute_ready
         self._last_emit = None
         self._before_trading_start_bar_yielded = False
+        self._ready_minute = None
+
+    def _sleep_until(self, server_dt, current_time, bar=False):
+        """Sleep until the broker's clock reaches ``server_dt``.
+
+        If ``bar`` is True and the broker reports that the bar labelled
+        ``server_dt`` is complete before that, return early.
+        """
+        seconds = (server_dt - self.time_skew -
+                   current_time).total_seconds()
+        if seconds <= 0:
+            return
+
+        if bar and self.minute_ready is not None:
+            if self.minute_ready.wait(server_dt, seconds):
+                self._ready_minute = server_dt
+        else:
+            sleep(seconds)
 
     def __iter__(self):
-        yield self.sessions[0], SESSION_START
-
-        while True:
-            current_time = pd.to_datetime('now', utc=True)
-            server_time = (current_time + self.time_skew).floor('1 min')
-
-            if (server_time >= self.before_trading_start_minutes[0] and
-                    not self._before_trading_start_bar_yielded):
-                self._last_emit = server_time
-                self._before_trading_start_bar_yielded = True
-                yield server_time, BEFORE_TRADING_START_BAR
-            elif server_time < self.execution_opens[0].tz_localize('UTC'):
-                sleep(1)
-            elif (self.execution_opens[0].tz_localize('UTC') <= server_time <
-                  self.execution_closes[0].tz_localize('UTC')):
-                if (self._last_emit is None or
-                        server_time - self._last_emit >=
-                        pd.Timedelta('1 minute')):
+        session_starts = [
+            session if session.tzinfo is not None
+            else session.tz_localize('UTC')
+            for session in self.sessions
+        ]
+
+        for index, session in enumerate(self.sessions):
+            is_last_session = index == len(self.sessions) - 1
+
+            if not is_last_session:
+                server_time = (pd.to_datetime('now', utc=True) +
+                               self.time_skew)
+                if server_time >= session_starts[index + 1]:
+                    # Started after this session was over, skip it.
+                    continue
+
+            if index > 0:
+                # Hibernate until the next session starts.
+                self._sleep_until(session_starts[index],
+                                  pd.to_datetime('now', utc=True))
+
+            self._last_emit = None
+            self._before_trading_start_bar_yielded = False
+            self._ready_minute = None
+
+            yield session, SESSION_START
+
+            before_trading_start_minute = \
+                self.before_trading_start_minutes[index]
+            execution_open = self.execution_opens[index].tz_localize('UTC')
+            execution_close = self.execution_closes[index].tz_localize('UTC')
+
+            while True:
+                current_time = pd.to_datetime('now', utc=True)
+                server_time = (current_time + self.time_skew).floor('1 min')
+
+                if (self._ready_minute is not None and
+                        self._ready_minute > server_time):
+                    # The broker already reported the bars of this minute as
+                    # complete, no need to wait for the wall clock.
+                    server_time = self._ready_minute
+
+                if (server_time >= before_trading_start_minute and
+                        not self._before_trading_start_bar_yielded):
+                    self._last_emit = server_time
+                    self._before_trading_start_bar_yielded = True
+                    yield server_time, BEFORE_TRADING_START_BAR
+                elif server_time < execution_open:
+                    next_event = execution_open
+                    if not self._before_trading_start_bar_yielded:
+                        next_event = min(next_event,
+                                         before_trading_start_minute)
+                    self._sleep_until(next_event, current_time,
+                                      bar=next_event == execution_open)
+                elif execution_open <= server_time < execution_close:
+                    if (self._last_emit is None or
+                            server_time - self._last_emit >=
+                            pd.Timedelta('1 minute')):
+                        self._last_emit = server_time
+                        yield server_time, BAR
+                        if self.minute_emission:
+                            yield server_time, MINUTE_END
+                    else:
+                        self._sleep_until(
+                            self._last_emit + pd.Timedelta('1 minute'),
+                            current_time,
+                            bar=True,
+                        )
+                elif server_time == execution_close:
                     self._last_emit = server_time
                     yield server_time, BAR
                     if self.minute_emission:
                         yield server_time, MINUTE_END
+                    yield server_time, SESSION_END
+
+                    break
+                elif server_time > execution_close:
+                    if is_last_session:
+                        # Return with no yield if the algo is started in
+                        # after hours
+                        return
+
+                    # The session was missed, close it so that the
+                    # performance tracker rolls over to the next session.
+                    yield server_time, SESSION_END
+                    break
                 else:
-                    sleep(1)
-            elif server_time == self.execution_closes[0].tz_localize('UTC'):
-                self._last_emit = server_time
-                yield server_time, BAR
-                if self.minute_emission:
-                    yield server_time, MINUTE_END
-                yield server_time, SESSION_END
-
-                return
-            elif server_time > self.execution_closes[0].tz_localize('UTC'):
-                # Return with no yield if the algo is started in after hours
-                return
-            else:
-                # We should never end up in this branch
-                raise RuntimeError("Invalid state in RealtimeClock")
+                    # We should never end up in this branch
+                    raise RuntimeError("Invalid state in RealtimeClock")
@@ -1,6 +1,7 @@
 from __future__ import print_function
 from zipline.assets import AssetFinder
 
+from .cache import TermCache
 from .classifiers import Classifier, CustomClassifier
 from .engine import SimplePipelineEngine
 from .factors import Factor, CustomFactor
@@ -59,5 +60,6 @@ __all__ = (
     'Pipeline',
     'SimplePipelineEngine',
     'Term',
+    'TermCache',
     'TermGraph',
 )
@@ -0,0 +1,376 @@
+"""
+Persistent cache of the values of computed pipeline terms.
+"""
+from errno import ENOENT
+from hashlib import sha1
+import os
+from shutil import rmtree
+from tempfile import mkstemp
+from types import BuiltinFunctionType, CodeType, FunctionType
+from weakref import WeakKeyDictionary
+
+import numpy as np
+from six import (
+    get_function_closure,
+    get_function_code,
+    get_function_defaults,
+    iteritems,
+    itervalues,
+)
+
+from zipline.lib.labelarray import LabelArray
+from zipline.utils.paths import ensure_directory
+
+from .term import ComputableTerm, Term
+
+
+class _Uncacheable(Exception):
+    """
+    Raised when an object has no description which is stable across
+    processes.
+    """
+
+
+def _describe_code(code):
+    return '<code %r %r (%s)>' % (
+        code.co_code,
+        code.co_names,
+        ', '.join(_describe(const) for const in code.co_consts),
+    )
+
+
+def _describe_function(func):
+    closure = get_function_closure(func) or ()
+    return '<function %s.%s %s %s (%s)>' % (
+        func.__module__,
+        getattr(func, '__qualname__', func.__name__),
+        _describe_code(get_function_code(func)),
+        _describe(get_function_defaults(func)),
+        ', '.join(_describe(cell.cell_contents) for cell in closure),
+    )
+
+
+_class_descriptions = WeakKeyDictionary()
+_term_descriptions = WeakKeyDictionary()
+
+
+def _describe_class(cls):
+    """
+    Describe a class by its name and by the code of its methods, so that
+    the terms of a class whose code changed get new keys.
+    """
+    try:
+        return _class_descriptions[cls]
+    except KeyError:
+        pass
+
+    methods = []
+    for klass in cls.__mro__:
+        for name, attr in sorted(iteritems(vars(klass))):
+            if isinstance(attr, (staticmethod, classmethod)):
+                attr = attr.__func__
+            if isinstance(attr, FunctionType):
+                methods.append(
+                    '%s=%s' % (name, _describe_code(get_function_code(attr))),
+                )
+
+    description = _class_descriptions[cls] = '<class %s.%s (%s)>' % (
+        cls.__module__,
+        getattr(cls, '__qualname__', cls.__name__),
+        ', '.join(methods),
+    )
+    return description
+
+
+def _describe(obj):
+    """
+    Describe ``obj`` with a string which is the same in every process.
+
+    Raises
+    ------
+    _Uncacheable
+        If ``obj`` has no such description.
+    """
+    if isinstance(obj, Term):
+        try:
+            return _term_descriptions[obj]
+        except KeyError:
+            pass
+        try:
+            identity = obj._identity
+        except AttributeError:
+            raise _Uncacheable(obj)
+        description = _term_descriptions[obj] = (
+            '<term %s>' % _describe(identity)
+        )
+        return description
+    if isinstance(obj, type):
+        return _describe_class(obj)
+    if isinstance(obj, CodeType):
+        return _describe_code(obj)
+    if isinstance(obj, FunctionType):
+        return _describe_function(obj)
+    if isinstance(obj, BuiltinFunctionType):
+        return '<builtin %s.%s>' % (obj.__module__, obj.__name__)
+    if isinstance(obj, (tuple, list)):
+        return '%s(%s)' % (
+            type(obj).__name__,
+            ', '.join(_describe(elem) for elem in obj),
+        )
+    if isinstance(obj, (set, frozenset)):
+        return '%s(%s)' % (
+            type(obj).__name__,
+            ', '.join(sorted(_describe(elem) for elem in obj)),
+        )
+    if isinstance(obj, dict):
+        return 'dict(%s)' % ', '.join(sorted(
+            '%s: %s' % (_describe(key), _describe(value))
+            for key, value in iteritems(obj)
+        ))
+
+    description = repr(obj)
+    if ' at 0x' in description:
+        # The default repr of an object, which changes with its address.
+        raise _Uncacheable(obj)
+    return description
+
+
+class TermCache(object):
+    """
+    A persistent cache of the values of computed pipeline terms.
+
+    The values are saved as ``.npy`` files, keyed by the identity of the
+    term, the dates and the assets it was computed for, and the version of
+    the data it was computed from. The identity of a term includes the code
+    of its class, so the values of a term whose ``compute`` changed are not
+    read again.
+
+    Pass a TermCache to :class:`~zipline.pipeline.engine.SimplePipelineEngine`
+    to read the terms it already computed from the cache instead of
+    computing them, and to save the terms it computes.
+
+    Parameters
+    ----------
+    path : str
+        The directory holding the cached values.
+    data_version : str
+        Identifies the data the pipelines are computed from, for example the
+        path of the bundle ingestion returned by
+        :func:`zipline.data.bundles.core.most_recent_data`. Values computed
+        from another version of the data are never read.
+    max_nbytes : int, optional
+        The maximum size of the cached values. Once it is reached, the least
+        recently used values are removed. If not given, the cache grows
+        without bounds.
+
+    Notes
+    -----
+    Only the values of computed terms are cached, not the raw data of the
+    loadable terms. Terms with categorical values, and terms whose
+    parameters have no description which is the same in every process, are
+    not cached.
+    """
+    def __init__(self, path, data_version, max_nbytes=None):
+        self.path = path
+        self.data_version = data_version
+        self.max_nbytes = max_nbytes
+        # The size of the cached values, computed on the first write.
+        self._nbytes = None
+
+    def __repr__(self):
+        return '%s(%r, %r, max_nbytes=%r)' % (
+            type(self).__name__,
+            self.path,
+            self.data_version,
+            self.max_nbytes,
+        )
+
+    def _filename(self, term, dates, assets):
+        """
+        The file holding the value of ``term`` for ``dates`` and ``assets``,
+        or None if the term can't be cached.
+        """
+        if not isinstance(term, ComputableTerm) or \
+                term.dtype == np.dtype(object):
+            return None
+        try:
+            description = _describe(term)
+        except _Uncacheable:
+            return None
+
+        digest = sha1()
+        for part in (str(self.data_version),
+                     description,
+                     str(dates[0]),
+                     str(dates[-1]),
+                     str(len(dates))):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(np.asarray(assets, dtype=np.int64).tobytes())
+        return os.path.join(self.path, digest.hexdigest() + '.npy')
+
+    def get(self, term, dates, assets):
+        """
+        Read the cached value of ``term``.
+
+        Parameters
+        ----------
+        term : zipline.pipeline.term.Term
+            The term to read.
+        dates : pd.DatetimeIndex
+            The row labels of the value of the term.
+        assets : pd.Int64Index
+            The column labels of the value of the term.
+
+        Returns
+        -------
+        value : np.ndarray or None
+            The cached value, or None if it is not cached.
+        """
+        filename = self._filename(term, dates, assets)
+        if filename is None:
+            return None
+
+        try:
+            value = np.load(filename)
+            # Mark the value as recently used.
+            os.utime(filename, None)
+        except (IOError, OSError) as e:
+            # Not cached, or evicted by another process.
+            if e.errno != ENOENT:
+                raise
+            return None
+        return value
+
+    def set(self, term, dates, assets, value):
+        """
+        Save the value of ``term`` if it can be cached and it is not cached
+        yet.
+
+        Parameters
+        ----------
+        term : zipline.pipeline.term.Term
+            The term computed.
+        dates : pd.DatetimeIndex
+            The row labels of ``value``.
+        assets : pd.Int64Index
+            The column labels of ``value``.
+        value : np.ndarray
+            The value computed.
+        """
+        if not isinstance(value, np.ndarray) or \
+                isinstance(value, LabelArray):
+            return
+        filename = self._filename(term, dates, assets)
+        if filename is None or os.path.exists(filename):
+            return
+
+        ensure_directory(self.path)
+        fd, tmp = mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, value)
+            os.rename(tmp, filename)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+        if self.max_nbytes is None:
+            return
+        if self._nbytes is None:
+            self._nbytes = sum(size for _, size, _ in self._entries())
+        else:
+            self._nbytes += os.path.getsize(filename)
+        if self._nbytes > self.max_nbytes:
+            self._evict()
+
+    def _entries(self):
+        """
+        The (mtime, size, filename) of the cached values.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith('.npy'):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError as e:
+                if e.errno != ENOENT:
+                    raise
+                continue
+            entries.append((stat.st_mtime, stat.st_size, filename))
+        return entries
+
+    def _evict(self):
+        """
+        Remove the least recently used values until the cache fits in
+        ``max_nbytes``.
+        """
+        # Other processes may share the directory, so look at the files
+        # instead of trusting our count.
+        entries = sorted(self._entries())
+        nbytes = sum(size for _, size, _ in entries)
+        for _, size, filename in entries:
+            if nbytes <= self.max_nbytes:
+                break
+            try:
+                os.remove(filename)
+            except OSError as e:
+                if e.errno != ENOENT:
+                    raise
+            nbytes -= size
+        self._nbytes = nbytes
+
+    def clear(self):
+        """
+        Remove all of the cached values.
+        """
+        self._nbytes = None
+        try:
+            rmtree(self.path)
+        except OSError as e:
+            if e.errno != ENOENT:
+                raise
+
+    def populate_initial_workspace(self,
+                                   initial_workspace,
+                                   root_mask_term,
+                                   execution_plan,
+                                   dates,
+                                   assets):
+        """
+        Add the cached values of the terms of ``execution_plan`` to
+        ``initial_workspace``.
+
+        The outputs are looked up first, and the dependencies of a term are
+        only looked up if the term isn't cached. The parameters are the same
+        as the parameters of
+        :func:`zipline.pipeline.engine.default_populate_initial_workspace`, so
+        a TermCache can be used to only read the cache as well.
+
+        Returns
+        -------
+        populated_initial_workspace : dict[term, array-like]
+            The workspace to begin computations with.
+        """
+        workspace = initial_workspace.copy()
+        extra_rows = execution_plan.extra_rows
+        root_extra_rows = extra_rows[root_mask_term]
+
+        needed = set(itervalues(execution_plan.outputs))
+        for term in reversed(list(execution_plan.ordered())):
+            if term not in needed or term in workspace:
+                continue
+
+            value = self.get(
+                term,
+                dates[root_extra_rows - extra_rows[term]:],
+                assets,
+            )
+            if value is not None:
+                workspace[term] = value
+            else:
+                needed.update(execution_plan.graph.predecessors(term))
+
+        return workspace
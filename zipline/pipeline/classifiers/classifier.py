@@ -367,6 +367,7 @@ class Quantiles(SingleInputMixin, Classifier):
     dtype = int64_dtype
     window_length = 0
     missing_value = -1
+    cross_sectional = True
 
     def _compute(self, arrays, dates, assets, mask):
         data = arrays[0]
@@ -5,13 +5,20 @@ from abc import (
     ABCMeta,
     abstractmethod,
 )
+from multiprocessing import Process, Queue as ProcessQueue
+import os
+from sys import exc_info
+from traceback import format_exc
 from uuid import uuid4
 
 from six import (
     iteritems,
+    itervalues,
+    reraise,
     with_metaclass,
 )
-from numpy import array
+from six.moves.queue import Empty, Queue
+from numpy import array, array_split, arange, concatenate, ndarray
 from pandas import DataFrame, MultiIndex
 from toolz import groupby, juxt
 from toolz.curried.operator import getitem
@@ -20,16 +27,22 @@ from zipline.lib.adjusted_array import ensure_adjusted_array, ensure_ndarray
 from zipline.errors import NoFurtherDataError
 from zipline.utils.numpy_utils import (
     as_column,
+    categorical_dtype,
     repeat_first_axis,
     repeat_last_axis,
 )
-from zipline.utils.pandas_utils import explode
+from zipline.utils.date_utils import compute_date_chunks
+from zipline.utils.pandas_utils import categorical_df_concat, explode
+from zipline.utils.paths import ensure_directory
 
 from .term import AssetExists, InputDates, LoadableTerm
 
 
 class PipelineEngine(with_metaclass(ABCMeta)):
 
+    # Allow subclasses to define __slots__.
+    __slots__ = ()
+
     @abstractmethod
     def run_pipeline(self, pipeline, start_date, end_date):
         """
@@ -62,6 +75,130 @@ class PipelineEngine(with_metaclass(ABCMeta)):
         """
         raise NotImplementedError("run_pipeline")
 
+    def iter_chunked_pipeline(self, pipeline, start_date, end_date, chunksize):
+        """
+        Compute a pipeline in chunks of dates, yielding the results of each
+        chunk as soon as they are computed.
+
+        Parameters
+        ----------
+        pipeline : zipline.pipeline.Pipeline
+            The pipeline to run.
+        start_date : pd.Timestamp
+            Start date of the computed matrix.
+        end_date : pd.Timestamp
+            End date of the computed matrix.
+        chunksize : int
+            The number of dates in each chunk.
+
+        Yields
+        ------
+        result : pd.DataFrame
+            The results of a chunk, in the format of :meth:`run_pipeline`.
+
+        Notes
+        -----
+        Each chunk is computed by a call to :meth:`run_pipeline`, with the
+        extra rows needed by the lookback windows of its terms, so the results
+        are the same as the rows of the results of :meth:`run_pipeline` for
+        the whole range.
+
+        Engines which don't override ``_date_chunks`` don't know which dates
+        are in the range and compute it as a single chunk.
+        """
+        for _, _, result in self._iter_chunks(pipeline,
+                                              start_date,
+                                              end_date,
+                                              chunksize):
+            yield result
+
+    def run_chunked_pipeline(self,
+                             pipeline,
+                             start_date,
+                             end_date,
+                             chunksize,
+                             path=None):
+        """
+        Compute values for `pipeline` between `start_date` and `end_date`, in
+        chunks of `chunksize` dates.
+
+        Computing a long range of dates in chunks bounds the memory used by
+        the intermediate results to the memory needed for one chunk.
+
+        Parameters
+        ----------
+        pipeline : zipline.pipeline.Pipeline
+            The pipeline to run.
+        start_date : pd.Timestamp
+            Start date of the computed matrix.
+        end_date : pd.Timestamp
+            End date of the computed matrix.
+        chunksize : int
+            The number of dates computed at a time.
+        path : str, optional
+            A directory to write the results of each chunk to as soon as they
+            are computed, instead of returning them. Each chunk is pickled to
+            a file named after its first and last dates.
+
+        Returns
+        -------
+        result : pd.DataFrame or list[str]
+            The results for the whole range, in the format of
+            :meth:`run_pipeline`, or the paths of the files written if
+            ``path`` is given.
+
+        See Also
+        --------
+        PipelineEngine.iter_chunked_pipeline
+        """
+        if path is None:
+            frames = list(self.iter_chunked_pipeline(
+                pipeline, start_date, end_date, chunksize,
+            ))
+            # The columns of empty frames aren't categorical.
+            return categorical_df_concat(
+                [frame for frame in frames if len(frame)] or frames[:1],
+            )
+
+        ensure_directory(path)
+        filenames = []
+        for chunk_start, chunk_end, result in self._iter_chunks(pipeline,
+                                                                start_date,
+                                                                end_date,
+                                                                chunksize):
+            filename = os.path.join(
+                path,
+                '%s_%s.pickle' % (
+                    chunk_start.strftime('%Y-%m-%d'),
+                    chunk_end.strftime('%Y-%m-%d'),
+                ),
+            )
+            result.to_pickle(filename)
+            filenames.append(filename)
+        return filenames
+
+    def _date_chunks(self, start_date, end_date, chunksize):
+        """
+        Split the dates between `start_date` and `end_date` into ranges of at
+        most `chunksize` dates.
+
+        Returns
+        -------
+        chunks : iterable[(pd.Timestamp, pd.Timestamp)]
+            The first and last date of each chunk.
+        """
+        return [(start_date, end_date)]
+
+    def _iter_chunks(self, pipeline, start_date, end_date, chunksize):
+        for chunk_start, chunk_end in self._date_chunks(start_date,
+                                                        end_date,
+                                                        chunksize):
+            yield (
+                chunk_start,
+                chunk_end,
+                self.run_pipeline(pipeline, chunk_start, chunk_end),
+            )
+
 
 class NoEngineRegistered(Exception):
     """
@@ -70,6 +207,13 @@ class NoEngineRegistered(Exception):
     """
 
 
+class PipelineShardError(Exception):
+    """
+    Raised if computing a pipeline failed in one of the processes computing
+    the shards of the assets.
+    """
+
+
 class ExplodingPipelineEngine(PipelineEngine):
     """
     A PipelineEngine that doesn't do anything.
@@ -80,6 +224,17 @@ class ExplodingPipelineEngine(PipelineEngine):
             "resources were registered."
         )
 
+    def run_chunked_pipeline(self,
+                             pipeline,
+                             start_date,
+                             end_date,
+                             chunksize,
+                             path=None):
+        raise NoEngineRegistered(
+            "Attempted to run a chunked pipeline but no pipeline "
+            "resources were registered."
+        )
+
 
 def default_populate_initial_workspace(initial_workspace,
                                        root_mask_term,
@@ -114,7 +269,69 @@ def default_populate_initial_workspace(initial_workspace,
     return initial_workspace
 
 
-class SimplePipelineEngine(object):
+def _compute_term(term, inputs, dates, assets, mask):
+    """Compute ``term`` from the values of its inputs.
+    """
+    out = term._compute(inputs, dates, assets, mask)
+    if term.ndim == 2:
+        assert out.shape == mask.shape
+    else:
+        assert out.shape == (mask.shape[0], 1)
+    return out
+
+
+def _compute_term_task(term, inputs, dates, assets, mask):
+    """Compute ``term`` in a pool, the result is a tuple of the term, whether
+    the computation was successful, and the value computed or the exception
+    info.
+    """
+    try:
+        return term, True, _compute_term(term, inputs, dates, assets, mask)
+    except Exception:
+        return term, False, exc_info()
+
+
+def _compute_shard_tasks(engine,
+                         graph,
+                         dates,
+                         assets,
+                         workspace,
+                         terms,
+                         shards,
+                         tasks,
+                         results):
+    """
+    Compute ``terms`` on the shards of ``assets`` whose indices are put on
+    ``tasks``, until None is received.
+
+    The results are put on ``results`` as (index, True, values) tuples, or
+    (index, False, traceback) tuples if the computation failed.
+    """
+    while True:
+        index = tasks.get()
+        if index is None:
+            return
+
+        start, stop = shards[index]
+        try:
+            values = engine._compute_shard(
+                graph,
+                dates,
+                assets[start:stop],
+                {
+                    term: value if term.ndim == 1 else value[:, start:stop]
+                    for term, value in iteritems(workspace)
+                    if term.ndim == 1 or isinstance(value, ndarray)
+                },
+                terms,
+            )
+        except Exception:
+            results.put((index, False, format_exc()))
+        else:
+            results.put((index, True, values))
+
+
+class SimplePipelineEngine(PipelineEngine):
     """
     PipelineEngine class that computes each term independently.
 
@@ -134,6 +351,25 @@ class SimplePipelineEngine(object):
         computing a pipeline. See
         :func:`zipline.pipeline.engine.default_populate_initial_workspace`
         for more info.
+    pool : Pool, optional
+        A pool of threads, e.g. ``multiprocessing.pool.ThreadPool(8)``, used
+        to compute concurrently the terms whose inputs are ready. This object
+        must support ``apply_async`` with a ``callback``. Loadable terms are
+        still loaded in the calling thread, while the pool computes the terms
+        which are ready. If not given, the terms are computed one at a time.
+    asset_shards : int, optional
+        The number of shards to split the assets into. If greater than 1, the
+        terms which aren't cross-sectional are computed for each shard in a
+        separate process, and only gathered for the cross-sectional terms
+        like ``Rank`` or ``demean`` and for the outputs. The processes are
+        forked, so this is only supported on posix systems.
+    shard_processes : int, optional
+        The number of processes computing the shards at the same time.
+        Defaults to ``asset_shards``.
+    term_cache : zipline.pipeline.cache.TermCache, optional
+        A persistent cache of computed terms. The terms found in the cache are
+        added to the initial workspace instead of being computed, and the
+        terms computed are saved to the cache.
 
     See Also
     --------
@@ -146,6 +382,10 @@ class SimplePipelineEngine(object):
         '_root_mask_term',
         '_root_mask_dates_term',
         '_populate_initial_workspace',
+        '_pool',
+        '_asset_shards',
+        '_shard_processes',
+        '_term_cache',
         '__weakref__',
     )
 
@@ -153,7 +393,11 @@ class SimplePipelineEngine(object):
                  get_loader,
                  calendar,
                  asset_finder,
-                 populate_initial_workspace=None):
+                 populate_initial_workspace=None,
+                 pool=None,
+                 asset_shards=1,
+                 shard_processes=None,
+                 term_cache=None):
         self._get_loader = get_loader
         self._calendar = calendar
         self._finder = asset_finder
@@ -164,6 +408,10 @@ class SimplePipelineEngine(object):
         self._populate_initial_workspace = (
             populate_initial_workspace or default_populate_initial_workspace
         )
+        self._pool = pool
+        self._asset_shards = asset_shards
+        self._shard_processes = shard_processes
+        self._term_cache = term_cache
 
     def run_pipeline(self, pipeline, start_date, end_date):
         """
@@ -205,7 +453,10 @@ class SimplePipelineEngine(object):
 
         Step 0 is performed by ``Pipeline.to_graph``.
         Step 1 is performed in ``SimplePipelineEngine._compute_root_mask``.
-        Step 2 is performed in ``SimplePipelineEngine.compute_chunk``.
+        Step 2 is performed in ``SimplePipelineEngine.compute_chunk``. If the
+        engine has several ``asset_shards``, the terms which aren't
+        cross-sectional are first computed on each shard in
+        ``SimplePipelineEngine._compute_shards``.
         Steps 3, 4, and 5 are performed in ``SimplePiplineEngine._to_narrow``.
 
         See Also
@@ -240,6 +491,21 @@ class SimplePipelineEngine(object):
             dates,
             assets,
         )
+        if self._term_cache is not None:
+            initial_workspace = self._term_cache.populate_initial_workspace(
+                initial_workspace,
+                self._root_mask_term,
+                graph,
+                dates,
+                assets,
+            )
+        if self._asset_shards > 1:
+            initial_workspace = self._compute_shards(
+                graph,
+                dates,
+                assets,
+                initial_workspace,
+            )
 
         results = self.compute_chunk(
             graph,
@@ -256,6 +522,11 @@ class SimplePipelineEngine(object):
             assets,
         )
 
+    def _date_chunks(self, start_date, end_date, chunksize):
+        return compute_date_chunks(
+            self._calendar, start_date, end_date, chunksize,
+        )
+
     def _compute_root_mask(self, start_date, end_date, extra_rows):
         """
         Compute a lifetimes matrix from our AssetFinder, then drop columns that
@@ -378,68 +649,378 @@ class SimplePipelineEngine(object):
             Dictionary mapping requested results to outputs.
         """
         self._validate_compute_chunk_params(dates, assets, initial_workspace)
-        get_loader = self.get_loader
 
         # Copy the supplied initial workspace so we don't mutate it in place.
         workspace = initial_workspace.copy()
+        refcounts = graph.initial_refcounts(workspace)
+
+        self._compute_terms(
+            graph,
+            dates,
+            assets,
+            workspace,
+            refcounts,
+            self._pool,
+            self._term_cache,
+        )
+
+        out = {}
+        graph_extra_rows = graph.extra_rows
+        for name, term in iteritems(graph.outputs):
+            # Truncate off extra rows from outputs.
+            out[name] = workspace[term][graph_extra_rows[term]:]
+        return out
+
+    def _compute_terms(self,
+                       graph,
+                       dates,
+                       assets,
+                       workspace,
+                       refcounts,
+                       pool,
+                       cache):
+        """
+        Compute the terms of ``graph`` with a positive refcount which are not
+        in ``workspace`` yet, on ``pool`` if it is not None. ``workspace`` is
+        updated in place, and the terms computed are saved to ``cache`` if it
+        is not None.
+        """
+        get_loader = self.get_loader
 
         # If loadable terms share the same loader and extra_rows, load them all
         # together.
         loader_group_key = juxt(get_loader, getitem(graph.extra_rows))
         loader_groups = groupby(loader_group_key, graph.loadable_terms)
 
-        refcounts = graph.initial_refcounts(workspace)
-
-        for term in graph.execution_order(refcounts):
-            # `term` may have been supplied in `initial_workspace`, and in the
-            # future we may pre-compute loadable terms coming from the same
-            # dataset.  In either case, we will already have an entry for this
-            # term, which we shouldn't re-compute.
-            if term in workspace:
-                continue
+        def load(term, mask, mask_dates):
+            to_load = sorted(
+                loader_groups[loader_group_key(term)],
+                key=lambda t: t.dataset
+            )
+            loader = get_loader(term)
+            return loader.load_adjusted_array(
+                to_load, mask_dates, assets, mask,
+            )
 
-            # Asset labels are always the same, but date labels vary by how
-            # many extra rows are needed.
-            mask, mask_dates = graph.mask_and_dates_for_term(
-                term,
-                self._root_mask_term,
-                workspace,
+        if pool is not None:
+            self._execute_concurrently(
+                graph,
                 dates,
+                assets,
+                workspace,
+                refcounts,
+                load,
+                pool,
+                cache,
             )
-
-            if isinstance(term, LoadableTerm):
-                to_load = sorted(
-                    loader_groups[loader_group_key(term)],
-                    key=lambda t: t.dataset
+        else:
+            for term in graph.execution_order(refcounts):
+                # `term` may have been supplied in `initial_workspace`, and in
+                # the future we may pre-compute loadable terms coming from the
+                # same dataset.  In either case, we will already have an entry
+                # for this term, which we shouldn't re-compute.
+                if term in workspace:
+                    continue
+
+                # Asset labels are always the same, but date labels vary by
+                # how many extra rows are needed.
+                mask, mask_dates = graph.mask_and_dates_for_term(
+                    term,
+                    self._root_mask_term,
+                    workspace,
+                    dates,
                 )
-                loader = get_loader(term)
-                loaded = loader.load_adjusted_array(
-                    to_load, mask_dates, assets, mask,
+
+                if isinstance(term, LoadableTerm):
+                    workspace.update(load(term, mask, mask_dates))
+                else:
+                    workspace[term] = _compute_term(
+                        term,
+                        self._inputs_for_term(term, workspace, graph),
+                        mask_dates,
+                        assets,
+                        mask,
+                    )
+                    if cache is not None:
+                        cache.set(term, mask_dates, assets, workspace[term])
+
+                    # Decref dependencies of ``term``, and clear any terms
+                    # whose refcounts hit 0.
+                    for garbage_term in graph.decref_dependencies(term,
+                                                                  refcounts):
+                        del workspace[garbage_term]
+
+    def _sharded_terms(self, graph, workspace):
+        """
+        The terms of ``graph`` to compute on the shards of the assets, which
+        are the outputs or the inputs of cross-sectional terms that can be
+        computed without looking at other assets.
+        """
+        refcounts = graph.initial_refcounts(workspace)
+        shardable = {}
+        for term in graph.ordered():
+            if term in workspace:
+                shardable[term] = (
+                    term.ndim == 1 or isinstance(workspace[term], ndarray)
                 )
-                workspace.update(loaded)
             else:
-                workspace[term] = term._compute(
-                    self._inputs_for_term(term, workspace, graph),
-                    mask_dates,
+                shardable[term] = not term.cross_sectional and all(
+                    shardable[dep] for dep in graph.graph.predecessors(term)
+                )
+
+        outputs = set(itervalues(graph.outputs))
+
+        def gathered(term):
+            if term in outputs:
+                return True
+            return any(
+                not shardable[child]
+                for child in graph.graph.successors(term)
+                if child not in workspace and refcounts[child] > 0
+            )
+
+        # Loadable terms are loaded again where they are needed, and
+        # LabelArrays of different shards can't be concatenated.
+        return [
+            term for term in graph.ordered()
+            if shardable[term] and
+            term not in workspace and
+            refcounts[term] > 0 and
+            term.ndim == 2 and
+            term.dtype != categorical_dtype and
+            not isinstance(term, LoadableTerm) and
+            gathered(term)
+        ]
+
+    def _compute_shards(self, graph, dates, assets, initial_workspace):
+        """
+        Compute the terms of ``graph`` which aren't cross-sectional on shards
+        of ``assets``, each in a separate process.
+
+        Returns
+        -------
+        workspace : dict
+            ``initial_workspace`` with the values of the terms computed on the
+            shards, gathered for all of the assets.
+        """
+        terms = self._sharded_terms(graph, initial_workspace)
+        if not terms:
+            return initial_workspace
+
+        shards = [
+            (indices[0], indices[-1] + 1)
+            for indices in array_split(
+                arange(len(assets)),
+                min(self._asset_shards, len(assets)),
+            )
+        ]
+        tasks = ProcessQueue()
+        results = ProcessQueue()
+        for index in range(len(shards)):
+            tasks.put(index)
+
+        workers = [
+            Process(
+                target=_compute_shard_tasks,
+                args=(
+                    self,
+                    graph,
+                    dates,
                     assets,
-                    mask,
+                    initial_workspace,
+                    terms,
+                    shards,
+                    tasks,
+                    results,
+                ),
+            )
+            for _ in range(min(self._shard_processes or len(shards),
+                               len(shards)))
+        ]
+        for worker in workers:
+            tasks.put(None)
+            worker.daemon = True
+            worker.start()
+
+        values = {}
+        failures = []
+        try:
+            # Read the results while waiting, a process can only exit once
+            # everything it put on a queue has been read.
+            while len(values) + len(failures) < len(shards):
+                try:
+                    index, successful, value = results.get(timeout=0.1)
+                except Empty:
+                    if not any(w.is_alive() for w in workers) and \
+                            results.empty():
+                        raise PipelineShardError(
+                            "A process computing the pipeline exited "
+                            "without returning its results."
+                        )
+                    continue
+
+                if successful:
+                    values[index] = value
+                else:
+                    failures.append((index, value))
+        except BaseException:
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+
+        if failures:
+            raise PipelineShardError(
+                "Failed to compute the pipeline on the assets {0}:\n"
+                "{1}".format(
+                    ", ".join(
+                        "{0}-{1}".format(
+                            assets[shards[index][0]],
+                            assets[shards[index][1] - 1],
+                        )
+                        for index, _ in sorted(failures)
+                    ),
+                    "\n".join(tb for _, tb in sorted(failures)),
                 )
-                if term.ndim == 2:
-                    assert workspace[term].shape == mask.shape
+            )
+
+        workspace = initial_workspace.copy()
+        extra_rows = graph.extra_rows
+        root_extra_rows = extra_rows[self._root_mask_term]
+        for i, term in enumerate(terms):
+            workspace[term] = concatenate(
+                [values[index][i] for index in range(len(shards))],
+                axis=1,
+            )
+            if self._term_cache is not None:
+                self._term_cache.set(
+                    term,
+                    dates[root_extra_rows - extra_rows[term]:],
+                    assets,
+                    workspace[term],
+                )
+        return workspace
+
+    def _compute_shard(self, graph, dates, assets, workspace, terms):
+        """
+        Compute ``terms`` for the assets of one shard.
+
+        Returns
+        -------
+        values : list[np.ndarray]
+            The values of ``terms``, including their extra rows.
+        """
+        refcounts = graph.partial_refcounts(terms, workspace)
+        self._compute_terms(
+            graph,
+            dates,
+            assets,
+            workspace,
+            refcounts,
+            None,
+            None,
+        )
+        return [workspace[term] for term in terms]
+
+    def _execute_concurrently(self,
+                              graph,
+                              dates,
+                              assets,
+                              workspace,
+                              refcounts,
+                              load,
+                              pool,
+                              cache):
+        """
+        Compute the terms of ``graph`` which are not in ``workspace`` on
+        ``pool``, as soon as all of their inputs are available.
+
+        The inputs of a term are gathered in the calling thread before the
+        term is submitted to the pool, and the workspace is only updated in
+        the calling thread, so the pool's threads never touch it. The
+        dependencies of a term are released as soon as it is computed, like
+        in the serial execution.
+        """
+        # Terms needed by the outputs, with the number of their inputs which
+        # are not computed yet.
+        waiting = {
+            term: sum(1 for dep in graph.graph.predecessors(term)
+                      if dep not in workspace)
+            for term, refcount in iteritems(refcounts)
+            if refcount > 0 and term not in workspace
+        }
+        ready = [term for term, count in iteritems(waiting) if not count]
+        done = Queue()
+        # The dates of the terms being computed.
+        in_flight = {}
+
+        def store(term, value):
+            workspace[term] = value
+            for successor in graph.graph.successors(term):
+                try:
+                    waiting[successor] -= 1
+                except KeyError:
+                    continue
+                if not waiting[successor]:
+                    ready.append(successor)
+
+        while waiting:
+            # Submit the terms to compute first, so that the pool works while
+            # this thread loads data.
+            ready.sort(key=lambda t: isinstance(t, LoadableTerm))
+            while ready:
+                term = ready.pop(0)
+                if term in workspace:
+                    # Loaded along with another term of its dataset.
+                    continue
+
+                mask, mask_dates = graph.mask_and_dates_for_term(
+                    term,
+                    self._root_mask_term,
+                    workspace,
+                    dates,
+                )
+                if isinstance(term, LoadableTerm):
+                    for loaded_term, value in iteritems(
+                            load(term, mask, mask_dates)):
+                        if loaded_term in waiting:
+                            del waiting[loaded_term]
+                            store(loaded_term, value)
+                        else:
+                            workspace[loaded_term] = value
                 else:
-                    assert workspace[term].shape == (mask.shape[0], 1)
+                    in_flight[term] = mask_dates
+                    pool.apply_async(
+                        _compute_term_task,
+                        (
+                            term,
+                            self._inputs_for_term(term, workspace, graph),
+                            mask_dates,
+                            assets,
+                            mask,
+                        ),
+                        callback=done.put,
+                    )
 
-                # Decref dependencies of ``term``, and clear any terms whose
-                # refcounts hit 0.
-                for garbage_term in graph.decref_dependencies(term, refcounts):
-                    del workspace[garbage_term]
+            if not in_flight:
+                break
 
-        out = {}
-        graph_extra_rows = graph.extra_rows
-        for name, term in iteritems(graph.outputs):
-            # Truncate off extra rows from outputs.
-            out[name] = workspace[term][graph_extra_rows[term]:]
-        return out
+            term, successful, value = done.get()
+            mask_dates = in_flight.pop(term)
+            if not successful:
+                reraise(*value)
+            if cache is not None:
+                cache.set(term, mask_dates, assets, value)
+
+            del waiting[term]
+            store(term, value)
+
+            # Decref dependencies of ``term``, and clear any terms whose
+            # refcounts hit 0.
+            for garbage_term in graph.decref_dependencies(term, refcounts):
+                del workspace[garbage_term]
 
     def _to_narrow(self, terms, data, mask, dates, assets):
         """
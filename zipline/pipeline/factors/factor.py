@@ -1240,6 +1240,7 @@ class GroupedRowTransform(Factor):
     zipline.pipeline.factors.Factor.rank
     """
     window_length = 0
+    cross_sectional = True
 
     def __new__(cls,
                 transform,
@@ -1348,6 +1349,7 @@ class Rank(SingleInputMixin, Factor):
     window_length = 0
     dtype = float64_dtype
     window_safe = True
+    cross_sectional = True
 
     def __new__(cls, factor, method, ascending, mask):
         return super(Rank, cls).__new__(
@@ -1467,6 +1469,12 @@ class CustomFactor(PositiveWindowLengthMixin, CustomTermMixin, Factor):
     3rd, 2014, the column of input data for asset A will have 9 leading NaNs
     for the preceding days on which data was not yet available.
 
+    ``compute`` may be called with a subset of the assets when the engine
+    splits the assets into shards. A CustomFactor whose output for an asset
+    depends on the other assets, like a rank or a demeaned value, should set
+    the class-level attribute ``cross_sectional = True`` so that it is always
+    computed over all of the assets.
+
     Examples
     --------
 
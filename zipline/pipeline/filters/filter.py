@@ -303,6 +303,7 @@ class PercentileFilter(SingleInputMixin, Filter):
         The maxiumum percentile rank of an asset that will pass the filter.
     """
     window_length = 0
+    cross_sectional = True
 
     def __new__(cls, factor, min_percentile, max_percentile, mask):
         return super(PercentileFilter, cls).__new__(
@@ -476,6 +477,9 @@ class SingleAsset(Filter):
     """
     inputs = []
     window_length = 1
+    # Computing this filter on assets which don't include the given asset
+    # fails.
+    cross_sectional = True
 
     def __new__(cls, asset):
         return super(SingleAsset, cls).__new__(cls, asset=asset)
@@ -3,6 +3,7 @@ Dependency-Graph representation of Pipeline API terms.
 """
 from networkx import (
     DiGraph,
+    ancestors,
     topological_sort,
 )
 from six import iteritems, itervalues
@@ -150,6 +151,40 @@ class TermGraph(object):
 
         return refcounts
 
+    def partial_refcounts(self, terms, initial_terms):
+        """
+        Calculate refcounts for computing only ``terms`` from this graph.
+
+        Parameters
+        ----------
+        terms : iterable[Term]
+            The terms to compute, in place of the outputs of the graph.
+        initial_terms : iterable[Term]
+            An iterable of terms that were pre-computed before graph execution.
+
+        Like :meth:`initial_refcounts`, but only the dependencies of ``terms``
+        are counted, so the terms which are only needed by the other outputs
+        are never computed.
+        """
+        terms = set(terms)
+        needed = set(terms)
+        for term in terms:
+            needed.update(ancestors(self.graph, term))
+
+        refcounts = {
+            term: sum(1 for child in self.graph.successors(term)
+                      if child in needed)
+            for term in needed
+        }
+        for t in terms:
+            refcounts[t] += 1
+
+        for t in initial_terms:
+            if t in needed:
+                self._decref_depencies_recursive(t, refcounts, set())
+
+        return refcounts
+
     def _decref_depencies_recursive(self, term, refcounts, garbage):
         """
         Decrement terms recursively.
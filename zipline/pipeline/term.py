@@ -66,6 +66,11 @@ class Term(with_metaclass(ABCMeta, object)):
     # The dimensions of the term's output (1D or 2D).
     ndim = 2
 
+    # Determines if the value of a term for an asset depends on the values of
+    # other assets, like a rank.  Terms which aren't cross-sectional can be
+    # computed on a subset of the assets.
+    cross_sectional = False
+
     _term_cache = WeakValueDictionary()
 
     def __new__(cls,
@@ -130,6 +135,9 @@ class Term(with_metaclass(ABCMeta, object)):
                     params=params,
                     *args, **kwargs
                 )
+            # Kept to identify the term outside of this process, e.g. in the
+            # keys of a TermCache.
+            new_instance._identity = identity
             return new_instance
 
     @classmethod
@@ -692,6 +700,8 @@ class Slice(ComputableTerm):
     Users should rarely construct instances of `Slice` directly. Instead, they
     should construct instances via indexing, e.g. `MyFactor()[Asset(24)]`.
     """
+    cross_sectional = True
+
     def __new__(cls, term, asset):
         return super(Slice, cls).__new__(
             cls,
@@ -1,13 +1,14 @@
 """
 Caching utilities for zipline
 """
-from collections import MutableMapping
+from collections import MutableMapping, OrderedDict
 import errno
+from operator import attrgetter
 import os
 import pickle
-from distutils import dir_util
-from shutil import rmtree, move
+from shutil import copy2, rmtree, move
 from tempfile import mkdtemp, NamedTemporaryFile
+from threading import Lock
 
 import pandas as pd
 
@@ -150,6 +151,145 @@ class ExpiringCache(object):
         self._cache[key] = CachedObject(value, expiration_dt)
 
 
+class ArrayCache(object):
+    """
+    A least recently used cache of arrays, bounded by the number of bytes
+    held by the arrays.
+
+    Parameters
+    ----------
+    max_nbytes : int
+        The largest total size of the cached arrays. Setting an array evicts
+        the least recently used arrays until the total fits. Arrays larger
+        than ``max_nbytes`` are not cached.
+    sizeof : callable[object -> int], optional
+        Returns the number of bytes held by a cached value. Defaults to the
+        ``nbytes`` attribute of the value, so other objects than arrays can
+        be cached by passing their size here.
+
+    Notes
+    -----
+    The cache may be shared between threads. It supports the item access
+    needed to back an :class:`ExpiringCache`.
+
+    Usage
+    -----
+    >>> import numpy as np
+    >>> cache = ArrayCache(16)
+    >>> cache.set('foo', np.zeros(1))
+    >>> cache.set('bar', np.zeros(1))
+    >>> cache.get('foo').nbytes
+    8
+    >>> cache.set('baz', np.zeros(1))
+    >>> cache.nbytes
+    16
+    >>> cache.get('bar')
+    Traceback (most recent call last):
+        ...
+    KeyError: 'bar'
+    """
+
+    def __init__(self, max_nbytes, sizeof=attrgetter('nbytes')):
+        self.max_nbytes = max_nbytes
+        self.nbytes = 0
+        self._sizeof = sizeof
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if self.pop(key) is None:
+            raise KeyError(key)
+
+    def get(self, key):
+        """Get an array and mark it as the most recently used.
+
+        Parameters
+        ----------
+        key : any
+            The key to lookup.
+
+        Returns
+        -------
+        array : np.ndarray
+            The array for ``key``.
+
+        Raises
+        ------
+        KeyError
+            Raised if the key is not in the cache.
+        """
+        with self._lock:
+            entry = self._cache.pop(key)
+            self._cache[key] = entry
+        return entry[0]
+
+    def set(self, key, value):
+        """Add an array to the cache, evicting the least recently used arrays
+        if needed.
+
+        Parameters
+        ----------
+        key : any
+            The key to use for the array.
+        value : np.ndarray
+            The array to store under ``key``.
+        """
+        nbytes = self._sizeof(value)
+        with self._lock:
+            self._pop(key)
+            if nbytes > self.max_nbytes:
+                return
+
+            while self.nbytes + nbytes > self.max_nbytes:
+                _, (_, evicted_nbytes) = self._cache.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+            self._cache[key] = value, nbytes
+            self.nbytes += nbytes
+
+    def pop(self, key):
+        """Remove an array from the cache.
+
+        Parameters
+        ----------
+        key : any
+            The key of the array.
+
+        Returns
+        -------
+        array : np.ndarray or None
+            The removed array, or None if ``key`` was not cached.
+        """
+        with self._lock:
+            return self._pop(key)
+
+    def _pop(self, key):
+        try:
+            value, nbytes = self._cache.pop(key)
+        except KeyError:
+            return None
+        self.nbytes -= nbytes
+        return value
+
+    def clear(self):
+        """Remove all of the arrays.
+        """
+        with self._lock:
+            self._cache.clear()
+            self.nbytes = 0
+
+
 class dataframe_cache(MutableMapping):
     """A disk-backed cache for dataframes.
 
@@ -323,11 +463,13 @@ class working_dir(object):
     Notes
     -----
     The file is moved on __exit__ if there are no exceptions.
-    ``working_dir`` uses :func:`dir_util.copy_tree` to move the actual files,
-    meaning it has as strong of guarantees as :func:`dir_util.copy_tree`.
+    ``working_dir`` hard links the files into the final path, falling back
+    to :func:`shutil.copy2` when the two paths are on different file systems.
+    Files which are hard linked to files outside of the working directory
+    therefore stay shared once committed.
     """
     def __init__(self, final_path, *args, **kwargs):
-        self.path = mkdtemp()
+        self.path = mkdtemp(*args, **kwargs)
         self._final_path = final_path
 
     def ensure_dir(self, *path_parts):
@@ -355,7 +497,21 @@ class working_dir(object):
     def _commit(self):
         """Sync the temporary directory to the final path.
         """
-        dir_util.copy_tree(self.path, self._final_path)
+        for root, _, filenames in os.walk(self.path):
+            final_root = os.path.join(
+                self._final_path,
+                os.path.relpath(root, self.path),
+            )
+            ensure_directory(final_root)
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                final_path = os.path.join(final_root, filename)
+                if os.path.lexists(final_path):
+                    os.remove(final_path)
+                try:
+                    os.link(path, final_path)
+                except (AttributeError, OSError):
+                    copy2(path, final_path)
 
     def __enter__(self):
         return self
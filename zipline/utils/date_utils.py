@@ -0,0 +1,61 @@
+"""
+Utilities for working with ranges of dates.
+"""
+from toolz import partition_all
+
+
+def compute_date_chunks(sessions, start_date, end_date, chunksize):
+    """Compute the start and end dates of the chunks of a range of sessions.
+
+    Parameters
+    ----------
+    sessions : pd.DatetimeIndex
+        The available dates.
+    start_date : pd.Timestamp
+        The first date in the range.
+    end_date : pd.Timestamp
+        The last date in the range.
+    chunksize : int or None
+        The number of sessions in each chunk. If None, the whole range is a
+        single chunk.
+
+    Returns
+    -------
+    ranges : iterable[(pd.Timestamp, pd.Timestamp)]
+        The first and last session of each chunk, in order.
+
+    Raises
+    ------
+    KeyError
+        If ``start_date`` or ``end_date`` isn't in ``sessions``.
+    ValueError
+        If ``end_date`` is before ``start_date``.
+    """
+    if start_date not in sessions:
+        raise KeyError(
+            "Start date %s is not found in calendar." % (
+                start_date.strftime("%Y-%m-%d"),
+            )
+        )
+    if end_date not in sessions:
+        raise KeyError(
+            "End date %s is not found in calendar." % (
+                end_date.strftime("%Y-%m-%d"),
+            )
+        )
+    if end_date < start_date:
+        raise ValueError(
+            "End date %s cannot precede start date %s." % (
+                end_date.strftime("%Y-%m-%d"),
+                start_date.strftime("%Y-%m-%d"),
+            )
+        )
+
+    if chunksize is None:
+        return [(start_date, end_date)]
+
+    start_ix, end_ix = sessions.slice_locs(start_date, end_date)
+    return [
+        (chunk[0], chunk[-1])
+        for chunk in partition_all(chunksize, sessions[start_ix:end_ix])
+    ]
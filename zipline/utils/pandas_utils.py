@@ -8,6 +8,7 @@ import warnings
 
 import pandas as pd
 from distutils.version import StrictVersion
+from toolz import concat, unique
 
 pandas_version = StrictVersion(pd.__version__)
 
@@ -199,6 +200,43 @@ def ignore_pandas_nan_categorical_warning():
         yield
 
 
+def categorical_df_concat(frames):
+    """
+    Concatenate DataFrames with the same columns, some of them categorical.
+
+    ``pd.concat`` turns a categorical column into an object column if the
+    categories of the frames differ, so the categories of each categorical
+    column are first set to the union of the categories of all of the frames.
+    The frames are changed in place.
+
+    Parameters
+    ----------
+    frames : list[pd.DataFrame]
+        The frames to concatenate.
+
+    Returns
+    -------
+    concatenated : pd.DataFrame
+    """
+    first = frames[0]
+    for frame in frames[1:]:
+        if not frame.columns.equals(first.columns):
+            raise ValueError(
+                "Input DataFrames must have the same columns, got %s and %s"
+                % (list(first.columns), list(frame.columns))
+            )
+
+    for name in first.columns[(first.dtypes == 'category').values]:
+        categories = list(unique(concat(
+            frame[name].cat.categories for frame in frames
+        )))
+        with ignore_pandas_nan_categorical_warning():
+            for frame in frames:
+                frame[name] = frame[name].cat.set_categories(categories)
+
+    return pd.concat(frames)
+
+
 _INDEXER_NAMES = [
     '_' + name for (name, _) in pd.core.indexing.get_indexers_list()
 ]
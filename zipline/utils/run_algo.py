@@ -172,7 +172,10 @@ def _run(handle_data,
     if broker:
         emission_rate = 'minute'
         start = pd.Timestamp.utcnow()
-        end = start + pd.Timedelta('2 day')
+        if end is None:
+            # Trade every session the calendar knows of; the realtime clock
+            # sleeps between sessions.
+            end = get_calendar("NYSE").last_session
 
     TradingAlgorithmClass = (partial(LiveTradingAlgorithm,
                                      broker=broker,
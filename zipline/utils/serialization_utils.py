@@ -13,17 +13,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from six import BytesIO
+import atexit
+from datetime import date, datetime, timedelta
+import os
 import pickle
+import sys
 from functools import partial
+from threading import Condition, Thread
 
-from zipline.assets import AssetFinder
+from six import (
+    BytesIO,
+    binary_type,
+    integer_types,
+    string_types,
+    text_type,
+    reraise,
+)
+
+from zipline.assets import Asset, AssetFinder
 from zipline.finance.trading import TradingEnvironment
 
 # Label for the serialization version field in the state returned by
 # __getstate__.
 VERSION_LABEL = '_stateversion_'
 CHECKSUM_KEY = '__state_checksum'
+# Key marking state files whose fields are pickled individually.
+FIELDS_KEY = '__state_fields'
+
+# Types whose instances can not change once created. A context field holding
+# one of these only needs to be serialized again when it is reassigned.
+_IMMUTABLE_TYPES = (
+    (bool, float, complex, binary_type, text_type, type(None),
+     date, datetime, timedelta, Asset) +
+    integer_types +
+    string_types
+)
 
 
 def _persistent_id(obj):
@@ -79,11 +103,38 @@ def loads_with_persistent_ids(str, env):
     return unpickler.load()
 
 
+def _is_immutable(value):
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(v) for v in value)
+    return False
+
+
+def _atomic_write(path, data):
+    """Write ``data`` to ``path`` so that readers see either the old or the
+    new content, never a partially written file.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    try:
+        replace = os.replace
+    except AttributeError:  # Python 2
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        replace = os.rename
+    replace(tmp_path, path)
+
+
 def load_context(state_file_path, context, checksum):
     with open(state_file_path, 'rb') as f:
         try:
             loaded_state = pickle.load(f)
-        except (pickle.UnpicklingError, IndexError):
+        except (pickle.UnpicklingError, IndexError, EOFError):
             raise ValueError("Corrupt state file: {}".format(state_file_path))
         else:
             if CHECKSUM_KEY not in loaded_state or \
@@ -94,11 +145,20 @@ def load_context(state_file_path, context, checksum):
             else:
                 del loaded_state[CHECKSUM_KEY]
 
+            if FIELDS_KEY in loaded_state:
+                # Written by ContextPersister: every field is pickled on its
+                # own.
+                loaded_state = {
+                    k: pickle.loads(v)
+                    for k, v in loaded_state[FIELDS_KEY].items()
+                }
+
             for k, v in loaded_state.items():
                 setattr(context, k, v)
 
 
-def store_context(state_file_path, context, checksum, exclude_list):
+def store_context(state_file_path, context, checksum, exclude_list,
+                  protocol=pickle.HIGHEST_PROTOCOL):
     state = {}
     fields_to_store = list(set(context.__dict__.keys()) -
                            set(exclude_list))
@@ -108,6 +168,269 @@ def store_context(state_file_path, context, checksum, exclude_list):
 
     state[CHECKSUM_KEY] = checksum
 
-    with open(state_file_path, 'wb') as f:
-        # Forcing v2 protocol for compatibility between py2 and py3
-        pickle.dump(state, f, protocol=2)
+    _atomic_write(state_file_path, pickle.dumps(state, protocol=protocol))
+
+
+class ContextPersister(object):
+    """Persists the state of an algorithm's context in the background.
+
+    :meth:`checkpoint` only takes a shallow snapshot of the context's fields.
+    The fields are pickled one by one on a background thread and the state
+    file is written by a second one. A field which still refers to the same
+    immutable object as at the previous checkpoint is not pickled again, and
+    the state file is only rewritten if the pickle of some field changed.
+
+    By default, a field holding a mutable object, like a list, a dict or a
+    DataFrame, is pickled again at every checkpoint, because it may have
+    been changed in place. With ``reserialize_mutable=False``, such a field is
+    only pickled again if it was reassigned, or if it was named in a call to
+    :meth:`mark_dirty` since the previous checkpoint.
+
+    The objects referenced by a snapshot must not be mutated before they are
+    pickled, so :meth:`wait_for_snapshot` has to be called before running
+    code which may change the context. The caller therefore only waits for
+    the serialization if it is not done by then, and never for the state
+    file to be written. A checkpoint replaces the state file atomically. If
+    the writer falls behind, only the most recent checkpoint is written.
+
+    Parameters
+    ----------
+    state_file_path : str
+        The path of the state file.
+    checksum : str
+        Identifier of the algorithm, see :func:`load_context`.
+    exclude_list : list[str]
+        The fields of the context which are not persisted.
+    checkpoint_interval : int, optional
+        Persist the context on every ``checkpoint_interval``-th call to
+        :meth:`checkpoint`.
+    protocol : int, optional
+        The pickle protocol used to serialize the fields.
+    reserialize_mutable : bool, optional
+        Pickle the fields holding mutable objects at every checkpoint, rather
+        than only the ones marked with :meth:`mark_dirty`.
+    """
+
+    def __init__(self,
+                 state_file_path,
+                 checksum,
+                 exclude_list,
+                 checkpoint_interval=1,
+                 protocol=pickle.HIGHEST_PROTOCOL,
+                 reserialize_mutable=True):
+        if checkpoint_interval < 1:
+            raise ValueError(
+                "checkpoint_interval must be at least 1, got {}".format(
+                    checkpoint_interval
+                )
+            )
+
+        self.state_file_path = state_file_path
+        self.checksum = checksum
+        self.exclude_list = set(exclude_list)
+        self.checkpoint_interval = checkpoint_interval
+        self.protocol = protocol
+        self.reserialize_mutable = reserialize_mutable
+
+        self._calls = 0
+        # The fields changed in place since the last snapshot.
+        self._dirty = set()
+        # field -> (value, pickled value) as of the previous checkpoint, or
+        # None before the first one.
+        self._serialized = None
+
+        self._condition = Condition()
+        # The snapshot waiting to be pickled, with its dirty fields, and the
+        # state waiting to be written.
+        self._snapshot = None
+        self._pickling = False
+        self._state = None
+        self._writing = False
+        self._error = None
+        self._closed = False
+
+        self._threads = [
+            Thread(target=self._serialize_loop,
+                   name='ContextPersister-serializer'),
+            Thread(target=self._write_loop,
+                   name='ContextPersister-writer'),
+        ]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+        atexit.register(self.close)
+
+    def mark_dirty(self, *fields):
+        """Mark fields of the context as changed in place, so that they are
+        pickled again at the next checkpoint.
+
+        Parameters
+        ----------
+        *fields : str
+            The names of the changed fields.
+        """
+        self._dirty.update(fields)
+
+    def checkpoint(self, context, force=False):
+        """Persist ``context`` if a checkpoint is due.
+
+        Parameters
+        ----------
+        context : object
+            The object whose ``__dict__`` is persisted.
+        force : bool, optional
+            Persist the context regardless of the checkpoint interval.
+
+        Raises
+        ------
+        Exception
+            If serializing or writing a previous checkpoint failed.
+        """
+        self._raise_background_error()
+
+        self._calls += 1
+        if not force and self._calls % self.checkpoint_interval:
+            return
+
+        snapshot = {
+            field: value
+            for field, value in context.__dict__.items()
+            if field not in self.exclude_list
+        }
+        dirty, self._dirty = self._dirty, set()
+
+        with self._condition:
+            # A snapshot which was not picked up yet is superseded, but the
+            # fields it marked as dirty still have to be pickled.
+            if self._snapshot is not None:
+                dirty |= self._snapshot[1]
+            self._snapshot = snapshot, dirty
+            self._condition.notify_all()
+
+    def wait_for_snapshot(self):
+        """Block until the last checkpoint has been serialized, after which
+        the context may be changed again.
+        """
+        with self._condition:
+            while self._snapshot is not None or self._pickling:
+                self._condition.wait()
+        self._raise_background_error()
+
+    def flush(self):
+        """Block until every checkpoint has been written.
+        """
+        with self._condition:
+            while (self._snapshot is not None or self._pickling or
+                   self._state is not None or self._writing):
+                self._condition.wait()
+        self._raise_background_error()
+
+    def close(self):
+        """Write the outstanding checkpoint and stop the background threads.
+        """
+        if self._closed:
+            return
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _raise_background_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            reraise(*error)
+
+    def _serialize(self, snapshot, dirty):
+        """Pickle the fields of ``snapshot``.
+
+        Parameters
+        ----------
+        snapshot : dict
+            The fields of the context.
+        dirty : set[str]
+            The fields marked as changed in place.
+
+        Returns
+        -------
+        state : dict or None
+            The content of the state file, or None if no field changed since
+            the previous checkpoint.
+        """
+        previous = self._serialized
+        changed = previous is None or set(previous) != set(snapshot)
+        if previous is None:
+            previous = {}
+
+        serialized = {}
+        for field, value in snapshot.items():
+            old_value, old_pickled = previous.get(field, (None, None))
+            if (old_pickled is not None and old_value is value and
+                    field not in dirty and
+                    (not self.reserialize_mutable or _is_immutable(value))):
+                serialized[field] = old_value, old_pickled
+                continue
+
+            pickled = pickle.dumps(value, protocol=self.protocol)
+            if pickled != old_pickled:
+                changed = True
+            else:
+                # Keep the old pickle so that unchanged fields share it.
+                pickled = old_pickled
+            serialized[field] = value, pickled
+
+        self._serialized = serialized
+        if not changed:
+            return None
+
+        return {
+            CHECKSUM_KEY: self.checksum,
+            FIELDS_KEY: {
+                field: pickled
+                for field, (_, pickled) in serialized.items()
+            },
+        }
+
+    def _serialize_loop(self):
+        while True:
+            with self._condition:
+                while self._snapshot is None and not self._closed:
+                    self._condition.wait()
+                if self._snapshot is None:
+                    return
+                (snapshot, dirty), self._snapshot = self._snapshot, None
+                self._pickling = True
+
+            state = None
+            try:
+                state = self._serialize(snapshot, dirty)
+            except Exception:
+                self._error = sys.exc_info()
+            finally:
+                with self._condition:
+                    self._pickling = False
+                    if state is not None:
+                        self._state = state
+                    self._condition.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._state is None and not self._closed:
+                    self._condition.wait()
+                if self._state is None:
+                    return
+                state, self._state = self._state, None
+                self._writing = True
+
+            try:
+                _atomic_write(self.state_file_path,
+                              pickle.dumps(state, protocol=self.protocol))
+            except Exception:
+                self._error = sys.exc_info()
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
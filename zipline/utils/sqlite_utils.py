@@ -29,6 +29,11 @@ def group_into_chunks(items, chunk_size=SQLITE_MAX_VARIABLE_NUMBER):
 
 
 coerce_string_to_conn = coerce_string(sqlite3.connect)
+# For connections which are only read from, and may be shared between threads.
+coerce_string_to_shared_conn = coerce_string(
+    sqlite3.connect,
+    check_same_thread=False,
+)
 coerce_string_to_eng = coerce_string(
     lambda s: sa.create_engine('sqlite:///' + s)
 )